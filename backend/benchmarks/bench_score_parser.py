@@ -0,0 +1,96 @@
+"""Accuracy and speed of the evaluation score parser over a corpus of model outputs.
+
+Each corpus case records the raw response, the scores it should yield and the
+strategy expected to produce them. Run from the backend directory:
+
+    python benchmarks/bench_score_parser.py            # table
+    python benchmarks/bench_score_parser.py --json     # machine-readable
+    python benchmarks/bench_score_parser.py --check    # exit 1 on any regression
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from score_parser import get_criteria, parse_scores  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "score_parser_corpus.json")
+
+
+def run(corpus_path: str, iterations: int):
+    with open(corpus_path, "r") as f:
+        corpus = json.load(f)
+
+    cases = []
+    per_strategy = defaultdict(lambda: {"cases": 0, "correct": 0, "total_us": 0.0})
+    for case in corpus:
+        keywords = get_criteria(case["evaluation_type"])
+        scores, strategy = parse_scores(case["raw"], keywords)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            parse_scores(case["raw"], keywords)
+        mean_us = (time.perf_counter() - started) / iterations * 1e6
+
+        correct = scores == case["expected"] and strategy == case["strategy"]
+        bucket = per_strategy[case["strategy"]]
+        bucket["cases"] += 1
+        bucket["correct"] += correct
+        bucket["total_us"] += mean_us
+        cases.append({
+            "name": case["name"],
+            "expected_strategy": case["strategy"],
+            "strategy": strategy,
+            "correct": correct,
+            "mean_us": round(mean_us, 2),
+        })
+
+    strategies = {
+        name: {
+            "cases": bucket["cases"],
+            "accuracy": round(bucket["correct"] / bucket["cases"], 3),
+            "mean_us": round(bucket["total_us"] / bucket["cases"], 2),
+        }
+        for name, bucket in per_strategy.items()
+    }
+    correct = sum(case["correct"] for case in cases)
+    return {
+        "corpus": os.path.basename(corpus_path),
+        "iterations": iterations,
+        "cases": len(cases),
+        "accuracy": round(correct / len(cases), 3) if cases else 0.0,
+        "mean_us": round(sum(case["mean_us"] for case in cases) / len(cases), 2) if cases else 0.0,
+        "strategies": strategies,
+        "results": cases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any case regresses")
+    args = parser.parse_args()
+
+    report = run(args.corpus, args.iterations)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for case in report["results"]:
+            mark = "ok  " if case["correct"] else "FAIL"
+            print(f"{mark} {case['name']:<28} {case['strategy']:<13} {case['mean_us']:>8.2f} us")
+        print()
+        for name, stats in sorted(report["strategies"].items()):
+            print(f"{name:<13} cases={stats['cases']:<3} accuracy={stats['accuracy']:.3f} mean={stats['mean_us']:.2f} us")
+        print(f"overall       cases={report['cases']:<3} accuracy={report['accuracy']:.3f} mean={report['mean_us']:.2f} us")
+
+    if args.check and report["accuracy"] < 1.0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Cold-start cost of one worker: module import, each lifespan startup step and the first requests.
+
+Every run is a fresh Python process, so nothing is shared between runs: the
+child imports the app, runs its lifespan startup and sends its first requests
+over httpx's ASGI transport to the fake model backend. Needs httpx. Run from
+the backend directory:
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --imports 15     # also the slowest imports (python -X importtime)
+    python benchmarks/bench_startup.py --json > startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; prints one JSON object of timings in milliseconds
+CHILD = r"""
+import asyncio, json, time
+started = time.perf_counter()
+import main
+import_ms = (time.perf_counter() - started) * 1000
+import httpx
+
+async def run():
+    timings = {"import_ms": import_ms}
+    started = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        timings["startup_ms"] = (time.perf_counter() - started) * 1000
+        timings.update({f"step_{name}_ms": ms for name, ms in main.startup_state["steps_ms"].items()})
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, method, url, body in [
+                ("ready", "GET", "/api/ready", None),
+                ("first_model_request", "POST", "/api/generate-research", {"topic": "cold starts", "use_cache": False}),
+                ("second_model_request", "POST", "/api/generate-research", {"topic": "warm starts", "use_cache": False}),
+            ]:
+                request_started = time.perf_counter()
+                response = await client.request(method, url, json=body)
+                response.raise_for_status()
+                timings[f"{name}_ms"] = (time.perf_counter() - request_started) * 1000
+    return timings
+
+print(json.dumps(asyncio.run(run())))
+"""
+
+
+def child_env(args) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "MODEL_BACKEND": "fake",
+        "FAKE_MODEL_LATENCY_MS": str(args.latency_ms),
+        "CONTENT_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="bench-startup-"), "content.db"),
+        "LOG_LEVEL": "CRITICAL",
+    })
+    return env
+
+
+def run_once(args) -> Dict[str, float]:
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=child_env(args),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"Startup run failed:\n{result.stderr}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    # Interpreter start, import, startup, three requests and shutdown, as an orchestrator sees it
+    timings["process_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def slowest_imports(args, top: int) -> List[Dict[str, Any]]:
+    """Largest cumulative import times of `import main`, from python -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR,
+                            env=child_env(args), capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        # "import time:  <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append({"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    imports.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return imports[:top]
+
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {
+            "median": round(statistics.median(run[name] for run in runs), 1),
+            "min": round(min(run[name] for run in runs), 1),
+            "max": round(max(run[name] for run in runs), 1),
+        }
+        for name in runs[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to start")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake model latency")
+    parser.add_argument("--imports", type=int, default=0, help="also list this many of the slowest imports")
+    parser.add_argument("--json", action="store_true", help="print the machine-readable report")
+    args = parser.parse_args()
+
+    runs = [run_once(args) for _ in range(args.runs)]
+    report = {
+        "benchmark": "startup",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "timings_ms": summarize(runs),
+    }
+    if args.imports:
+        report["slowest_imports"] = slowest_imports(args, args.imports)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'phase':<28} {'median ms':>10} {'min':>8} {'max':>8}")
+    for name, stats in report["timings_ms"].items():
+        print(f"{name.removesuffix('_ms'):<28} {stats['median']:>10.1f} {stats['min']:>8.1f} {stats['max']:>8.1f}")
+    if args.imports:
+        print(f"\nSlowest imports (cumulative ms, self ms):")
+        for entry in report["slowest_imports"]:
+            print(f"  {entry['module']:<40} {entry['cumulative_ms']:>8.1f} {entry['self_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Offline load test: full article workflows through the API against the fake model backend.
+
+Each workflow replays what the frontend does for one topic: research, outline,
+draft (optionally streamed), revision, evaluation, save and read-back. Workflows
+run at each requested concurrency level in-process over httpx's ASGI transport,
+so the numbers measure this app (routing, scheduling, caching, parsing, the
+content store) rather than the network or the real model. Needs httpx. Run
+from the backend directory:
+
+    python benchmarks/load_test.py --concurrency 1,8,32 --latency-ms 200
+    python benchmarks/load_test.py --workload ../requests.jsonl --json > after.json
+    python benchmarks/load_test.py --baseline before.json   # compare with an earlier run
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SUBJECTS = [
+    "solar energy", "urban gardening", "remote work", "sleep science", "electric cars",
+    "personal finance", "ocean plastics", "language learning", "home composting", "open source software",
+]
+ANGLES = [
+    "a beginner's guide to {}", "the hidden costs of {}", "why {} matters in 2025",
+    "common myths about {}", "how {} is changing daily life",
+]
+
+FEEDBACK = "Make the introduction more engaging and add a concrete example to each section."
+
+
+def load_topics(workload: str, synthetic: int, seed: int) -> List[str]:
+    """Topics from a JSONL workload (each line a string or an object with "topic" or "title"), or synthetic ones"""
+    if workload:
+        topics = []
+        with open(workload, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                topic = entry if isinstance(entry, str) else entry.get("topic") or entry.get("title")
+                if topic:
+                    topics.append(str(topic))
+        if not topics:
+            raise SystemExit(f"No topics found in {workload}")
+        return topics
+    rng = random.Random(seed)
+    return [rng.choice(ANGLES).format(rng.choice(SUBJECTS)) for _ in range(synthetic)]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p50": round(rank(50), 2),
+        "p90": round(rank(90), 2),
+        "p99": round(rank(99), 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+async def monitor_loop_lag(interval: float, samples: List[float]):
+    """Record how late the event loop wakes a sleeper; sustained lag means blocking work on the loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (loop.time() - started - interval) * 1000))
+
+
+class WorkflowRunner:
+    """Runs article workflows and collects per-route timings"""
+
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.route_ms: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.evaluation_status: Counter = Counter()
+
+    async def call(self, method: str, route: str, url: str, **kwargs) -> Any:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as e:
+            self.errors[f"{route} {type(e).__name__}"] += 1
+            raise
+        finally:
+            self.route_ms[route].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[f"{route} {response.status_code}"] += 1
+            raise RuntimeError(f"{route} returned {response.status_code}")
+        return response
+
+    async def draft(self, outline: str, research: str) -> str:
+        payload = {"outline": outline, "research_data": research, "use_cache": self.args.use_cache}
+        if not self.args.stream:
+            response = await self.call("POST", "generate-draft", "/api/generate-draft", json=payload)
+            return response.json()["draft"]
+        response = await self.call("POST", "generate-draft/stream", "/api/generate-draft/stream", json=payload)
+        event, draft = None, None
+        for line in response.text.splitlines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: ") and event == "done":
+                draft = json.loads(line[6:])["draft"]
+            elif line.startswith("data: ") and event == "error":
+                self.errors["generate-draft/stream error-event"] += 1
+                raise RuntimeError(json.loads(line[6:])["error"])
+        return draft
+
+    async def workflow(self, topic: str):
+        use_cache = self.args.use_cache
+        research = (await self.call("POST", "generate-research", "/api/generate-research",
+                                    json={"topic": topic, "use_cache": use_cache})).json()["research_data"]
+        outline = (await self.call("POST", "generate-outline", "/api/generate-outline",
+                                   json={"topic": topic, "research_data": research, "use_cache": use_cache})).json()["outline"]
+        draft = await self.draft(outline, research)
+        revised = (await self.call("POST", "revise-draft", "/api/revise-draft",
+                                   json={"draft": draft, "feedback": FEEDBACK, "use_cache": use_cache})).json()["revised_draft"]
+        content = {
+            "topic": topic,
+            "research_data": research,
+            "outline": outline,
+            "approved_outline": outline,
+            "draft": draft,
+            "final_draft": revised,
+        }
+        evaluation = (await self.call("POST", "evaluate-content", "/api/evaluate-content",
+                                      json={"content_data": content, "mode": self.args.mode, "use_cache": use_cache})).json()
+        self.evaluation_status.update(evaluation.get("evaluation_status", {}).values())
+        content.update(evaluations=evaluation["evaluations"])
+        saved = (await self.call("POST", "save-content", "/api/save-content", json={"content_data": content})).json()
+        await self.call("GET", "content/{id}", f"/api/content/{saved['id']}", params={"fields": "id,topic,scores"})
+        await self.call("GET", "content", "/api/content", params={"limit": 20})
+
+
+async def run_level(app_module, concurrency: int, topics: List[str], workflows: int, args) -> Dict[str, Any]:
+    import httpx
+
+    # Every level starts cold so levels are comparable
+    app_module.response_cache.invalidate(None)
+    lag_samples: List[float] = []
+    workflow_ms: List[float] = []
+    failed = 0
+    next_index = 0
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        runner = WorkflowRunner(client, args)
+
+        async def worker():
+            nonlocal next_index, failed
+            while next_index < workflows:
+                topic = f"{topics[next_index % len(topics)]} #{next_index}"
+                next_index += 1
+                started = time.perf_counter()
+                try:
+                    await runner.workflow(topic)
+                    workflow_ms.append((time.perf_counter() - started) * 1000)
+                except Exception:
+                    failed += 1
+
+        monitor = asyncio.create_task(monitor_loop_lag(args.lag_interval / 1000, lag_samples))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        duration = time.perf_counter() - started
+        monitor.cancel()
+
+    requests = sum(len(samples) for samples in runner.route_ms.values())
+    return {
+        "concurrency": concurrency,
+        "workflows": workflows,
+        "workflows_failed": failed,
+        "requests": requests,
+        "duration_s": round(duration, 3),
+        "workflows_per_s": round(len(workflow_ms) / duration, 3),
+        "requests_per_s": round(requests / duration, 2),
+        "workflow_latency_ms": percentiles(workflow_ms),
+        "route_latency_ms": {route: percentiles(samples) for route, samples in runner.route_ms.items()},
+        "errors": dict(runner.errors),
+        "evaluation_status": dict(runner.evaluation_status),
+        "event_loop_lag_ms": percentiles(lag_samples),
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    # Configure the app before it is imported: fake backend, throwaway content store, quiet logs
+    os.environ["MODEL_BACKEND"] = "fake"
+    os.environ["CONTENT_DB_PATH"] = args.db or os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "content.db")
+    os.environ.setdefault("MODEL_BACKOFF_BASE", "0.05")
+    os.environ.setdefault("MODEL_BACKOFF_MAX", "1")
+    if args.model_concurrency:
+        os.environ["MODEL_MAX_CONCURRENCY"] = str(args.model_concurrency)
+    import logging
+    import main as app_module
+    from model_clients import FakeBackend
+    logging.getLogger().setLevel(args.log_level)
+
+    app_module.model_backend = FakeBackend(
+        latency_ms=args.latency_ms,
+        latency_distribution=args.latency_distribution,
+        ms_per_word=args.ms_per_word,
+        output_words=args.output_words,
+        malformed_rate=args.malformed_rate,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    topics = load_topics(args.workload, args.synthetic, args.seed)
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    results = []
+    async with app_module.app.router.lifespan_context(app_module.app):
+        for concurrency in levels:
+            workflows = args.workflows or max(len(topics), concurrency)
+            results.append(await run_level(app_module, concurrency, topics, workflows, args))
+
+    return {
+        "benchmark": "load_test",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("json", "baseline")},
+        "topics": len(topics),
+        "levels": results,
+    }
+
+
+def print_table(report: Dict[str, Any]):
+    print(f"{'conc':>5} {'wf/s':>8} {'req/s':>8} {'wf p50 ms':>10} {'wf p99 ms':>10} {'lag p99':>8} {'failed':>7}")
+    for level in report["levels"]:
+        latency = level["workflow_latency_ms"]
+        print(f"{level['concurrency']:>5} {level['workflows_per_s']:>8.2f} {level['requests_per_s']:>8.1f} "
+              f"{latency.get('p50', 0):>10.1f} {latency.get('p99', 0):>10.1f} "
+              f"{level['event_loop_lag_ms'].get('p99', 0):>8.1f} {level['workflows_failed']:>7}")
+    last = report["levels"][-1]
+    print(f"\nRoutes at concurrency {last['concurrency']}:")
+    for route, latency in sorted(last["route_latency_ms"].items()):
+        print(f"  {route:<24} n={latency['count']:<5} p50={latency['p50']:>8.1f}ms  p99={latency['p99']:>8.1f}ms")
+    if last["errors"]:
+        print(f"  errors: {last['errors']}")
+    print(f"  evaluation status: {last['evaluation_status']}")
+
+
+def print_comparison(report: Dict[str, Any], baseline_path: str, out=sys.stdout):
+    with open(baseline_path, "r") as f:
+        baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+    print(f"\nAgainst {baseline_path}:", file=out)
+    for level in report["levels"]:
+        before = baseline.get(level["concurrency"])
+        if not before:
+            continue
+        throughput = (level["workflows_per_s"] / before["workflows_per_s"] - 1) * 100 if before["workflows_per_s"] else 0.0
+        p99_before = before["workflow_latency_ms"].get("p99") or 0
+        p99 = (level["workflow_latency_ms"].get("p99", 0) / p99_before - 1) * 100 if p99_before else 0.0
+        print(f"  concurrency {level['concurrency']:>3}: throughput {throughput:+.1f}%, workflow p99 {p99:+.1f}%", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workload", help="JSONL file of topics (strings, or objects with 'topic' or 'title')")
+    parser.add_argument("--synthetic", type=int, default=50, help="number of synthetic topics when no workload is given")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrent workflow counts")
+    parser.add_argument("--workflows", type=int, default=0, help="workflows per level (default: one per topic)")
+    parser.add_argument("--mode", choices=["separate", "combined"], default="separate", help="evaluation mode")
+    parser.add_argument("--stream", action="store_true", help="generate drafts through the SSE route")
+    parser.add_argument("--use-cache", action="store_true", help="allow response cache hits (off: every call reaches the model)")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="mean fake model latency")
+    parser.add_argument("--latency-distribution", default="lognormal", choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--ms-per-word", type=float, default=0.0, help="extra fake latency per output word")
+    parser.add_argument("--output-words", type=int, default=400, help="words per generated text")
+    parser.add_argument("--malformed-rate", type=float, default=0.05, help="share of evaluation responses that are malformed")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of model calls failing with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of model calls failing with 500")
+    parser.add_argument("--model-concurrency", type=int, default=0, help="override MODEL_MAX_CONCURRENCY")
+    parser.add_argument("--lag-interval", type=float, default=10.0, help="event-loop lag sampling interval (ms)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="content store path (default: a temporary file)")
+    parser.add_argument("--log-level", default="CRITICAL", help="app log level during the run")
+    parser.add_argument("--json", action="store_true", help="print the machine-readable report")
+    parser.add_argument("--baseline", help="earlier --json report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+    if args.baseline:
+        # Keep stdout valid JSON when --json is given
+        print_comparison(report, args.baseline, sys.stderr if args.json else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from revision_history import apply_delta, decode, diff_documents, encode, make_delta, versioned_content
+from structured_logging import describe_error
+
+logger = logging.getLogger(__name__)
+
+# Evaluation criteria stored as indexed columns, by stage
+SCORE_COLUMNS = {
+    "research": ["depth", "relevance", "credibility"],
+    "outline": ["flow", "completeness", "clarity"],
+    "draft": ["quality", "coherence", "engagement"],
+}
+CRITERIA = [criterion for criteria in SCORE_COLUMNS.values() for criterion in criteria]
+
+# Metadata returned without touching the stored document body
+METADATA_FIELDS = ["id", "kind", "topic", "stage", "created_at", "last_saved"]
+SORTABLE_FIELDS = ["topic", "stage", "created_at", "last_saved"] + CRITERIA
+
+# Furthest workflow stage a document has reached, checked in order
+STAGE_FIELDS = [
+    ("final", "final_draft"),
+    ("draft", "draft"),
+    ("outline", "approved_outline"),
+    ("outline", "outline"),
+    ("research", "research_data"),
+]
+
+# What a document is: saved content, or the server-side state of a workflow session.
+# Set when a document is created; listings show one kind at a time.
+DOCUMENT_KINDS = ("content", "session")
+
+FILTER_PATTERN = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|<|>|=)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+class ContentStoreError(ValueError):
+    """Raised for invalid store queries (unknown fields, malformed filters)"""
+
+
+class VersionConflictError(ContentStoreError):
+    """Raised when an update names a base version that is no longer the document's latest"""
+
+
+def get_document_stage(data: Dict[str, Any]) -> str:
+    for stage, field in STAGE_FIELDS:
+        if data.get(field):
+            return stage
+    return "topic"
+
+
+def document_scores(data: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Every criterion's score from data["evaluations"], None where not evaluated"""
+    scores = {criterion: None for criterion in CRITERIA}
+    for stage, criteria in SCORE_COLUMNS.items():
+        stage_scores = (data.get("evaluations") or {}).get(stage) or {}
+        for criterion in criteria:
+            value = stage_scores.get(criterion)
+            if isinstance(value, (int, float)):
+                scores[criterion] = float(value)
+    return scores
+
+
+def parse_score_filter(expression: str) -> Tuple[str, str, float]:
+    """Parse "engagement<6" into ("engagement", "<", 6.0)"""
+    match = FILTER_PATTERN.match(expression)
+    if not match or match.group(1) not in CRITERIA:
+        raise ContentStoreError(f"Invalid filter '{expression}'; expected <criterion><op><number> with criterion in {CRITERIA}")
+    return match.group(1), match.group(2), float(match.group(3))
+
+
+class ContentStore:
+    """SQLite-backed store of content documents keyed by id.
+
+    The full document is kept as a JSON blob; topic, stage, timestamps and every
+    evaluation criterion are mirrored into indexed columns for listing and
+    filtering. Methods are synchronous; call them from a worker thread.
+
+    Every save that changes a document also appends a version to its revision
+    history: a zlib-compressed full snapshot every `snapshot_interval` versions,
+    and in between a compressed delta against the previous version, so history
+    grows with the size of the edits and any version is rebuilt from at most
+    `snapshot_interval - 1` deltas.
+    """
+
+    def __init__(self, path: str, snapshot_interval: int = 10):
+        self.path = path
+        self.snapshot_interval = max(1, snapshot_interval)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL DEFAULT 'content',
+                    topic TEXT NOT NULL DEFAULT '',
+                    stage TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_saved TEXT NOT NULL,
+                    {", ".join(f"{criterion} REAL" for criterion in CRITERIA)},
+                    data TEXT NOT NULL
+                )
+            """)
+            # Stores created before documents had a kind hold only content
+            columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(documents)")]
+            if "kind" not in columns:
+                self._conn.execute("ALTER TABLE documents ADD COLUMN kind TEXT NOT NULL DEFAULT 'content'")
+            for column in ["kind", "topic", "stage", "last_saved"] + CRITERIA:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_documents_{column} ON documents({column})")
+            # kind is "snapshot" (content is the whole document) or "delta" (changes since the previous version)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS revisions (
+                    doc_id TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    content BLOB NOT NULL,
+                    full_size INTEGER NOT NULL,
+                    scores TEXT NOT NULL,
+                    PRIMARY KEY (doc_id, version)
+                )
+            """)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def ping(self):
+        """Cheap round trip to the database, for readiness checks"""
+        with self._lock:
+            self._conn.execute("SELECT 1").fetchone()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def import_legacy_file(self, filename: str) -> Optional[str]:
+        """Import the old single-document content_output.json into an empty store"""
+        if not os.path.exists(filename) or self.count():
+            return None
+        try:
+            with open(filename, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error importing {filename}: {describe_error(e)}")
+            return None
+        if not data:
+            return None
+        # A fixed id makes the import idempotent when several worker processes start at once
+        data = {**data, "id": data.get("id") or uuid.uuid5(uuid.NAMESPACE_URL, os.path.abspath(filename)).hex}
+        result = self.save(data, touch=False)
+        if result["created"]:
+            logger.info(f"Imported {filename} into the content store as {result['id']}")
+        return result["id"]
+
+    def save(self, data: Dict[str, Any], touch: bool = True, kind: str = "content") -> Dict[str, Any]:
+        """Insert or replace a document atomically; data["id"] selects the document to update.
+
+        `kind` applies to a new document; an existing one keeps its kind.
+        """
+        if kind not in DOCUMENT_KINDS:
+            raise ContentStoreError(f"Unknown document kind '{kind}'; expected one of {list(DOCUMENT_KINDS)}")
+        data = dict(data)
+        doc_id = str(data.get("id") or uuid.uuid4().hex)
+        now = datetime.now().isoformat()
+        if touch or not data.get("last_saved"):
+            data["last_saved"] = now
+        data["id"] = doc_id
+
+        with self._lock, self._conn:
+            # Take the write lock before reading, so concurrent savers (other processes too) get distinct versions
+            self._conn.execute("BEGIN IMMEDIATE")
+            previous = self._read_data(doc_id)
+            version = self._write(doc_id, previous, data, now, kind)
+        return {"id": doc_id, "last_saved": data["last_saved"], "created": previous is None, "version": version}
+
+    def update(self, doc_id: str, changes: Dict[str, Any], base_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Merge field changes into a stored document atomically; returns the fields that changed and the version.
+
+        With `base_version`, raises VersionConflictError unless that is still the
+        document's latest version. Returns None if the document does not exist.
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            previous = self._read_data(doc_id)
+            if previous is None:
+                return None
+            latest = self._conn.execute("SELECT MAX(version) FROM revisions WHERE doc_id = ?", (doc_id,)).fetchone()[0]
+            if base_version is not None and base_version != latest:
+                raise VersionConflictError(f"Version {base_version} is not the latest version ({latest}) of {doc_id}")
+            changed = {field: value for field, value in changes.items() if field != "id" and previous.get(field) != value}
+            if not changed:
+                return {"id": doc_id, "version": latest, "changes": {}, "last_saved": previous.get("last_saved")}
+            data = {**previous, **changed, "last_saved": now}
+            version = self._write(doc_id, previous, data, now)
+        return {"id": doc_id, "version": version, "changes": changed, "last_saved": now}
+
+    def _read_data(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT data FROM documents WHERE id = ?", (doc_id,)).fetchone()
+        return json.loads(row["data"]) if row is not None else None
+
+    def _write(self, doc_id: str, previous: Optional[Dict[str, Any]], data: Dict[str, Any], now: str,
+               kind: str = "content") -> int:
+        """Upsert the document row and record its revision; runs inside the caller's transaction"""
+        scores = document_scores(data)
+        columns = ["id", "kind", "topic", "stage", "created_at", "last_saved"] + CRITERIA + ["data"]
+        values = [doc_id, kind, str(data.get("topic") or ""), get_document_stage(data), now, data["last_saved"]]
+        values += [scores[criterion] for criterion in CRITERIA] + [json.dumps(data)]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in ("id", "kind", "created_at"))
+        self._conn.execute(
+            f"INSERT INTO documents ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}",
+            values
+        )
+        return self._record_revision(doc_id, previous, data, now)
+
+    def _insert_revision(self, doc_id: str, version: int, data: Dict[str, Any], created_at: str, kind: str,
+                         content: bytes, full_size: int):
+        scores = {criterion: value for criterion, value in document_scores(data).items() if value is not None}
+        self._conn.execute(
+            "INSERT INTO revisions (doc_id, version, created_at, stage, kind, content, full_size, scores) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (doc_id, version, created_at, get_document_stage(data), kind, content, full_size, json.dumps(scores))
+        )
+
+    def _record_revision(self, doc_id: str, previous: Optional[Dict[str, Any]], data: Dict[str, Any], now: str) -> int:
+        """Append a version unless the content is unchanged; returns the document's current version"""
+        last_version, last_snapshot = self._conn.execute(
+            "SELECT MAX(version), MAX(CASE WHEN kind = 'snapshot' THEN version END) FROM revisions WHERE doc_id = ?",
+            (doc_id,)
+        ).fetchone()
+        content = versioned_content(data)
+        snapshot = encode(content)
+        full_size = len(json.dumps(content))
+
+        if previous is not None:
+            old_content = versioned_content(previous)
+            if last_version is None:
+                # Saved before history was kept: its stored content becomes version 1
+                old_snapshot = encode(old_content)
+                self._insert_revision(doc_id, 1, previous, previous.get("last_saved") or now, "snapshot",
+                                      old_snapshot, len(json.dumps(old_content)))
+                last_version = last_snapshot = 1
+            if old_content == content:
+                return last_version
+
+        version = (last_version or 0) + 1
+        kind, blob = "snapshot", snapshot
+        if previous is not None and version - last_snapshot < self.snapshot_interval:
+            delta = encode(make_delta(old_content, content))
+            # A rewrite can make the delta bigger than the document itself
+            if len(delta) < len(snapshot):
+                kind, blob = "delta", delta
+        self._insert_revision(doc_id, version, data, now, kind, blob, full_size)
+        return version
+
+    def _project(self, row: sqlite3.Row, fields: Optional[List[str]]) -> Dict[str, Any]:
+        if fields is None:
+            return json.loads(row["data"])
+        result = {}
+        data = None
+        for field in fields:
+            if field in METADATA_FIELDS:
+                result[field] = row[field]
+            elif field == "scores":
+                result["scores"] = {criterion: row[criterion] for criterion in CRITERIA if row[criterion] is not None}
+            else:
+                if data is None:
+                    data = json.loads(row["data"])
+                result[field] = data.get(field)
+        return result
+
+    def get(self, doc_id: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Fetch one document, or only the requested fields of it"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM documents WHERE id = ?", (doc_id,)).fetchone()
+        return self._project(row, fields) if row is not None else None
+
+    def get_with_version(self, doc_id: str, fields: Optional[List[str]] = None) -> Optional[Tuple[Dict[str, Any], Optional[int]]]:
+        """A document (or the requested fields of it) and its current version, read together"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM documents WHERE id = ?", (doc_id,)).fetchone()
+            if row is None:
+                return None
+            version = self._conn.execute("SELECT MAX(version) FROM revisions WHERE doc_id = ?", (doc_id,)).fetchone()[0]
+        return self._project(row, fields), version
+
+    def latest(self, fields: Optional[List[str]] = None, kind: str = "content") -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE kind = ? ORDER BY last_saved DESC LIMIT 1", (kind,)
+            ).fetchone()
+        return self._project(row, fields) if row is not None else None
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM revisions WHERE doc_id = ?", (doc_id,))
+            return self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,)).rowcount > 0
+
+    def versions(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Version list of a document, newest first, with scores and how much storage the history takes"""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM documents WHERE id = ?", (doc_id,)).fetchone() is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT version, created_at, stage, kind, LENGTH(content) AS stored_size, full_size, scores "
+                "FROM revisions WHERE doc_id = ? ORDER BY version DESC",
+                (doc_id,)
+            ).fetchall()
+        return {
+            "id": doc_id,
+            "versions": [
+                {
+                    "version": row["version"],
+                    "created_at": row["created_at"],
+                    "stage": row["stage"],
+                    "kind": row["kind"],
+                    "stored_bytes": row["stored_size"],
+                    "scores": json.loads(row["scores"]),
+                }
+                for row in rows
+            ],
+            "stored_bytes": sum(row["stored_size"] for row in rows),
+            "full_copy_bytes": sum(row["full_size"] for row in rows),
+        }
+
+    def _rebuild(self, doc_id: str, version: int) -> Optional[Dict[str, Any]]:
+        """Content of one version: its nearest snapshot with the deltas after it applied in order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, kind, content FROM revisions WHERE doc_id = ? AND version <= ? AND version >= "
+                "(SELECT MAX(version) FROM revisions WHERE doc_id = ? AND version <= ? AND kind = 'snapshot') "
+                "ORDER BY version",
+                (doc_id, version, doc_id, version)
+            ).fetchall()
+        if not rows or rows[-1]["version"] != version:
+            return None
+        content = decode(rows[0]["content"])
+        for row in rows[1:]:
+            content = apply_delta(content, decode(row["content"]))
+        return content
+
+    def get_version(self, doc_id: str, version: int, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Rebuild one version of a document, or only the requested fields of it"""
+        content = self._rebuild(doc_id, version)
+        if content is None:
+            return None
+        content = {**content, "id": doc_id}
+        return {field: content.get(field) for field in fields} if fields else content
+
+    def diff_versions(self, doc_id: str, from_version: int, to_version: int) -> Optional[Dict[str, Any]]:
+        """Field-by-field changes between two versions; None if either does not exist"""
+        before, after = self._rebuild(doc_id, from_version), self._rebuild(doc_id, to_version)
+        if before is None or after is None:
+            return None
+        return {"id": doc_id, "from": from_version, "to": to_version, "changes": diff_documents(before, after)}
+
+    def latest_version(self, doc_id: str) -> Optional[int]:
+        with self._lock:
+            return self._conn.execute("SELECT MAX(version) FROM revisions WHERE doc_id = ?", (doc_id,)).fetchone()[0]
+
+    def list(self, fields: Optional[List[str]] = None, topic: Optional[str] = None, stages: Optional[List[str]] = None,
+             filters: Optional[List[str]] = None, order_by: str = "last_saved", descending: bool = True,
+             limit: int = 20, offset: int = 0, kind: str = "content") -> Dict[str, Any]:
+        """Page through documents of one kind matching topic/stage/score filters.
+
+        "Drafts with engagement < 6" is stages=["draft", "final"], filters=["engagement<6"].
+        """
+        if order_by not in SORTABLE_FIELDS:
+            raise ContentStoreError(f"Cannot order by '{order_by}'; expected one of {SORTABLE_FIELDS}")
+        if kind not in DOCUMENT_KINDS:
+            raise ContentStoreError(f"Unknown document kind '{kind}'; expected one of {list(DOCUMENT_KINDS)}")
+        fields = fields or METADATA_FIELDS + ["scores"]
+
+        clauses, params = ["kind = ?"], [kind]
+        if topic:
+            clauses.append("topic LIKE ? ESCAPE '\\'")
+            params.append("%" + re.sub(r"([%_\\])", r"\\\1", topic) + "%")
+        if stages:
+            clauses.append(f"stage IN ({', '.join('?' * len(stages))})")
+            params.extend(stages)
+        for expression in filters or []:
+            criterion, op, value = parse_score_filter(expression)
+            clauses.append(f"{criterion} {op} ?")
+            params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        # Only pull the JSON body when a content field was asked for
+        needs_data = any(field not in METADATA_FIELDS and field != "scores" for field in fields)
+        columns = ", ".join(METADATA_FIELDS + CRITERIA + (["data"] if needs_data else []))
+        direction = "DESC" if descending else "ASC"
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM documents {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM documents {where} ORDER BY {order_by} {direction}, id LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return {
+            "items": [self._project(row, fields) for row in rows],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        }
@@ -0,0 +1,188 @@
+import difflib
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
+
+# "## Heading" lines of the outline format; "###" sub-headings stay part of their section
+SECTION_HEADING_PATTERN = re.compile(r"^[ \t]*##(?!#)[ \t]*(.+?)[ \t#]*$", re.MULTILINE)
+SECTION_NUMBER_PATTERN = re.compile(r"^section\s+\d+\s*[:.\-–]\s*", re.IGNORECASE)
+# Top-level headings a section writer may add on its own ("# Title", "## Introduction")
+TOP_HEADING_PATTERN = re.compile(r"^[ \t]*#{1,2}(?!#)[ \t]+.*$", re.MULTILINE)
+PARAGRAPH_BREAK_PATTERN = re.compile(r"\n\s*\n")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+SECTION_REFERENCE_PATTERN = re.compile(r"\bsection\s+(\d+)\b", re.IGNORECASE)
+
+# Words that say nothing about which section feedback is aimed at
+STOP_WORDS = {
+    "about", "also", "article", "better", "could", "from", "have", "into", "just", "less", "make", "more",
+    "much", "part", "section", "should", "some", "than", "that", "their", "them", "then", "there", "these",
+    "they", "this", "very", "what", "when", "where", "which", "while", "with", "would", "your",
+}
+# Feedback wording that points at the first or last section whatever their headings are
+OPENING_WORDS = {"intro", "introduction", "opening", "beginning"}
+CLOSING_WORDS = {"conclusion", "ending", "closing", "outro"}
+# Closing headings also start "Summary" or "Final Thoughts"
+CLOSING_HEADING_WORDS = CLOSING_WORDS | {"summary", "final"}
+
+
+@dataclass
+class OutlineSection:
+    """One "## " section of an approved outline"""
+    title: str
+    points: str
+
+    @property
+    def heading(self) -> str:
+        """Article heading for the section: "Section 2: Costs" becomes "Costs" """
+        title = self.title.strip("*_ ").strip("[]")
+        return SECTION_NUMBER_PATTERN.sub("", title) or title
+
+
+def parse_outline_sections(outline: str) -> List[OutlineSection]:
+    """Split an outline into its "## " sections, in order, with the bullet points under each"""
+    matches = list(SECTION_HEADING_PATTERN.finditer(outline or ""))
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(outline)
+        sections.append(OutlineSection(title=match.group(1).strip(), points=outline[match.end():end].strip()))
+    return sections
+
+
+def clean_section(heading: str, text: str, seen: Set[str]) -> str:
+    """Consistency pass over one independently written section.
+
+    Drops top-level headings the writer added (the canonical heading is put back
+    in front) and paragraphs already used by an earlier section; `seen` carries
+    the normalized paragraphs of the sections before this one.
+    """
+    paragraphs = []
+    for paragraph in PARAGRAPH_BREAK_PATTERN.split(TOP_HEADING_PATTERN.sub("", text or "")):
+        paragraph = paragraph.strip()
+        normalized = " ".join(paragraph.lower().split())
+        if not paragraph or normalized in seen:
+            continue
+        seen.add(normalized)
+        paragraphs.append(paragraph)
+    return "\n\n".join([f"## {heading}"] + paragraphs)
+
+
+def has_body(text: str) -> bool:
+    """True if a written section has more than headings; a model stopped for safety or length can return nothing"""
+    return bool(TOP_HEADING_PATTERN.sub("", text or "").strip())
+
+
+def stitch_sections(sections: List[OutlineSection], texts: List[str]) -> str:
+    """Join section texts in outline order after the consistency pass"""
+    seen: Set[str] = set()
+    return "\n\n".join(clean_section(section.heading, text, seen) for section, text in zip(sections, texts))
+
+
+@dataclass
+class DraftSection:
+    """One "## " section of a written draft; `text` includes the heading line as written"""
+    title: str
+    text: str
+
+    @property
+    def heading(self) -> str:
+        return OutlineSection(self.title, "").heading
+
+    @property
+    def body(self) -> str:
+        return self.text.split("\n", 1)[1].strip() if "\n" in self.text else ""
+
+
+def split_draft_sections(draft: str) -> Tuple[str, List[DraftSection]]:
+    """Split a draft into (text before the first "## " heading, sections in order)"""
+    matches = list(SECTION_HEADING_PATTERN.finditer(draft or ""))
+    if not matches:
+        return (draft or "").strip(), []
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(draft)
+        sections.append(DraftSection(title=match.group(1).strip(), text=draft[match.start():end].strip()))
+    return draft[:matches[0].start()].strip(), sections
+
+
+def join_draft_sections(preamble: str, texts: List[str]) -> str:
+    return "\n\n".join(([preamble] if preamble else []) + texts)
+
+
+def _significant_words(text: str) -> Set[str]:
+    # Crude stemming so "threats" matches "Threat" and "costs" matches "Cost"
+    return {
+        word[:-1] if word.endswith("s") else word
+        for word in WORD_PATTERN.findall(text.lower())
+        if len(word) >= 4 and word not in STOP_WORDS
+    }
+
+
+def _leading_word(heading: str) -> str:
+    words = WORD_PATTERN.findall(OutlineSection(heading, "").heading.lower())
+    return words[0] if words else ""
+
+
+def is_opening_heading(heading: str) -> bool:
+    """True for an introduction heading, by its leading word: "Introduction: Why Solar Matters" """
+    return _leading_word(heading) in OPENING_WORDS
+
+
+def is_closing_heading(heading: str) -> bool:
+    """True for a conclusion heading, by its leading word: "Conclusion: Key Takeaways" """
+    return _leading_word(heading) in CLOSING_HEADING_WORDS
+
+
+def _numbered_section(number: int, sections: List[DraftSection]) -> Optional[int]:
+    """Index of "Section <number>", counting from the first section after an introduction"""
+    for i, section in enumerate(sections):
+        if re.match(rf"section\s+{number}\b", section.title.strip("*_ "), re.IGNORECASE):
+            return i
+    has_intro = bool(sections) and is_opening_heading(sections[0].title)
+    index = number if has_intro else number - 1
+    return index if 0 <= index < len(sections) else None
+
+
+def match_feedback_sections(feedback: str, sections: List[DraftSection]) -> List[int]:
+    """Indexes of the sections feedback is about, by heading words and intro/conclusion wording.
+
+    A section matches when at least half of its heading's significant words occur
+    in the feedback. An empty result means the feedback reads as article-wide.
+    """
+    words = _significant_words(feedback)
+    matched = set()
+    for i, section in enumerate(sections):
+        heading_words = _significant_words(section.heading)
+        if heading_words and len(heading_words & words) * 2 >= len(heading_words):
+            matched.add(i)
+    if sections and words & OPENING_WORDS:
+        matched.add(0)
+    if sections and words & CLOSING_WORDS:
+        matched.add(len(sections) - 1)
+    for reference in SECTION_REFERENCE_PATTERN.finditer(feedback):
+        index = _numbered_section(int(reference.group(1)), sections)
+        if index is not None:
+            matched.add(index)
+    return sorted(matched)
+
+
+def find_target_sections(targets: List[str], sections: List[DraftSection]) -> List[int]:
+    """Indexes of client-named sections (heading text, case-insensitive); raises ValueError for unknown names"""
+    by_name = {}
+    for i, section in enumerate(sections):
+        by_name.setdefault(section.title.strip("*_ ").lower(), i)
+        by_name.setdefault(section.heading.lower(), i)
+    indexes, unknown = set(), []
+    for target in targets:
+        index = by_name.get(target.strip().lstrip("#").strip().lower())
+        if index is None:
+            unknown.append(target)
+        else:
+            indexes.add(index)
+    if unknown:
+        raise ValueError(f"Unknown sections {unknown}; draft sections are {[section.heading for section in sections]}")
+    return sorted(indexes)
+
+
+def section_diff(before: str, after: str) -> List[str]:
+    """Unified diff of one section, line by line"""
+    return list(difflib.unified_diff(before.splitlines(), after.splitlines(), "before", "after", n=1, lineterm=""))
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Where the backup call of a hedged request goes: the same model, or the first model of the fallback chain
+HEDGE_TARGETS = ("same", "fallback")
+
+
+class LatencyTracker:
+    """Latencies of the last `window` successful model calls per stage"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, stage: str, seconds: float):
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def count(self, stage: str) -> int:
+        return len(self._samples.get(stage, ()))
+
+    def percentile(self, stage: str, percent: float) -> Optional[float]:
+        """Nearest-rank percentile in seconds, or None before any sample"""
+        samples = self._samples.get(stage)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))]
+
+
+class AttemptClock:
+    """When one attempt's model call is running, as opposed to waiting for a scheduler slot or backing off.
+
+    The attempt wraps each model call in `time()`; only that time counts towards
+    the stage's latency history and the hedge delay.
+    """
+
+    def __init__(self, on_success: Callable[[float], None]):
+        self.started: Optional[float] = None
+        self.calling = asyncio.Event()
+        self._on_success = on_success
+
+    async def time(self, call: Awaitable[T]) -> T:
+        self.started = time.perf_counter()
+        self.calling.set()
+        try:
+            result = await call
+            self._on_success(time.perf_counter() - self.started)
+            return result
+        finally:
+            self.started = None
+            self.calling.clear()
+
+
+def _is_good(result: Any) -> bool:
+    # An empty completion is no answer; keep waiting for the other attempt
+    return bool(getattr(result, "text", result))
+
+
+def _spent_tokens(result: Any) -> int:
+    return getattr(result, "prompt_tokens", 0) + getattr(result, "output_tokens", 0)
+
+
+def _retrieve(task: asyncio.Task):
+    # Mark a losing attempt's exception retrieved so it is not reported as unhandled
+    if not task.cancelled():
+        task.exception()
+
+
+class Hedger:
+    """Tail-latency control for model calls: hedged requests and a fallback chain.
+
+    A model call that has run longer than its stage's `percentile` latency
+    (over the last `window` calls, once `min_samples` are in) gets a backup
+    call to the same model or the first fallback; the first good answer wins
+    and the other attempt is cancelled. Time spent waiting for a scheduler slot
+    or backing off after throttling neither counts nor triggers a backup, and
+    no backup is sent to a model without a free slot (`has_capacity`). Backups
+    are capped at `max_rate` of calls per stage, so a slow provider is not hit
+    with twice the traffic. A call that fails outright moves on to the next
+    model of the chain.
+    """
+
+    def __init__(self, enabled: bool = False, percentile: float = 95, min_delay: float = 0.5,
+                 max_delay: float = 30.0, window: int = 200, min_samples: int = 20,
+                 max_rate: float = 0.1, target: str = "same", stages: Optional[Iterable[str]] = None,
+                 has_capacity: Optional[Callable[[str], bool]] = None):
+        if target not in HEDGE_TARGETS:
+            raise ValueError(f"Unknown hedge target '{target}'; expected one of {HEDGE_TARGETS}")
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.max_rate = max_rate
+        self.target = target
+        self.stages = set(stages) if stages else None
+        self.latency = LatencyTracker(window)
+        self.has_capacity = has_capacity
+        # Per-stage hedge allowance: every call earns max_rate, every backup spends 1, and at most
+        # max_rate of a window's calls can be saved up for a burst of slow calls
+        self._allowance: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _stage_stats(self, stage: str) -> Dict[str, float]:
+        stats = self._stats.get(stage)
+        if stats is None:
+            stats = self._stats[stage] = {
+                "calls": 0,
+                "hedged": 0,
+                "backup_wins": 0,
+                "hedge_skipped": 0,
+                "fallbacks": 0,
+                "failed": 0,
+                "extra_tokens": 0,
+            }
+        return stats
+
+    def hedge_delay(self, stage: str) -> Optional[float]:
+        """Seconds to wait before sending a backup, or None if the stage is not hedged (yet)"""
+        if not self.enabled or (self.stages is not None and stage not in self.stages):
+            return None
+        if self.latency.count(stage) < self.min_samples:
+            return None
+        return min(self.max_delay, max(self.min_delay, self.latency.percentile(stage, self.percentile)))
+
+    def _take_allowance(self, stage: str) -> bool:
+        if self._allowance.get(stage, 0.0) < 1:
+            return False
+        self._allowance[stage] -= 1
+        return True
+
+    async def run(self, stage: str, models: List[str], attempt: Callable[[str, AttemptClock], Awaitable[T]],
+                  estimated_tokens: int = 0) -> T:
+        """Run `attempt(model, clock)` along the chain `models`, hedging each model's call when it is slow"""
+        chain = list(dict.fromkeys(models))
+        stats = self._stage_stats(stage)
+        stats["calls"] += 1
+        self._allowance[stage] = min(max(1.0, self.max_rate * self.latency.window),
+                                     self._allowance.get(stage, 0.0) + self.max_rate)
+        for index, model in enumerate(chain):
+            backup = chain[index + 1] if self.target == "fallback" and index + 1 < len(chain) else model
+            try:
+                result = await self._hedged(stage, model, backup, attempt, estimated_tokens)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if index + 1 == len(chain):
+                    stats["failed"] += 1
+                    raise
+                stats["fallbacks"] += 1
+                logger.warning(f"Model {model} failed for {stage} ({type(e).__name__}), falling back to {chain[index + 1]}")
+                continue
+            return result
+
+    def _start(self, stage: str, model: str, attempt: Callable[[str, AttemptClock], Awaitable[T]]):
+        clock = AttemptClock(lambda seconds: self.latency.observe(stage, seconds))
+        task = asyncio.ensure_future(attempt(model, clock))
+        task.add_done_callback(_retrieve)
+        return task, clock
+
+    async def _outlasts(self, task: asyncio.Future, clock: AttemptClock, delay: float) -> bool:
+        """Wait until `task` finishes (False) or its model call has been running for `delay` seconds (True)"""
+        while not task.done():
+            if clock.started is None:
+                # Queued or backing off: a backup would only wait behind the same limits
+                waiter = asyncio.ensure_future(clock.calling.wait())
+                try:
+                    await asyncio.wait([task, waiter], return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    waiter.cancel()
+                continue
+            remaining = clock.started + delay - time.perf_counter()
+            if remaining <= 0:
+                return True
+            await asyncio.wait([task], timeout=remaining)
+        return False
+
+    async def _hedged(self, stage: str, model: str, backup: str, attempt: Callable[[str, AttemptClock], Awaitable[T]],
+                      estimated_tokens: int) -> T:
+        stats = self._stage_stats(stage)
+        primary, clock = self._start(stage, model, attempt)
+        tasks = [primary]
+        try:
+            delay = self.hedge_delay(stage)
+            if delay is None or not await self._outlasts(primary, clock, delay):
+                return await primary
+            if (self.has_capacity is not None and not self.has_capacity(backup)) or not self._take_allowance(stage):
+                stats["hedge_skipped"] += 1
+                return await primary
+
+            logger.debug(f"Hedging slow {stage} call on {model} after {delay * 1000:.0f} ms with {backup}")
+            stats["hedged"] += 1
+            # Input tokens are billed for the backup even when it loses
+            stats["extra_tokens"] += estimated_tokens
+            secondary, _ = self._start(stage, backup, attempt)
+            tasks.append(secondary)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and _is_good(task.result()):
+                        if task is secondary:
+                            stats["backup_wins"] += 1
+                        loser = primary if task is secondary else secondary
+                        if loser.done() and not loser.cancelled() and loser.exception() is None:
+                            stats["extra_tokens"] += _spent_tokens(loser.result())
+                        return task.result()
+            # Neither attempt gave a good answer: an empty answer beats an error, else the primary's error
+            for task in tasks:
+                if task.exception() is None:
+                    return task.result()
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        report = {"enabled": self.enabled, "percentile": self.percentile, "target": self.target, "stages": {}}
+        for stage, stats in self._stats.items():
+            delay = self.hedge_delay(stage)
+            report["stages"][stage] = {
+                **stats,
+                "hedge_rate": round(stats["hedged"] / stats["calls"], 4) if stats["calls"] else 0.0,
+                "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+                "p50_ms": self._percentile_ms(stage, 50),
+                "p99_ms": self._percentile_ms(stage, 99),
+            }
+        return report
+
+    def _percentile_ms(self, stage: str, percent: float) -> Optional[float]:
+        value = self.latency.percentile(stage, percent)
+        return round(value * 1000, 1) if value is not None else None
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from structured_logging import truncate_payload
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when a submission would exceed the job queue limit"""
+
+
+class Job:
+    """One end-to-end content job and its per-stage progress"""
+
+    def __init__(self, topic: str, stage_names: List[str], options: Dict[str, Any] = None):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.options = options or {}
+        self.status = "queued"
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.elapsed_ms: Optional[float] = None
+        self.stages = {name: {"status": "pending", "elapsed_ms": None} for name in stage_names}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._subscribers: List[asyncio.Queue] = []
+        self._task: Optional[asyncio.Task] = None
+        self._started = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_ms": self.elapsed_ms,
+            "stages": self.stages,
+            "error": self.error,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+    def _set_status(self, status: str, error: str = None):
+        self.status = status
+        self.error = error
+        if status == "running":
+            self._started = time.perf_counter()
+            self.started_at = datetime.now().isoformat()
+        elif status in FINISHED_STATUSES:
+            self.finished_at = datetime.now().isoformat()
+            if self._started:
+                self.elapsed_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        self.publish("job", {"id": self.id, "status": status, "error": error})
+
+    async def run_stage(self, name: str, work: Awaitable) -> Any:
+        """Await one stage, recording its status and timing and notifying subscribers"""
+        stage = self.stages.setdefault(name, {"status": "pending", "elapsed_ms": None})
+        stage["status"] = "running"
+        self.publish("stage", {"id": self.id, "stage": name, **stage})
+        started = time.perf_counter()
+        try:
+            result = await work
+            stage["status"] = "completed"
+            return result
+        except asyncio.CancelledError:
+            stage["status"] = "cancelled"
+            raise
+        except Exception as e:
+            stage["status"] = "failed"
+            stage["error"] = str(getattr(e, "detail", e))
+            raise
+        finally:
+            stage["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            self.publish("stage", {"id": self.id, "stage": name, **stage})
+
+
+class JobManager:
+    """Runs submitted jobs on a fixed number of worker tasks.
+
+    `runner` is the coroutine that performs a job's stages; it fills in
+    `job.result` and raises on failure. Finished jobs are kept, oldest dropped
+    first, up to `history_limit`.
+    """
+
+    def __init__(self, runner: Callable[[Job], Awaitable[None]], stage_names: List[str],
+                 concurrency: int = 2, queue_limit: int = 1000, history_limit: int = 1000):
+        self.runner = runner
+        self.stage_names = stage_names
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.history_limit = history_limit
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+        self._stopping = False
+
+    async def start(self):
+        self._stopping = False
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        logger.info(f"Job workers started (concurrency={self.concurrency})")
+
+    async def stop(self):
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @property
+    def alive(self) -> bool:
+        """True while every worker task is still running"""
+        return bool(self._workers) and not any(worker.done() for worker in self._workers)
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status != "queued":
+                    continue
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        self._running += 1
+        job._set_status("running")
+        job._task = asyncio.ensure_future(self.runner(job))
+        try:
+            await job._task
+            job._set_status("completed")
+        except asyncio.CancelledError:
+            job._set_status("cancelled")
+            if self._stopping:
+                raise
+        except Exception as e:
+            error = truncate_payload(str(getattr(e, "detail", e)))
+            logger.error(f"Job {job.id} failed: {error}")
+            job._set_status("failed", error)
+        finally:
+            self._running -= 1
+            job._task = None
+            job.publish("done", job.to_dict())
+
+    def _prune(self):
+        while len(self._jobs) > self.history_limit:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.finished:
+                break
+            del self._jobs[oldest_id]
+
+    def submit(self, topics: List[str], options: Dict[str, Any] = None) -> List[Job]:
+        if self._queue is None:
+            raise RuntimeError("Job workers are not running")
+        if self._queue.qsize() + len(topics) > self.queue_limit:
+            raise JobQueueFullError(f"Job queue is full ({self.queue_limit} queued jobs max)")
+        jobs = []
+        for topic in topics:
+            job = Job(topic, self.stage_names, options)
+            self._jobs[job.id] = job
+            self._queue.put_nowait(job)
+            jobs.append(job)
+        self._prune()
+        return jobs
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, status: str = None, limit: int = 100) -> List[Job]:
+        jobs = [job for job in reversed(self._jobs.values()) if status is None or job.status == status]
+        return jobs[:limit]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job._task is not None:
+            job._task.cancel()
+        else:
+            job._set_status("cancelled")
+            job.publish("done", job.to_dict())
+        return job
+
+    async def events(self, job: Job) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Current snapshot, then every stage/status change until the job finishes"""
+        if job.finished:
+            yield "done", job.to_dict()
+            return
+        queue: asyncio.Queue = asyncio.Queue()
+        job._subscribers.append(queue)
+        try:
+            yield "snapshot", job.to_dict(include_result=False)
+            while True:
+                event, data = await queue.get()
+                yield event, data
+                if event == "done":
+                    return
+        finally:
+            job._subscribers.remove(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "concurrency": self.concurrency,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "by_status": counts,
+        }
@@ -0,0 +1,152 @@
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from draft_sections import is_closing_heading, is_opening_heading, parse_outline_sections, split_draft_sections
+
+WORD_PATTERN = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)?")
+SENTENCE_END_PATTERN = re.compile(r"[.!?]+(?=\s|$)")
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+\S", re.MULTILINE)
+MARKDOWN_HEADING_PATTERN = re.compile(r"^[ \t]*#+[^\n]*$", re.MULTILINE)
+HEADING_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words per section the draft prompts ask for
+SECTION_WORDS = (100, 150)
+# Sentences longer than this are hard going for the beginner audience the prompts target
+LONG_SENTENCE_WORDS = 25
+# Segment length of the mean segmental type-token ratio, which unlike a plain ratio does not fall with length
+DIVERSITY_SEGMENT = 50
+
+
+def _words(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+def lexical_diversity(words: List[str], segment: int = DIVERSITY_SEGMENT) -> Optional[float]:
+    """Mean segmental type-token ratio: share of distinct words per `segment`-word run, averaged"""
+    if not words:
+        return None
+    if len(words) < segment:
+        return round(len(set(words)) / len(words), 3)
+    # The trailing partial segment is dropped; it would overstate diversity
+    runs = range(0, len(words) - segment + 1, segment)
+    return round(sum(len(set(words[start:start + segment])) for start in runs) / (len(runs) * segment), 3)
+
+
+def sentence_lengths(prose: str) -> List[int]:
+    """Whitespace-separated words per sentence"""
+    return [count for count in (len(sentence.split()) for sentence in SENTENCE_END_PATTERN.split(prose)) if count]
+
+
+def _heading_words(heading: str) -> Set[str]:
+    return set(HEADING_WORD_PATTERN.findall(heading.lower()))
+
+
+def heading_coverage(outline_headings: List[str], draft_headings: List[str]) -> Optional[float]:
+    """Share of outline headings found among the draft's headings (at least half their words in common)"""
+    if not outline_headings:
+        return None
+    draft_words = [_heading_words(heading) for heading in draft_headings]
+    covered = 0
+    for heading in outline_headings:
+        words = _heading_words(heading)
+        if any(words and len(words & candidate) * 2 >= len(words) for candidate in draft_words):
+            covered += 1
+    return round(covered / len(outline_headings), 3)
+
+
+class LocalScorer:
+    """Structural and readability checks that need no model call.
+
+    Each scored stage reports its features, the checks that failed and whether
+    it passed; a stage that fails is broken enough that an LLM evaluation would
+    only confirm it (empty research, an outline without its introduction or
+    conclusion, a draft far shorter than the prompts ask for).
+    """
+
+    def __init__(self, min_research_points: int = 2, min_draft_length_ratio: float = 0.5,
+                 min_heading_coverage: float = 0.5):
+        self.min_research_points = min_research_points
+        self.min_draft_length_ratio = min_draft_length_ratio
+        self.min_heading_coverage = min_heading_coverage
+
+    def score_research(self, research: str) -> Dict[str, Any]:
+        points = BULLET_PATTERN.findall(research) or [line for line in research.splitlines() if line.strip()]
+        words = _words(research)
+        features = {
+            "words": len(words),
+            "points": len(points),
+            "words_per_point": round(len(words) / len(points), 1) if points else 0.0,
+            "lexical_diversity": lexical_diversity(words),
+        }
+        checks = {"enough_points": len(points) >= self.min_research_points}
+        return self._result(features, checks)
+
+    def score_outline(self, outline: str) -> Dict[str, Any]:
+        sections = parse_outline_sections(outline)
+        headings = [section.heading for section in sections]
+        points = [len(BULLET_PATTERN.findall(section.points)) for section in sections]
+        has_introduction = bool(headings) and is_opening_heading(headings[0])
+        has_conclusion = bool(headings) and is_closing_heading(headings[-1])
+        body_sections = len(sections) - has_introduction - has_conclusion
+        features = {
+            "sections": len(sections),
+            "body_sections": body_sections,
+            "points": sum(points),
+            "points_per_section": round(sum(points) / len(points), 1) if points else 0.0,
+            "has_introduction": has_introduction,
+            "has_conclusion": has_conclusion,
+        }
+        checks = {"introduction": has_introduction, "conclusion": has_conclusion, "body_sections": body_sections > 0}
+        return self._result(features, checks)
+
+    def score_draft(self, draft: str, outline: str = "") -> Dict[str, Any]:
+        _, sections = split_draft_sections(draft)
+        section_words = [len(WORD_PATTERN.findall(section.body)) for section in sections]
+        prose = MARKDOWN_HEADING_PATTERN.sub("", draft)
+        words = _words(prose)
+        sentences = sentence_lengths(prose)
+        outline_headings = [section.heading for section in parse_outline_sections(outline or "")]
+        # The draft prompt does not ask for "## " headings; a draft without them is not checked for coverage
+        coverage = heading_coverage(outline_headings, [section.heading for section in sections]) if sections else None
+
+        low, high = SECTION_WORDS
+        expected_sections = len(outline_headings) or len(sections) or 1
+        features = {
+            "words": len(words),
+            "sections": len(sections),
+            "section_words": {
+                "min": min(section_words),
+                "mean": round(sum(section_words) / len(section_words), 1),
+                "max": max(section_words),
+            } if section_words else None,
+            "sections_in_range": round(sum(low <= count <= high for count in section_words) / len(section_words), 3)
+            if section_words else None,
+            "heading_coverage": coverage,
+            "avg_sentence_words": round(sum(sentences) / len(sentences), 1) if sentences else 0.0,
+            "long_sentence_share": round(sum(count > LONG_SENTENCE_WORDS for count in sentences) / len(sentences), 3)
+            if sentences else 0.0,
+            "lexical_diversity": lexical_diversity(words),
+        }
+        checks = {"length": len(words) >= self.min_draft_length_ratio * low * expected_sections}
+        if coverage is not None:
+            checks["heading_coverage"] = coverage >= self.min_heading_coverage
+        return self._result(features, checks)
+
+    def _result(self, features: Dict[str, Any], checks: Dict[str, bool]) -> Dict[str, Any]:
+        failed = [name for name, ok in checks.items() if not ok]
+        return {"passed": not failed, "failed_checks": failed, "features": features}
+
+    def score(self, content_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Local scores for every stage that has content, keyed like the LLM evaluations"""
+        scores = {}
+        if content_data.get("research_data"):
+            scores["research"] = self.score_research(str(content_data["research_data"]))
+        if content_data.get("approved_outline"):
+            scores["outline"] = self.score_outline(str(content_data["approved_outline"]))
+        if content_data.get("final_draft"):
+            scores["draft"] = self.score_draft(str(content_data["final_draft"]), str(content_data.get("approved_outline") or ""))
+        return scores
+
+    def score_batch(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Dict[str, Any]]]:
+        """`score` for each document in turn, e.g. before scheduling a batch of LLM evaluations"""
+        return [self.score(document) for document in documents]
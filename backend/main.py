@@ -1,28 +1,66 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Tuple, Optional, Callable, AsyncIterator, List
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+import asyncio
 import json
 import os
-import google.generativeai as genai
+import time
+import uuid
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
-import re
+from prompt_registry import PromptRegistry, PromptValidationError
+from model_clients import create_backend, ModelResponse
+from response_cache import ResponseCache, make_cache_key
+from jobs import Job, JobManager, JobQueueFullError
+from content_store import ContentStore, ContentStoreError, VersionConflictError
+from local_scorer import LocalScorer
+from score_parser import COMBINED_EVALUATION_STAGES, get_criteria, parse_scores
+from hedging import Hedger
+from model_scheduler import ModelScheduler, call_priority, is_retryable
+from singleflight import SingleFlight
+from prompt_budget import PromptBudget, compact_outline, compact_research, estimate_tokens
+from draft_sections import (
+    DraftSection, OutlineSection, clean_section, find_target_sections, has_body, join_draft_sections,
+    match_feedback_sections, parse_outline_sections, section_diff, split_draft_sections, stitch_sections
+)
+from structured_logging import describe_error, request_id_var, setup_logging, stage_var, truncate_payload, with_request_id
+from metrics import MetricsRegistry, add_request_timing, format_server_timing, request_timings, time_request_section
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: a background thread does the formatting and I/O (LOG_QUEUE), as text or
+# one JSON object per line (LOG_FORMAT=json); large payloads are truncated to LOG_MAX_PAYLOAD_CHARS
+# and only LOG_DEBUG_SAMPLE_RATE of DEBUG records are kept
+setup_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    fmt=os.getenv("LOG_FORMAT", "text"),
+    use_queue=os.getenv("LOG_QUEUE", "true").lower() in ("1", "true", "yes"),
+    debug_sample_rate=float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1")),
+    max_payload_chars=int(os.getenv("LOG_MAX_PAYLOAD_CHARS", "200"))
+)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm everything once per worker process, before it accepts requests"""
+    await run_startup()
+    try:
+        yield
+    finally:
+        await run_shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Content Creation & Evaluation API",
     description="AI-Powered Content Generation with Human-in-the-Loop Review",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -37,38 +75,327 @@ app.add_middleware(
 # Pydantic models for request/response
 class TopicRequest(BaseModel):
     topic: str
+    use_cache: bool = True
 
 class OutlineRequest(BaseModel):
     topic: str
     research_data: str
+    use_cache: bool = True
 
 class DraftRequest(BaseModel):
     outline: str
     research_data: str
+    mode: Optional[str] = None
+    use_cache: bool = True
 
 class RevisionRequest(BaseModel):
     draft: str
     feedback: str
+    mode: Optional[str] = None
+    target_sections: Optional[List[str]] = None
+    use_cache: bool = True
 
 class EvaluationRequest(BaseModel):
     content_data: Dict[str, Any]
+    mode: str = "separate"
+    local_policy: Optional[str] = None
+    use_cache: bool = True
+
+class BatchEvaluationItem(BaseModel):
+    id: Optional[str] = None
+    content_data: Dict[str, Any]
+
+class BatchEvaluationRequest(BaseModel):
+    items: List[BatchEvaluationItem]
+    mode: str = "separate"
+    local_policy: Optional[str] = None
+    concurrency: Optional[int] = None
+    use_cache: bool = True
+
+class CacheInvalidateRequest(BaseModel):
+    stage: Optional[str] = None
+
+class JobRequest(BaseModel):
+    topic: Optional[str] = None
+    topics: List[str] = []
+    use_cache: bool = True
+    save: bool = False
 
 class ContentSaveRequest(BaseModel):
     content_data: Dict[str, Any]
 
+class SessionCreateRequest(BaseModel):
+    topic: str = ""
+    content_data: Optional[Dict[str, Any]] = None
+
+class SessionUpdateRequest(BaseModel):
+    changes: Dict[str, Any] = {}
+    copy_fields: Dict[str, str] = {}
+    base_version: Optional[int] = None
+
+class SessionStepRequest(BaseModel):
+    version: Optional[int] = None
+    mode: Optional[str] = None
+    use_cache: bool = True
+
+class SessionRevisionRequest(SessionStepRequest):
+    feedback: str
+    target_sections: Optional[List[str]] = None
+
+class SessionEvaluationRequest(SessionStepRequest):
+    mode: str = "separate"
+    local_policy: Optional[str] = None
+
 # Global variables
 API_KEY = os.getenv("GOOGLE_API_KEY")
 MAX_TOKENS = int(os.getenv("GEMINI_MAX_TOKENS", "4096"))
 
+# Per-stage evaluation deadlines (seconds); a stage that misses its deadline falls back to default scores
+EVALUATION_TIMEOUT = float(os.getenv("EVALUATION_TIMEOUT", "30"))
+EVALUATION_TIMEOUTS = {
+    "research": float(os.getenv("EVALUATION_TIMEOUT_RESEARCH", EVALUATION_TIMEOUT)),
+    "outline": float(os.getenv("EVALUATION_TIMEOUT_OUTLINE", EVALUATION_TIMEOUT)),
+    "draft": float(os.getenv("EVALUATION_TIMEOUT_DRAFT", EVALUATION_TIMEOUT)),
+    "combined": float(os.getenv("EVALUATION_TIMEOUT_COMBINED", EVALUATION_TIMEOUT)),
+}
+
+# "separate" makes one model call per stage, "combined" scores all three stages in one call
+EVALUATION_MODES = ("separate", "combined")
+
+# Batch evaluation: default and maximum number of documents evaluated at once
+EVALUATION_BATCH_CONCURRENCY = int(os.getenv("EVALUATION_BATCH_CONCURRENCY", "8"))
+EVALUATION_BATCH_MAX_CONCURRENCY = int(os.getenv("EVALUATION_BATCH_MAX_CONCURRENCY", "32"))
+
+# Local pre-scoring (structure and readability, no model call): "off", "report" (returned as
+# local_scores next to the LLM scores) or "skip" (also skip the LLM call for stages that fail
+# their local checks; they get null criterion scores and the status "skipped")
+LOCAL_SCORE_POLICIES = ("off", "report", "skip")
+LOCAL_SCORE_POLICY = os.getenv("LOCAL_SCORE_POLICY", "report")
+local_scorer = LocalScorer(
+    min_research_points=int(os.getenv("LOCAL_MIN_RESEARCH_POINTS", "2")),
+    min_draft_length_ratio=float(os.getenv("LOCAL_MIN_DRAFT_LENGTH_RATIO", "0.5")),
+    min_heading_coverage=float(os.getenv("LOCAL_MIN_HEADING_COVERAGE", "0.5"))
+)
+
 if not API_KEY:
     logger.error("GOOGLE_API_KEY not found in environment variables")
 
+# Model selection: one generation and one evaluation model, overridable per stage
+# (GEMINI_MODEL_<STAGE>, e.g. GEMINI_MODEL_DRAFT or GEMINI_MODEL_DRAFT_EVALUATION)
+GENERATION_MODEL = os.getenv("GEMINI_GENERATION_MODEL", "gemini-2.5-flash-preview-05-20")
+EVALUATION_MODEL = os.getenv("GEMINI_EVALUATION_MODEL", "gemini-1.5-flash-latest")
+STAGE_MODELS = {
+    stage: os.getenv(f"GEMINI_MODEL_{stage.upper()}", default)
+    for stage, default in {
+        "research": GENERATION_MODEL,
+        "outline": GENERATION_MODEL,
+        "draft": GENERATION_MODEL,
+        "draft_section": GENERATION_MODEL,
+        "draft_revision": GENERATION_MODEL,
+        "section_revision": GENERATION_MODEL,
+        "research_evaluation": EVALUATION_MODEL,
+        "outline_evaluation": EVALUATION_MODEL,
+        "draft_evaluation": EVALUATION_MODEL,
+        "combined_evaluation": EVALUATION_MODEL,
+    }.items()
+}
+
+# Fallback chain: models tried in order when a call still fails after the scheduler's retries,
+# comma-separated (GEMINI_FALLBACK_MODELS, per stage GEMINI_FALLBACK_MODELS_<STAGE>), e.g. the evaluation model
+FALLBACK_MODELS = [model.strip() for model in os.getenv("GEMINI_FALLBACK_MODELS", "").split(",") if model.strip()]
+STAGE_FALLBACK_MODELS = {
+    stage: [model.strip() for model in os.getenv(f"GEMINI_FALLBACK_MODELS_{stage.upper()}", "").split(",") if model.strip()]
+    or FALLBACK_MODELS
+    for stage in STAGE_MODELS
+}
+
+# Draft generation: "single" writes the article in one call, "sections" writes each "## "
+# section of the outline concurrently and stitches them (falls back to single for < 2 sections)
+DRAFT_MODES = ("single", "sections")
+DRAFT_MODE = os.getenv("DRAFT_MODE", "single")
+
+# Revision: "full" rewrites the whole draft, "sections" rewrites only the "## " sections the
+# feedback is about (or target_sections) and falls back to full for article-wide feedback
+REVISION_MODES = ("full", "sections")
+REVISION_MODE = os.getenv("REVISION_MODE", "full")
+
+# Model backend: "gemini" for the real API, "fake" for deterministic offline runs.
+# FAKE_MODEL_* shape the fake backend's latency and injected faults (see benchmarks/load_test.py)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini")
+FAKE_MODEL_OPTIONS = {
+    "latency_ms": float(os.getenv("FAKE_MODEL_LATENCY_MS", "0")),
+    "latency_distribution": os.getenv("FAKE_MODEL_LATENCY_DISTRIBUTION", "fixed"),
+    "output_words": int(os.getenv("FAKE_MODEL_OUTPUT_WORDS", "120")),
+    "malformed_rate": float(os.getenv("FAKE_MODEL_MALFORMED_RATE", "0")),
+    "throttle_rate": float(os.getenv("FAKE_MODEL_THROTTLE_RATE", "0")),
+    "error_rate": float(os.getenv("FAKE_MODEL_ERROR_RATE", "0")),
+}
+model_backend = create_backend(
+    MODEL_BACKEND,
+    api_key=API_KEY,
+    **(FAKE_MODEL_OPTIONS if MODEL_BACKEND == "fake" else {})
+)
+
+# Response cache: in-process LRU with TTL, plus an optional on-disk tier (RESPONSE_CACHE_DIR)
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    disk_dir=os.getenv("RESPONSE_CACHE_DIR") or None,
+    disk_ttl=float(os.getenv("RESPONSE_CACHE_DISK_TTL", str(7 * 24 * 3600))),
+    enabled=os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+)
+
+# Outbound scheduler: per-model concurrency and rate limits, backoff on 429/503.
+# MODEL_LIMITS overrides per model, e.g. {"gemini-1.5-flash-latest": {"concurrency": 16, "rpm": 1000, "tpm": 1000000}}
+model_scheduler = ModelScheduler(
+    concurrency=int(os.getenv("MODEL_MAX_CONCURRENCY", "8")),
+    rpm=float(os.getenv("MODEL_RPM", "0")),
+    tpm=float(os.getenv("MODEL_TPM", "0")),
+    model_limits=json.loads(os.getenv("MODEL_LIMITS", "{}")),
+    max_retries=int(os.getenv("MODEL_MAX_RETRIES", "4")),
+    backoff_base=float(os.getenv("MODEL_BACKOFF_BASE", "1.0")),
+    backoff_max=float(os.getenv("MODEL_BACKOFF_MAX", "30"))
+)
+
+# Hedged requests (MODEL_HEDGING=true): a call running past its stage's MODEL_HEDGE_PERCENTILE latency
+# over the last MODEL_HEDGE_WINDOW calls gets a backup call to the same model, or with
+# MODEL_HEDGE_TARGET=fallback to the first fallback model; the first good answer wins and the other is
+# cancelled. MODEL_HEDGE_MAX_RATE caps backups as a share of calls; MODEL_HEDGE_STAGES limits the stages.
+model_hedger = Hedger(
+    enabled=os.getenv("MODEL_HEDGING", "false").lower() in ("1", "true", "yes"),
+    percentile=float(os.getenv("MODEL_HEDGE_PERCENTILE", "95")),
+    min_delay=float(os.getenv("MODEL_HEDGE_MIN_DELAY", "0.5")),
+    max_delay=float(os.getenv("MODEL_HEDGE_MAX_DELAY", "30")),
+    window=int(os.getenv("MODEL_HEDGE_WINDOW", "200")),
+    min_samples=int(os.getenv("MODEL_HEDGE_MIN_SAMPLES", "20")),
+    max_rate=float(os.getenv("MODEL_HEDGE_MAX_RATE", "0.1")),
+    target=os.getenv("MODEL_HEDGE_TARGET", "same"),
+    stages=[stage.strip() for stage in os.getenv("MODEL_HEDGE_STAGES", "").split(",") if stage.strip()] or None,
+    has_capacity=model_scheduler.has_capacity
+)
+
+# Metrics served on /metrics in the Prometheus text format.
+# SERVER_TIMING=true also reports a per-request model/cache/total breakdown in a Server-Timing header.
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+metrics = MetricsRegistry()
+HTTP_REQUESTS = metrics.counter("http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+HTTP_LATENCY = metrics.histogram("http_request_duration_seconds", "Time until response headers are sent, by route", ["method", "route"])
+MODEL_CALLS = metrics.counter("model_calls_total", "Model call attempts by outcome (ok, error, cancelled)", ["stage", "model", "outcome"])
+MODEL_LATENCY = metrics.histogram("model_call_duration_seconds", "Model call latency, excluding scheduler wait", ["stage", "model"])
+MODEL_ERRORS = metrics.counter("model_errors_total", "Failed model call attempts by error type", ["stage", "model", "error"])
+MODEL_TOKENS = metrics.counter("model_tokens_total", "Tokens reported by the model's usage metadata", ["stage", "model", "direction"])
+MODEL_COALESCED = metrics.counter("model_calls_coalesced_total", "Calls served by joining an identical in-flight model call", ["stage"])
+PROMPT_TOKENS = metrics.counter("prompt_input_tokens_total", "Input tokens of rendered generation prompts", ["stage"])
+PROMPT_TOKENS_SAVED = metrics.counter("prompt_tokens_saved_total", "Input tokens removed by prompt compaction", ["stage"])
+PROMPT_COMPACTIONS = metrics.counter("prompt_compactions_total", "Prompts compacted to fit their stage's input budget", ["stage"])
+CACHE_LOOKUPS = metrics.counter("response_cache_lookups_total", "Response cache lookups (hit, miss, bypass)", ["stage", "result"])
+EVALUATION_PARSES = metrics.counter("evaluation_parse_total", "Score parse strategy that succeeded, or failed", ["evaluation_type", "strategy"])
+EVALUATION_RESULTS = metrics.counter("evaluation_results_total", "Evaluation outcomes (ok, defaulted, throttled, timeout)", ["evaluation_type", "status"])
+metrics.gauge("model_in_flight", "Model calls currently holding a scheduler slot", ["model"],
+              lambda: [((model,), lane["in_flight"]) for model, lane in model_scheduler.stats().items()])
+metrics.gauge("model_concurrency_limit", "Current adaptive concurrency limit per model", ["model"],
+              lambda: [((model,), lane["concurrency_limit"]) for model, lane in model_scheduler.stats().items()])
+metrics.gauge("model_queue_depth", "Model calls waiting for a scheduler slot", ["model", "priority"],
+              lambda: [((model, priority), depth) for model, lane in model_scheduler.stats().items()
+                       for priority, depth in lane["queue_depth"].items()])
+def hedge_counter(name: str, documentation: str, field: str):
+    metrics.callback_counter(name, documentation, ["stage"],
+                             lambda: [((stage,), stats[field]) for stage, stats in model_hedger.stats()["stages"].items()])
+
+hedge_counter("model_hedged_calls_total", "Model calls that sent a backup call, by stage", "hedged")
+hedge_counter("model_hedge_backup_wins_total", "Hedged calls answered by the backup call, by stage", "backup_wins")
+hedge_counter("model_hedge_extra_tokens_total", "Estimated tokens spent on the extra call of hedged requests, by stage", "extra_tokens")
+hedge_counter("model_fallback_calls_total", "Calls moved to the next model of the fallback chain, by stage", "fallbacks")
+metrics.gauge("jobs", "Pipeline jobs by state", ["state"],
+              lambda: [(("queued",), job_manager.stats()["queued"]), (("running",), job_manager.stats()["running"])])
+
+def record_model_call(stage: str, model: str, started: float, outcome: str,
+                      response: Optional[ModelResponse] = None, error: Optional[Exception] = None):
+    """Record latency, outcome and token usage of one model call attempt"""
+    elapsed = time.perf_counter() - started
+    MODEL_LATENCY.observe(elapsed, stage=stage, model=model)
+    MODEL_CALLS.inc(stage=stage, model=model, outcome=outcome)
+    add_request_timing("model", elapsed * 1000)
+    if error is not None:
+        MODEL_ERRORS.inc(stage=stage, model=model, error=type(error).__name__)
+    if response is not None:
+        MODEL_TOKENS.inc(response.prompt_tokens, stage=stage, model=model, direction="input")
+        MODEL_TOKENS.inc(response.output_tokens, stage=stage, model=model, direction="output")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Model call finished", extra={
+            "stage": stage,
+            "model": model,
+            "outcome": outcome,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "prompt_tokens": response.prompt_tokens if response else None,
+            "output_tokens": response.output_tokens if response else None,
+        })
+
+async def timed_generate(stage: str, model: str, prompt: str, generation_config: Dict[str, Any]) -> ModelResponse:
+    """One backend call, instrumented"""
+    started = time.perf_counter()
+    try:
+        response = await model_backend.generate(model, prompt, generation_config)
+    except asyncio.CancelledError:
+        record_model_call(stage, model, started, "cancelled")
+        raise
+    except Exception as e:
+        record_model_call(stage, model, started, "error", error=e)
+        raise
+    record_model_call(stage, model, started, "ok", response=response)
+    return response
+
+# Identical model calls in flight at the same time (same cache key) share one upstream request
+single_flight = SingleFlight()
+
+# Prompt budgeting: per-stage output budgets (GEMINI_MAX_TOKENS_<STAGE>) and input budgets
+# (PROMPT_TOKEN_BUDGET, PROMPT_TOKEN_BUDGET_<STAGE>); prompts over budget are compacted.
+# PROMPT_TOKEN_COUNT=model asks the model's token counter when the local estimate is near the budget.
+# Output budgets default to GEMINI_MAX_TOKENS: thinking models count their thinking tokens against
+# max_output_tokens, so a tight per-stage limit (e.g. 1024 for research) is opt-in, not the default.
+STAGE_OUTPUT_TOKENS = {
+    stage: int(os.getenv(f"GEMINI_MAX_TOKENS_{stage.upper()}", str(MAX_TOKENS)))
+    for stage in ["research", "outline", "draft", "draft_section", "draft_revision", "section_revision"]
+}
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "8000"))
+STAGE_INPUT_BUDGETS = {
+    stage: int(os.getenv(f"PROMPT_TOKEN_BUDGET_{stage.upper()}", str(PROMPT_TOKEN_BUDGET)))
+    for stage in STAGE_OUTPUT_TOKENS
+}
+# Fields each stage may shrink when over budget, tried in order
+PROMPT_COMPACTORS = {
+    "outline": {"research_data": compact_research},
+    "draft": {"research_data": compact_research},
+    "draft_section": {"research_data": compact_research, "outline": compact_outline},
+}
+prompt_budget = PromptBudget(
+    STAGE_INPUT_BUDGETS,
+    STAGE_OUTPUT_TOKENS,
+    default_input_budget=PROMPT_TOKEN_BUDGET,
+    default_output_budget=MAX_TOKENS,
+    count_tokens=model_backend.count_tokens if os.getenv("PROMPT_TOKEN_COUNT", "local") == "model" else None
+)
+
+def estimate_prompt_tokens(prompt: str) -> int:
+    """Local input token count used to pace the tokens-per-minute budget before the real usage is known"""
+    return estimate_tokens(prompt)
+
+def get_stage_model(stage: str) -> str:
+    """Model configured for a generation stage or a "<type>_evaluation" stage"""
+    return STAGE_MODELS.get(stage, EVALUATION_MODEL if stage.endswith("_evaluation") else GENERATION_MODEL)
+
+def get_model_chain(stage: str, model: str) -> List[str]:
+    """The model to call first, then the stage's fallback models"""
+    return [model, *STAGE_FALLBACK_MODELS.get(stage, FALLBACK_MODELS)]
+
 # Default prompts for content generation
 DEFAULT_PROMPTS = {
     "research": "You are a research assistant. Your task is to gather key information on the topic: {topic}.\nProvide 3-5 concise bullet points summarizing the most relevant facts or insights.\nUse simple language and focus on general knowledge (no external sources needed).",
     "outline": "You are a content creation assistant. Create a structured and comprehensive article outline for the topic: {topic}.\nUse this provided research: {research_data}.\nFollow this format, ensuring all key aspects from the research are covered and presented logically:\n# Article Outline\n## Introduction\n- Brief overview of the topic and its importance\n- What the reader will learn\n## Section 1: [Clear, Descriptive Section Title reflecting a core concept]\n- Key point 1 (elaborate slightly to ensure completeness)\n- Key point 2 (elaborate slightly to ensure completeness)\n## Section 2: [Clear, Descriptive Section Title reflecting another core concept]\n- Key point 1 (elaborate slightly to ensure completeness)\n- Key point 2 (elaborate slightly to ensure completeness)\n## Conclusion\n- Summary of key takeaways and their relevance\n- A concluding thought or call to action (if applicable)\nKeep it clear, logical, and concise. Use simple words for a beginner audience.",
     "draft": "You are a content writer. Write a full article based on the approved outline: {outline}.\nUse the research: {research_data}.\nWrite in a friendly, conversational tone suitable for beginners.\nEach section should be 2-3 short paragraphs (100-150 words total per section).\nInclude simple examples from daily life. Avoid technical jargon and ensure clarity.",
-    "draft_revision": "You are a content writer. Revise the following article draft based on this feedback: {feedback}\nDraft: {draft}\nKeep the friendly, conversational tone suitable for beginners. Ensure the revised draft addresses the feedback while maintaining clarity and avoiding technical jargon."
+    "draft_section": "You are a content writer working on one section of an article; other writers are writing the remaining sections at the same time.\nThe approved outline of the whole article is: {outline}.\nUse the research: {research_data}.\nWrite only the section \"{section_title}\" ({section_position}), covering these points:\n{section_points}\nDo not add a heading, and do not introduce or wrap up the whole article unless this section is the introduction or conclusion.\nWrite in a friendly, conversational tone suitable for beginners, in 2-3 short paragraphs (100-150 words total).\nInclude simple examples from daily life. Avoid technical jargon and ensure clarity.",
+    "draft_revision": "You are a content writer. Revise the following article draft based on this feedback: {feedback}\nDraft: {draft}\nKeep the friendly, conversational tone suitable for beginners. Ensure the revised draft addresses the feedback while maintaining clarity and avoiding technical jargon.",
+    "section_revision": "You are a content writer. Revise one section of an article based on this feedback: {feedback}\nThe article's sections are:\n{headings}\nRevise only the section \"{section_title}\":\n{section}\nReturn only the revised section text, without its heading. Keep the friendly, conversational tone suitable for beginners. Address the feedback where it applies to this section while maintaining clarity and avoiding technical jargon."
 }
 
 # Evaluation prompts
@@ -114,22 +441,61 @@ Criteria:
 
 Respond with only this JSON format:
 {{"quality": 8, "coherence": 9, "engagement": 7}}
+""",
+    
+    "combined_evaluation": """
+Rate this content from 1 to 10 for each criterion:
+
+TOPIC: {topic}
+RESEARCH DATA: {research_data}
+OUTLINE: {outline}
+DRAFT: {draft}
+
+Criteria:
+- depth: How comprehensive and detailed the research is (1=very shallow, 10=very comprehensive)
+- relevance: How relevant the research is to the topic (1=not relevant, 10=highly relevant)
+- credibility: How trustworthy the research is (1=questionable, 10=very credible)
+- flow: Logical progression of the outline (1=confusing, 10=excellent flow)
+- completeness: Outline coverage of the topic (1=missing key points, 10=comprehensive)
+- clarity: Outline structure clarity (1=unclear, 10=very clear)
+- quality: Overall writing quality of the draft (1=poor, 10=excellent)
+- coherence: Draft ideas flow together (1=disconnected, 10=very coherent)
+- engagement: Draft reader interest level (1=boring, 10=very engaging)
+
+Respond with only this flat JSON format:
+{{"depth": 8, "relevance": 9, "credibility": 7, "flow": 8, "completeness": 9, "clarity": 7, "quality": 8, "coherence": 9, "engagement": 7}}
 """
 }
 
 
 DEFAULT_PROMPTS.update(EVALUATION_PROMPTS)
 
+# Placeholders each generation template must use (and the only ones it may use)
+PROMPT_PLACEHOLDERS = {
+    "research": {"topic"},
+    "outline": {"topic", "research_data"},
+    "draft": {"outline", "research_data"},
+    "draft_section": {"outline", "research_data", "section_title", "section_points", "section_position"},
+    "draft_revision": {"draft", "feedback"},
+    "section_revision": {"feedback", "headings", "section_title", "section"},
+}
+
+PROMPTS_FILE = os.getenv("PROMPTS_FILE", "prompt.json")
+PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", "1.0"))
+
+prompt_registry = PromptRegistry(
+    PROMPTS_FILE,
+    defaults=DEFAULT_PROMPTS,
+    overrides=EVALUATION_PROMPTS,
+    placeholders=PROMPT_PLACEHOLDERS,
+    check_interval=PROMPT_RELOAD_INTERVAL
+)
+
 # EVALUATION HELPER FUNCTIONS
 
 def get_evaluation_keywords(evaluation_type: str) -> list:
     """Get the expected keywords for each evaluation type"""
-    keywords_map = {
-        "research": ["depth", "relevance", "credibility"],
-        "outline": ["flow", "completeness", "clarity"],
-        "draft": ["quality", "coherence", "engagement"]
-    }
-    return keywords_map.get(evaluation_type, ["depth", "relevance", "credibility"])
+    return get_criteria(evaluation_type)
 
 def get_default_scores(evaluation_type: str) -> Dict[str, int]:
     """Return reasonable default scores when evaluation fails"""
@@ -138,6 +504,8 @@ def get_default_scores(evaluation_type: str) -> Dict[str, int]:
         "outline": {"flow": 6, "completeness": 7, "clarity": 6},
         "draft": {"quality": 6, "coherence": 6, "engagement": 6}
     }
+    if evaluation_type == "combined":
+        return {key: value for stage in COMBINED_EVALUATION_STAGES for key, value in defaults[stage].items()}
     return defaults.get(evaluation_type, {"depth": 6, "relevance": 6, "credibility": 6})
 
 def validate_evaluation_result(result: Dict, evaluation_type: str) -> bool:
@@ -145,6 +513,10 @@ def validate_evaluation_result(result: Dict, evaluation_type: str) -> bool:
     if not isinstance(result, dict):
         return False
     
+    # Combined results may also come back nested per stage: {"research": {...}, "outline": {...}, ...}
+    if evaluation_type == "combined" and all(isinstance(result.get(stage), dict) for stage in COMBINED_EVALUATION_STAGES):
+        return all(validate_evaluation_result(result[stage], stage) for stage in COMBINED_EVALUATION_STAGES)
+    
     expected_keys = get_evaluation_keywords(evaluation_type)
     
     # Check if all expected keys are present
@@ -159,130 +531,410 @@ def validate_evaluation_result(result: Dict, evaluation_type: str) -> bool:
     
     return True
 
-def clean_response_text(text: str) -> str:
-    """Clean common formatting issues in Gemini responses"""
-    # Remove markdown code blocks
-    text = re.sub(r'\n?```', '', text)
-    
-    # Remove extra whitespace and newlines
-    text = re.sub(r'\s+', ' ', text)
-    text = text.strip()
-    
-    # Remove any leading/trailing non-JSON text
-    start = text.find('{')
-    end = text.rfind('}') + 1
-    if start != -1 and end != 0 and end > start:
-        text = text[start:end]
-    
-    return text
+def split_combined_scores(result: Dict) -> Dict[str, Dict[str, int]]:
+    """Split a validated combined result (flat or nested) into per-stage scores"""
+    split = {}
+    for stage in COMBINED_EVALUATION_STAGES:
+        source = result[stage] if isinstance(result.get(stage), dict) else result
+        split[stage] = {key: source[key] for key in get_evaluation_keywords(stage)}
+    return split
 
-def extract_scores_by_keywords(text: str, evaluation_type: str) -> Dict[str, int]:
-    """Extract scores by looking for keyword-score pairs when JSON parsing fails"""
-    keywords = get_evaluation_keywords(evaluation_type)
-    result = {}
-    
-    for keyword in keywords:
-        # Look for patterns like "depth": 8 or "depth" : 8 or depth: 8
-        patterns = [
-            rf'"{keyword}"\s*:\s*(\d+)',
-            rf"'{keyword}'\s*:\s*(\d+)",
-            rf'{keyword}\s*:\s*(\d+)',
-            rf'{keyword}.*?(\d+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                score = int(match.group(1))
-                if 1 <= score <= 10:
-                    result[keyword] = score
-                    break
-    
-    # If we found all required keywords, return the result
-    if len(result) == len(keywords):
-        return result
-    
-    return None
+def extract_scores_with_strategy(raw_text: str, evaluation_type: str) -> Tuple[Optional[Dict[str, int]], str]:
+    """Parse scores from a Gemini response, also reporting which parse strategy succeeded ("failed" if none)"""
+    return parse_scores(raw_text, get_evaluation_keywords(evaluation_type))
 
 def extract_json_from_response(raw_text: str, evaluation_type: str) -> Dict[str, int]:
-    """Multiple strategies to extract JSON from Gemini response"""
-    if not raw_text:
-        return None
-    
-    # Strategy 1: Clean and parse direct JSON
-    try:
-        cleaned = clean_response_text(raw_text)
-        if cleaned.startswith('{') and cleaned.endswith('}'):
-            return json.loads(cleaned)
-    except:
-        pass
-    
-    # Strategy 2: Extract JSON using regex patterns
-    json_patterns = [
-        r'\{[^{}]*\}',  # Simple JSON object
-        r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}',  
-    ]
-    
-    for pattern in json_patterns:
-        matches = re.findall(pattern, raw_text, re.DOTALL)
-        for match in matches:
-            try:
-                cleaned_match = clean_response_text(match)
-                result = json.loads(cleaned_match)
-                if validate_evaluation_result(result, evaluation_type):
-                    return result
-            except:
-                continue
-    
-    # Strategy 3: Extract scores using keyword patterns
-    return extract_scores_by_keywords(raw_text, evaluation_type)
+    """Extract the expected scores from fenced JSON, relaxed JSON or key: value text"""
+    return extract_scores_with_strategy(raw_text, evaluation_type)[0]
 
 
 # GEMINI API FUNCTIONS
 
 
-# Load prompts from file or use defaults
+# Load prompts from the in-memory registry (re-reads prompt.json only when it changes)
 def load_prompts():
+    return prompt_registry.get()
+
+async def render_prompt(stage: str, **fields) -> Tuple[str, Dict[str, Any]]:
+    """Render a generation prompt within its stage's token budget; returns (prompt, budget report)"""
+    prompt, report = await prompt_budget.fit(
+        stage, get_stage_model(stage), load_prompts()[stage], fields, PROMPT_COMPACTORS.get(stage)
+    )
+    PROMPT_TOKENS.inc(report["input_tokens"], stage=stage)
+    if report["compacted"]:
+        PROMPT_COMPACTIONS.inc(stage=stage)
+        PROMPT_TOKENS_SAVED.inc(report["tokens_saved"], stage=stage)
+    return prompt, report
+
+# Cached model call shared by generation and evaluation
+async def generate_text(stage: str, prompt: str, generation_config: Dict[str, Any], model: str = None,
+                        use_cache: bool = True, prompt_version: str = None,
+                        accept: Callable[[ModelResponse], bool] = None) -> ModelResponse:
+    """Call the model for a stage, serving identical requests from the response cache.
+
+    use_cache=False skips the lookup but still refreshes the cache with the new
+    response. `accept` can veto caching a response (e.g. unparseable evaluations).
+    Concurrent identical calls are coalesced into one, cached or not.
+    """
+    model = model or get_stage_model(stage)
+    key = make_cache_key(stage, model, generation_config, prompt, prompt_version)
+    if use_cache:
+        with time_request_section("cache"):
+            cached = await response_cache.get(stage, key)
+        CACHE_LOOKUPS.inc(stage=stage, result="miss" if cached is None else "hit")
+        if cached is not None:
+            return ModelResponse(**cached)
+    else:
+        response_cache.record_bypass()
+        CACHE_LOOKUPS.inc(stage=stage, result="bypass")
+    
+    async def call_model() -> ModelResponse:
+        # Runs in its own task (see SingleFlight), so the stage stays scoped to this call's log records
+        stage_var.set(stage)
+        estimated_tokens = estimate_prompt_tokens(prompt)
+        # Each attempt (primary, hedge backup or fallback) goes through the scheduler on its own model;
+        # the clock times only the model call itself, not the slot wait or retry backoff
+        response = await model_hedger.run(
+            stage,
+            get_model_chain(stage, model),
+            lambda attempt_model, clock: model_scheduler.run(
+                attempt_model,
+                lambda: clock.time(timed_generate(stage, attempt_model, prompt, generation_config)),
+                estimated_tokens=estimated_tokens
+            ),
+            estimated_tokens=estimated_tokens
+        )
+        # The key names the requested model; a fallback model's answer is served but not cached under it
+        if response.text and response.model == model and (accept is None or accept(response)):
+            await response_cache.set(stage, key, asdict(response))
+        return response
+    
+    response, coalesced = await single_flight.do(key, call_model)
+    if coalesced:
+        MODEL_COALESCED.inc(stage=stage)
+    return response
+
+# Standard Gemini API call for content generation
+async def call_gemini(prompt: str, stage: str = "draft", model: str = None, use_cache: bool = True):
     try:
-        if os.path.exists("prompt.json"):
-            with open("prompt.json", "r") as f:
-                loaded_prompts = json.load(f)
-                # Merge with evaluation prompts
-                loaded_prompts.update(EVALUATION_PROMPTS)
-                return loaded_prompts
-        return DEFAULT_PROMPTS
+        response = await generate_text(
+            stage,
+            prompt,
+            {"max_output_tokens": prompt_budget.output_budget(stage)},
+            model=model,
+            use_cache=use_cache,
+            prompt_version=prompt_registry.version
+        )
+        return response.text
     except Exception as e:
-        logger.error(f"Error loading prompts: {str(e)}")
-        return DEFAULT_PROMPTS
+        logger.error(f"Error calling Gemini API: {describe_error(e)}", extra={"stage": stage})
+        if is_retryable(e):
+            raise HTTPException(status_code=503, detail=f"AI model is rate limited, please retry: {truncate_payload(str(e))}")
+        raise HTTPException(status_code=500, detail=f"AI model error: {truncate_payload(str(e))}")
+
+# Field each generation stage returns its text under
+STAGE_RESULT_KEYS = {
+    "research": "research_data",
+    "outline": "outline",
+    "draft": "draft",
+    "draft_revision": "revised_draft",
+}
 
-# Standard Gemini API call for content generation
-async def call_gemini(prompt: str, model: str = "gemini-2.5-flash-preview-05-20"):
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def parse_sse(event: str) -> Tuple[str, Dict[str, Any]]:
+    """Decode one event written by format_sse"""
+    name, data = event.split("\n", 1)
+    return name[len("event: "):], json.loads(data[len("data: "):])
+
+async def stream_gemini(prompt: str, stage: str, use_cache: bool = True) -> AsyncIterator[str]:
+    """Stream a generation stage as SSE: "chunk" events as text arrives, then "done" with the full text.
+
+    A cache hit is replayed as a single chunk; a completed stream is stored in the
+    cache like a regular call. Failures are reported as an "error" event since the
+    HTTP status has already been sent.
+    """
+    model = get_stage_model(stage)
+    generation_config = {"max_output_tokens": prompt_budget.output_budget(stage)}
+    prompt_version = prompt_registry.version
+    key = make_cache_key(stage, model, generation_config, prompt, prompt_version)
+    started = time.perf_counter()
+    metadata = {"stage": stage, "model": model, "prompt_version": prompt_version}
     try:
-        if not API_KEY:
-            raise ValueError("Google API Key not configured")
+        cached = await response_cache.get(stage, key) if use_cache else None
+        if not use_cache:
+            response_cache.record_bypass()
+        CACHE_LOOKUPS.inc(stage=stage, result="bypass" if not use_cache else "miss" if cached is None else "hit")
+        if cached is not None:
+            yield format_sse("chunk", {"text": cached["text"]})
+            yield format_sse("done", {
+                STAGE_RESULT_KEYS[stage]: cached["text"],
+                **metadata,
+                "cached": True,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+            return
+        
+        parts = []
+        first_chunk_ms = None
+        last = None
+        # Streams hold a scheduler slot but are not retried once output has been sent
+        async with model_scheduler.slot(model, estimate_prompt_tokens(prompt)):
+            call_started = time.perf_counter()
+            try:
+                async for chunk in model_backend.stream(model, prompt, generation_config):
+                    last = chunk
+                    if not chunk.text:
+                        continue
+                    if first_chunk_ms is None:
+                        first_chunk_ms = round((time.perf_counter() - started) * 1000, 1)
+                    parts.append(chunk.text)
+                    yield format_sse("chunk", {"text": chunk.text})
+            except (asyncio.CancelledError, GeneratorExit):
+                record_model_call(stage, model, call_started, "cancelled")
+                raise
+            except Exception as e:
+                record_model_call(stage, model, call_started, "error", error=e)
+                raise
         
-        genai.configure(api_key=API_KEY)
-        model_instance = genai.GenerativeModel(model)
-        response = await model_instance.generate_content_async(
-            contents=prompt,
-            generation_config={"max_output_tokens": MAX_TOKENS}
+        text = "".join(parts)
+        response = ModelResponse(
+            text=text,
+            model=model,
+            prompt_tokens=last.prompt_tokens if last else 0,
+            output_tokens=last.output_tokens if last else 0
+        )
+        record_model_call(stage, model, call_started, "ok", response=response)
+        if not text:
+            yield format_sse("error", {"error": f"Failed to generate {stage}", **metadata})
+            return
+        await response_cache.set(stage, key, asdict(response))
+        yield format_sse("done", {
+            STAGE_RESULT_KEYS[stage]: text,
+            **metadata,
+            "cached": False,
+            "first_chunk_ms": first_chunk_ms,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "prompt_tokens": response.prompt_tokens,
+            "output_tokens": response.output_tokens
+        })
+    except Exception as e:
+        logger.error(f"Error streaming {stage}: {describe_error(e)}", extra={"stage": stage})
+        yield format_sse("error", {"error": f"AI model error: {truncate_payload(str(e))}", **metadata})
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        with_request_id(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def resolve_draft_mode(mode: Optional[str]) -> str:
+    mode = mode or DRAFT_MODE
+    if mode not in DRAFT_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid draft mode '{mode}'; expected one of {list(DRAFT_MODES)}")
+    return mode
+
+async def build_section_prompts(outline: str, research_data: str, sections: List[OutlineSection]) -> List[str]:
+    rendered = await asyncio.gather(*(
+        render_prompt(
+            "draft_section",
+            outline=outline,
+            research_data=research_data,
+            section_title=section.heading,
+            section_points=section.points or "- (no specific points; follow the outline)",
+            section_position=f"section {i + 1} of {len(sections)}"
         )
-        return response.text if response.text else ""
+        for i, section in enumerate(sections)
+    ))
+    return [prompt for prompt, _ in rendered]
+
+async def write_draft_section(prompt: str, use_cache: bool = True) -> str:
+    """One section of a "sections" draft; an empty answer is retried once, then fails the draft"""
+    for attempt in range(2):
+        # Empty answers are never cached, so the retry reaches the model
+        text = await call_gemini(prompt, stage="draft_section", use_cache=use_cache)
+        if has_body(text):
+            return text
+        logger.warning(f"Empty draft section (attempt {attempt + 1})", extra={"stage": "draft_section"})
+    raise HTTPException(status_code=500, detail="Failed to generate draft")
+
+async def generate_draft_text(outline: str, research_data: str, mode: str = "single",
+                              use_cache: bool = True) -> Tuple[str, str]:
+    """Write a draft from an outline; returns (draft, mode actually used).
+
+    "sections" mode generates every outline section concurrently, so wall-clock
+    time is roughly one section's latency and each section has its own token budget.
+    """
+    sections = parse_outline_sections(outline) if mode == "sections" else []
+    if len(sections) < 2:
+        prompt, _ = await render_prompt("draft", outline=outline, research_data=research_data)
+        return await call_gemini(prompt, stage="draft", use_cache=use_cache), "single"
+    
+    texts = await asyncio.gather(*(
+        write_draft_section(prompt, use_cache)
+        for prompt in await build_section_prompts(outline, research_data, sections)
+    ))
+    return stitch_sections(sections, texts), "sections"
+
+async def stream_draft_sections(outline: str, research_data: str, sections: List[OutlineSection],
+                                use_cache: bool = True) -> AsyncIterator[str]:
+    """SSE for "sections" mode: all sections run concurrently and each is sent as a chunk, in order, once written"""
+    started = time.perf_counter()
+    tasks = [
+        asyncio.ensure_future(write_draft_section(prompt, use_cache))
+        for prompt in await build_section_prompts(outline, research_data, sections)
+    ]
+    metadata = {"stage": "draft", "mode": "sections", "model": get_stage_model("draft_section")}
+    try:
+        seen, parts = set(), []
+        for section, task in zip(sections, tasks):
+            part = clean_section(section.heading, await task, seen)
+            yield format_sse("chunk", {"text": part if not parts else "\n\n" + part, "section": section.heading})
+            parts.append(part)
+        yield format_sse("done", {
+            "draft": "\n\n".join(parts),
+            **metadata,
+            "sections": len(parts),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        })
     except Exception as e:
-        logger.error(f"Error calling Gemini API: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"AI model error: {str(e)}")
+        logger.error(f"Error streaming draft sections: {describe_error(e)}", extra={"stage": "draft_section"})
+        yield format_sse("error", {"error": str(getattr(e, "detail", e)), **metadata})
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def resolve_revision_mode(mode: Optional[str], target_sections: Optional[List[str]]) -> str:
+    mode = mode or ("sections" if target_sections else REVISION_MODE)
+    if mode not in REVISION_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid revision mode '{mode}'; expected one of {list(REVISION_MODES)}")
+    return mode
+
+def plan_section_revision(draft: str, feedback: str,
+                          target_sections: Optional[List[str]]) -> Optional[Tuple[str, List[DraftSection], List[int]]]:
+    """(preamble, sections, indexes to revise), or None when the whole draft should be revised"""
+    preamble, sections = split_draft_sections(draft)
+    if target_sections:
+        try:
+            return preamble, sections, find_target_sections(target_sections, sections)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    indexes = match_feedback_sections(feedback, sections)
+    return (preamble, sections, indexes) if indexes else None
+
+async def build_section_revision_prompts(feedback: str, sections: List[DraftSection], indexes: List[int]) -> List[str]:
+    headings = "\n".join(f"- {section.heading}" for section in sections)
+    rendered = await asyncio.gather(*(
+        render_prompt(
+            "section_revision",
+            feedback=feedback,
+            headings=headings,
+            section_title=sections[i].heading,
+            section=sections[i].body
+        )
+        for i in indexes
+    ))
+    return [prompt for prompt, _ in rendered]
+
+async def prepare_revision(request: RevisionRequest) -> Tuple[Optional[Tuple[str, List[DraftSection], List[int]]], Optional[str]]:
+    """(section plan, None) for a section revision or (None, prompt) for a full rewrite.
+
+    A full rewrite whose prompt is over budget is split into a revision of every
+    section, so no single call has to carry the whole draft.
+    """
+    if resolve_revision_mode(request.mode, request.target_sections) == "sections":
+        plan = plan_section_revision(request.draft, request.feedback, request.target_sections)
+        if plan is not None:
+            return plan, None
+    prompt, report = await render_prompt("draft_revision", draft=request.draft, feedback=request.feedback)
+    if report["over_budget"]:
+        preamble, sections = split_draft_sections(request.draft)
+        if len(sections) >= 2:
+            logger.info(f"Revision prompt over budget ({report['input_tokens']} tokens), revising {len(sections)} sections separately")
+            return (preamble, sections, list(range(len(sections)))), None
+    return None, prompt
+
+def build_revision_result(preamble: str, sections: List[DraftSection], revised: Dict[int, str]) -> Dict[str, Any]:
+    """Merged draft plus a per-section change list with diffs for the revised sections"""
+    changes = []
+    for i, section in enumerate(sections):
+        change = {"heading": section.heading, "status": "revised" if i in revised else "unchanged"}
+        if i in revised:
+            change["diff"] = section_diff(section.text, revised[i])
+        changes.append(change)
+    return {
+        "revised_draft": join_draft_sections(preamble, [revised.get(i, section.text) for i, section in enumerate(sections)]),
+        "mode": "sections",
+        "sections": changes,
+    }
+
+async def revise_draft_sections(preamble: str, sections: List[DraftSection], indexes: List[int], feedback: str,
+                                use_cache: bool = True) -> Dict[str, Any]:
+    """Rewrite only the selected sections, concurrently, keeping the rest of the draft byte for byte"""
+    texts = await asyncio.gather(*(
+        call_gemini(prompt, stage="section_revision", use_cache=use_cache)
+        for prompt in await build_section_revision_prompts(feedback, sections, indexes)
+    ))
+    if not all(has_body(text) for text in texts):
+        # An empty answer would leave the section a bare heading
+        raise HTTPException(status_code=500, detail="Failed to revise draft")
+    # The section's own heading line is kept as written so untouched and revised sections match
+    revised = {i: clean_section(sections[i].title, text, set()) for i, text in zip(indexes, texts)}
+    return build_revision_result(preamble, sections, revised)
+
+async def stream_section_revision(preamble: str, sections: List[DraftSection], indexes: List[int], feedback: str,
+                                  use_cache: bool = True) -> AsyncIterator[str]:
+    """SSE for "sections" revisions: the merged draft is sent section by section, waiting only on revised ones"""
+    started = time.perf_counter()
+    prompts = await build_section_revision_prompts(feedback, sections, indexes)
+    tasks = {
+        i: asyncio.ensure_future(call_gemini(prompt, stage="section_revision", use_cache=use_cache))
+        for i, prompt in zip(indexes, prompts)
+    }
+    metadata = {"stage": "draft_revision", "model": get_stage_model("section_revision")}
+    try:
+        revised, sent = {}, bool(preamble)
+        if preamble:
+            yield format_sse("chunk", {"text": preamble})
+        for i, section in enumerate(sections):
+            if i in tasks:
+                text = await tasks[i]
+                if not has_body(text):
+                    raise HTTPException(status_code=500, detail="Failed to revise draft")
+                revised[i] = clean_section(section.title, text, set())
+            text = revised.get(i, section.text)
+            yield format_sse("chunk", {"text": "\n\n" + text if sent else text, "section": section.heading})
+            sent = True
+        yield format_sse("done", {
+            **build_revision_result(preamble, sections, revised),
+            **metadata,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        })
+    except Exception as e:
+        logger.error(f"Error streaming section revision: {describe_error(e)}", extra={"stage": "section_revision"})
+        yield format_sse("error", {"error": str(getattr(e, "detail", e)), **metadata})
+    finally:
+        for task in tasks.values():
+            task.cancel()
 
 # Enhanced Gemini API call specifically for evaluations
-async def call_gemini_evaluation(prompt: str, evaluation_type: str, model: str = "gemini-1.5-flash-latest"):
+async def call_gemini_evaluation(prompt: str, evaluation_type: str, model: str = None, use_cache: bool = True):
     """Robust evaluation function that handles malformed JSON responses from Gemini"""
+    scores, _ = await call_gemini_evaluation_with_status(prompt, evaluation_type, model, use_cache)
+    return scores
+
+async def call_gemini_evaluation_with_status(prompt: str, evaluation_type: str, model: str = None,
+                                             use_cache: bool = True) -> Tuple[Dict[str, int], str]:
+    """Same as call_gemini_evaluation, but also reports "ok" or "defaulted" for the scores"""
+    stage = f"{evaluation_type}_evaluation"
+    raw_response = None
     try:
-        if not API_KEY:
-            raise ValueError("Google API Key not configured")
-        
-        genai.configure(api_key=API_KEY)
-        model_instance = genai.GenerativeModel(model)
         
         # Enhanced prompt with very explicit JSON instructions
+        example_format = json.dumps(dict(zip(get_evaluation_keywords(evaluation_type), [8, 7, 6] * 3)))
         enhanced_prompt = f"""
 {prompt}
 
@@ -290,64 +942,397 @@ CRITICAL INSTRUCTIONS:
 - Respond with ONLY a valid JSON object
 - Use integer scores between 1 and 10
 - NO markdown, NO explanations, NO extra text
-- Example format: {{"depth": 8, "relevance": 7, "credibility": 6}}
+- Example format: {example_format}
 """
         
-        response = await model_instance.generate_content_async(
-            contents=enhanced_prompt,
-            generation_config={
+        # Only parseable responses are cached; evaluations run at temperature 0 so a hit is as good as a call
+        response = await generate_text(
+            stage,
+            enhanced_prompt,
+            {
                 "max_output_tokens": 500,
                 "temperature": 0.0,  # Maximum determinism
                 "top_p": 0.1,
                 "candidate_count": 1
-            }
+            },
+            model=model,
+            use_cache=use_cache,
+            accept=lambda r: extract_json_from_response(r.text, evaluation_type) is not None
         )
         
         raw_response = response.text
-        logger.info(f"Raw Gemini response for {evaluation_type}: {repr(raw_response)}")
+        # Sampled and truncated: this runs for every evaluation
+        logger.debug("Raw evaluation response", extra={"stage": stage, "response": truncate_payload(raw_response)})
         
-        # Multiple strategies to extract valid JSON
-        json_result = extract_json_from_response(raw_response, evaluation_type)
+        # Single-pass parse: JSON, relaxed JSON, then key: value text
+        json_result, strategy = extract_scores_with_strategy(raw_response, evaluation_type)
+        EVALUATION_PARSES.inc(evaluation_type=evaluation_type, strategy=strategy)
         
-        if json_result:
-            logger.info(f"Successfully parsed {evaluation_type} evaluation: {json_result}")
-            return json_result
+        if json_result and validate_evaluation_result(json_result, evaluation_type):
+            logger.debug("Parsed evaluation", extra={"stage": stage, "strategy": strategy, "scores": json_result})
+            return json_result, "ok"
         else:
             raise ValueError("Could not extract valid JSON from response")
             
     except Exception as e:
-        logger.error(f"Evaluation failed for {evaluation_type}: {str(e)}")
-        return get_default_scores(evaluation_type)
+        logger.error(f"Evaluation failed for {evaluation_type}: {describe_error(e)}", extra={
+            "stage": stage,
+            "response": truncate_payload(raw_response) if raw_response is not None else None
+        })
+        # Flag throttling separately so default scores from quota exhaustion aren't mistaken for real ones
+        return get_default_scores(evaluation_type), "throttled" if is_retryable(e) else "defaulted"
+
+async def run_evaluation_stage(prompt: str, evaluation_type: str, use_cache: bool = True) -> Tuple[Dict[str, int], str, float]:
+    """Run one evaluation under its stage deadline, returning (scores, status, elapsed_ms)"""
+    timeout = EVALUATION_TIMEOUTS.get(evaluation_type, EVALUATION_TIMEOUT)
+    started = time.perf_counter()
+    try:
+        scores, status = await asyncio.wait_for(
+            call_gemini_evaluation_with_status(prompt, evaluation_type, use_cache=use_cache),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Evaluation for {evaluation_type} timed out after {timeout}s, using default scores")
+        scores, status = get_default_scores(evaluation_type), "timeout"
+    EVALUATION_RESULTS.inc(evaluation_type=evaluation_type, status=status)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return scores, status, elapsed_ms
+
+def build_evaluation_prompts(content_data: Dict[str, Any]) -> Dict[str, str]:
+    """Render the evaluation prompt for every stage that has content"""
+    prompts = {}
+    if content_data.get("research_data"):
+        prompts["research"] = EVALUATION_PROMPTS["research_evaluation"].format(
+            topic=content_data.get("topic", ""),
+            research_data=content_data.get("research_data", "")
+        )
+    if content_data.get("approved_outline"):
+        prompts["outline"] = EVALUATION_PROMPTS["outline_evaluation"].format(
+            outline=content_data.get("approved_outline", "")
+        )
+    if content_data.get("final_draft"):
+        prompts["draft"] = EVALUATION_PROMPTS["draft_evaluation"].format(
+            draft=content_data.get("final_draft", "")
+        )
+    return prompts
+
+async def run_evaluations(content_data: Dict[str, Any], use_cache: bool = True, skip: List[str] = ()) -> Dict[str, Any]:
+    """Evaluate all available stages except `skip` concurrently; total latency is the slowest stage, not the sum"""
+    prompts = {stage: prompt for stage, prompt in build_evaluation_prompts(content_data).items() if stage not in skip}
+    results = await asyncio.gather(*(
+        run_evaluation_stage(prompt, evaluation_type, use_cache)
+        for evaluation_type, prompt in prompts.items()
+    ))
+    
+    evaluations, status, timings = {}, {}, {}
+    for evaluation_type, (scores, stage_status, elapsed_ms) in zip(prompts, results):
+        evaluations[evaluation_type] = scores
+        status[evaluation_type] = stage_status
+        timings[evaluation_type] = elapsed_ms
+    
+    return {"evaluations": evaluations, "evaluation_status": status, "evaluation_timings_ms": timings}
+
+async def run_combined_evaluation(content_data: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+    """Score research, outline and draft with a single model call returning all nine criteria"""
+    prompt = EVALUATION_PROMPTS["combined_evaluation"].format(
+        topic=content_data.get("topic", ""),
+        research_data=content_data.get("research_data", ""),
+        outline=content_data.get("approved_outline", ""),
+        draft=content_data.get("final_draft", "")
+    )
+    scores, status, elapsed_ms = await run_evaluation_stage(prompt, "combined", use_cache)
+    evaluations = split_combined_scores(scores)
+    return {
+        "evaluations": evaluations,
+        "evaluation_status": {stage: status for stage in evaluations},
+        "evaluation_timings_ms": {stage: elapsed_ms for stage in evaluations}
+    }
+
+def skip_failed_stages(result: Dict[str, Any], skipped: List[str], local_scores: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Fill in the stages whose LLM evaluation was skipped, keeping the stage order of local_scores.
+
+    Skipped stages get null criterion scores, so they are never mistaken for (or
+    stored and filtered as) model scores; their status says why.
+    """
+    for stage in skipped:
+        EVALUATION_RESULTS.inc(evaluation_type=stage, status="skipped")
+    return {
+        **result,
+        "evaluations": {
+            stage: {criterion: None for criterion in get_evaluation_keywords(stage)} if stage in skipped
+            else result["evaluations"][stage]
+            for stage in local_scores if stage in skipped or stage in result["evaluations"]
+        },
+        "evaluation_status": {**result["evaluation_status"], **{stage: "skipped" for stage in skipped}},
+        "evaluation_timings_ms": {**result["evaluation_timings_ms"], **{stage: 0.0 for stage in skipped}},
+    }
 
+async def run_content_evaluation(content_data: Dict[str, Any], mode: str = "separate", use_cache: bool = True,
+                                 local_policy: Optional[str] = None,
+                                 local_scores: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Evaluate one document; "combined" mode needs all three stages and otherwise falls back to separate calls.
+
+    Unless the local policy is "off", the local pre-scores are returned as
+    "local_scores"; under "skip", stages failing them get no LLM call (and a
+    combined evaluation becomes separate calls for the remaining stages).
+    """
+    policy = local_policy or LOCAL_SCORE_POLICY
+    if policy != "off" and local_scores is None:
+        local_scores = local_scorer.score(content_data)
+    skipped = [stage for stage, scores in local_scores.items() if not scores["passed"]] if policy == "skip" else []
+    
+    if mode == "combined" and not skipped and all(content_data.get(field) for field in ("research_data", "approved_outline", "final_draft")):
+        result = {**await run_combined_evaluation(content_data, use_cache), "mode": "combined"}
+    else:
+        result = {**await run_evaluations(content_data, use_cache, skip=skipped), "mode": "separate"}
+    if skipped:
+        result = skip_failed_stages(result, skipped, local_scores)
+    if policy != "off":
+        result["local_scores"] = local_scores
+    return result
 
-# FILE OPERATIONS
 
+# PIPELINE JOBS
 
-def save_content_data(data: Dict, filename: str = "content_output.json"):
-    try:
-        # Add timestamp
-        data["last_saved"] = datetime.now().isoformat()
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving data: {str(e)}")
-        return False
 
-def load_content_data(filename: str = "content_output.json"):
+PIPELINE_STAGES = ["research", "outline", "draft", "evaluation"]
+
+async def run_content_pipeline(job: Job):
+    """Chain research -> outline -> draft -> evaluation for one topic on the server.
+
+    The generated outline is treated as approved and the draft as final, so the
+    result has the same shape as the content_data the frontend saves.
+    """
+    use_cache = job.options.get("use_cache", True)
+    call_priority.set("batch")
+    content_data = {"topic": job.topic}
+    job.result = content_data
+    
+    prompt, _ = await render_prompt("research", topic=job.topic)
+    research_data = await job.run_stage("research", call_gemini(prompt, stage="research", use_cache=use_cache))
+    if not research_data:
+        raise ValueError("Failed to generate research data")
+    content_data["research_data"] = research_data
+    
+    prompt, _ = await render_prompt("outline", topic=job.topic, research_data=research_data)
+    outline = await job.run_stage("outline", call_gemini(prompt, stage="outline", use_cache=use_cache))
+    if not outline:
+        raise ValueError("Failed to generate outline")
+    content_data["outline"] = outline
+    content_data["approved_outline"] = outline
+    
+    draft, _ = await job.run_stage("draft", generate_draft_text(outline, research_data, DRAFT_MODE, use_cache))
+    if not draft:
+        raise ValueError("Failed to generate draft")
+    content_data["draft"] = draft
+    content_data["final_draft"] = draft
+    
+    evaluation = await job.run_stage("evaluation", run_evaluations(content_data, use_cache))
+    job.result = {**content_data, **evaluation}
+    
+    if job.options.get("save"):
+        saved = await save_content_data({**content_data, "evaluations": evaluation["evaluations"]})
+        job.result["id"] = saved["id"]
+
+# Jobs live in this process's memory, so a job is only visible on the worker that accepted it:
+# serve.py runs a single worker while jobs are enabled. JOBS_ENABLED=false scales the interactive
+# API out to several workers; the job routes then answer 503.
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+job_manager = JobManager(
+    run_content_pipeline,
+    PIPELINE_STAGES,
+    concurrency=int(os.getenv("JOB_CONCURRENCY", "4")),
+    queue_limit=int(os.getenv("JOB_QUEUE_LIMIT", "1000")),
+    history_limit=int(os.getenv("JOB_HISTORY_LIMIT", "1000"))
+)
+
+
+# CONTENT STORE
+
+
+CONTENT_DB_PATH = os.getenv("CONTENT_DB_PATH", "content_store.db")
+LEGACY_CONTENT_FILE = "content_output.json"
+CONTENT_LIST_MAX_LIMIT = 200
+# Revision history keeps a full snapshot every CONTENT_SNAPSHOT_INTERVAL versions and deltas in between
+CONTENT_SNAPSHOT_INTERVAL = int(os.getenv("CONTENT_SNAPSHOT_INTERVAL", "10"))
+
+# Opened by the lifespan hook (open_content_store) in each worker process
+content_store: Optional[ContentStore] = None
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Turn a "topic,last_saved" query parameter into a field list (None = whole document)"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+async def save_content_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Insert or update a document in the content store without blocking the event loop"""
+    return await asyncio.to_thread(content_store.save, data)
+
+
+# WORKFLOW SESSIONS
+
+
+# Workflow state kept on the server. A session is a content store document, so each step that
+# changes it is a new version in the document's revision history.
+SESSION_FIELDS = ["topic", "research_data", "outline", "approved_outline", "draft", "final_draft", "evaluations"]
+
+async def load_session(session_id: str, version: Optional[int] = None,
+                       fields: Optional[List[str]] = None) -> Tuple[Dict[str, Any], Optional[int]]:
+    """Current session state and its version, or the state at `version`.
+
+    Steps write their result with the version they read as base_version, so a
+    step that ran on a state someone else has since changed gets a 409.
+    """
+    if version is None:
+        found = await asyncio.to_thread(content_store.get_with_version, session_id, fields)
+        if found is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        return found
+    state = await asyncio.to_thread(content_store.get_version, session_id, version, fields)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Session version {version} not found")
+    return state, version
+
+def session_field(state: Dict[str, Any], field: str) -> Any:
+    value = state.get(field)
+    if not value:
+        raise HTTPException(status_code=400, detail=f"Session has no {field} yet")
+    return value
+
+async def update_session(session_id: str, changes: Dict[str, Any], base_version: Optional[int] = None) -> Dict[str, Any]:
+    """Merge changes into the latest session state; returns the new version and only the fields that changed"""
     try:
-        if os.path.exists(filename):
-            with open(filename, "r") as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        logger.error(f"Error loading data: {str(e)}")
-        return {}
+        result = await asyncio.to_thread(content_store.update, session_id, changes, base_version)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"session_id": session_id, "version": result["version"], "changes": result["changes"]}
+
+async def stream_into_session(session_id: str, events: AsyncIterator[str], field: str, result_key: str,
+                              base_version: Optional[int]) -> AsyncIterator[str]:
+    """Pass a generation stream through and save its final text into the session.
+
+    The "done" event carries the new version and the changed field names instead
+    of the text, which the client already has from the chunks.
+    """
+    async for event in events:
+        if not event.startswith("event: done\n"):
+            yield event
+            continue
+        _, data = parse_sse(event)
+        try:
+            update = await update_session(session_id, {field: data.pop(result_key)}, base_version)
+        except HTTPException as e:
+            yield format_sse("error", {"error": e.detail})
+            return
+        yield format_sse("done", {**data, "session_id": session_id, "version": update["version"], "changed": list(update["changes"])})
 
 
 # API ROUTES
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route latency and status counts; streaming routes are timed until their headers are sent.
+
+    Also tags every log record made while handling the request with its request id
+    (the client's X-Request-ID, or a new one) and echoes the id in the response.
+    Streaming bodies run after this returns; they keep the id through with_request_id.
+    """
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    id_token = request_id_var.set(request_id)
+    timings: Dict[str, float] = {}
+    token = request_timings.set(timings)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        request_timings.reset(token)
+        # Label by route template (/api/jobs/{job_id}), not the raw path, to keep label cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_LATENCY.observe(elapsed, method=request.method, route=route)
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=status)
+        logger.info("Request finished", extra={
+            "method": request.method,
+            "route": route,
+            "status": status,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "timings_ms": {name: round(value, 1) for name, value in timings.items()} or None
+        })
+        request_id_var.reset(id_token)
+    response.headers["X-Request-ID"] = request_id
+    if SERVER_TIMING_ENABLED:
+        timings["total"] = elapsed * 1000
+        response.headers["Server-Timing"] = format_server_timing(timings)
+    return response
+
+
+# STARTUP AND READINESS
+
+
+async def read_prompts():
+    """Read and validate the prompts file"""
+    await asyncio.to_thread(prompt_registry.get)
+
+async def warm_model_clients():
+    """Create one long-lived client per configured model (importing the SDK) before the first request"""
+    model_backend.warm(set(STAGE_MODELS.values()))
+
+async def open_content_store():
+    """Open the SQLite store, creating or migrating its tables"""
+    global content_store
+    content_store = await asyncio.to_thread(ContentStore, CONTENT_DB_PATH, CONTENT_SNAPSHOT_INTERVAL)
+
+async def import_legacy_content():
+    """One-time import of the old single-file content_output.json into an empty store"""
+    await asyncio.to_thread(content_store.import_legacy_file, LEGACY_CONTENT_FILE)
+
+async def start_job_workers():
+    if not JOBS_ENABLED:
+        logger.info("Pipeline jobs are disabled (JOBS_ENABLED=false)")
+        return
+    await job_manager.start()
+
+# Run in order by the lifespan hook; each step's duration is reported by /api/ready
+STARTUP_STEPS = [
+    ("prompts", read_prompts),
+    ("model_clients", warm_model_clients),
+    ("content_store", open_content_store),
+    ("legacy_content", import_legacy_content),
+    ("job_workers", start_job_workers),
+]
+
+startup_state: Dict[str, Any] = {"status": "starting", "pid": os.getpid(), "startup_ms": None, "steps_ms": {}}
+
+async def run_startup():
+    startup_state.update(status="starting", pid=os.getpid(), steps_ms={})
+    started = time.perf_counter()
+    for name, step in STARTUP_STEPS:
+        step_started = time.perf_counter()
+        await step()
+        startup_state["steps_ms"][name] = round((time.perf_counter() - step_started) * 1000, 1)
+    startup_state["startup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    startup_state["status"] = "ready"
+    logger.info("Worker ready", extra={"pid": os.getpid(), "startup_ms": startup_state["startup_ms"],
+                                       "steps_ms": startup_state["steps_ms"]})
+
+async def run_shutdown():
+    global content_store
+    startup_state["status"] = "stopping"
+    await job_manager.stop()
+    # After the job workers, which may still be saving results
+    if content_store is not None:
+        await asyncio.to_thread(content_store.close)
+        content_store = None
+
+
+
 @app.get("/")
 async def root():
     return {"message": "Content Creation & Evaluation API", "version": "1.0.0"}
@@ -358,81 +1343,173 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "api_key_configured": bool(API_KEY),
-        "max_tokens": MAX_TOKENS
+        "model_backend": model_backend.name,
+        "models": STAGE_MODELS,
+        "max_tokens": MAX_TOKENS,
+        "prompt_budget": prompt_budget.stats(),
+        "prompt_version": prompt_registry.version,
+        "cache": response_cache.stats(),
+        "jobs": job_manager.stats(),
+        "scheduler": model_scheduler.stats(),
+        "coalescing": single_flight.stats(),
+        "hedging": {**model_hedger.stats(), "fallback_models": STAGE_FALLBACK_MODELS},
+        "local_score_policy": LOCAL_SCORE_POLICY
     }
 
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness probe: 200 only once this worker has started up and its store and job workers respond"""
+    checks = {"startup": startup_state["status"] == "ready", "job_workers": job_manager.alive or not JOBS_ENABLED}
+    try:
+        await asyncio.to_thread(content_store.ping)
+        checks["content_store"] = True
+    except Exception as e:
+        logger.error(f"Readiness check failed for the content store: {describe_error(e)}")
+        checks["content_store"] = False
+    ready = all(checks.values())
+    status = startup_state["status"]
+    if status == "ready" and not ready:
+        status = "degraded"
+    return JSONResponse(status_code=200 if ready else 503, content={**startup_state, "status": status, "checks": checks})
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(metrics.render(), media_type=metrics.content_type)
+
+
+@app.post("/api/cache/invalidate")
+async def invalidate_cache(request: CacheInvalidateRequest):
+    # The stage names a cache directory, so only known stages are accepted
+    if request.stage is not None and request.stage not in STAGE_MODELS:
+        raise HTTPException(status_code=400, detail=f"Unknown stage '{request.stage}'; expected one of {list(STAGE_MODELS)}")
+    try:
+        removed = await asyncio.to_thread(response_cache.invalidate, request.stage)
+        return {"message": "Cache invalidated", "stage": request.stage, "entries_removed": removed}
+    except Exception as e:
+        logger.error(f"Error in invalidate_cache: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+
 # CONTENT GENERATION ROUTES
 
 
 @app.post("/api/generate-research")
 async def generate_research(request: TopicRequest):
     try:
-        prompts = load_prompts()
-        prompt = prompts["research"].format(topic=request.topic)
-        research_data = await call_gemini(prompt)
+        prompt, _ = await render_prompt("research", topic=request.topic)
+        research_data = await call_gemini(prompt, stage="research", use_cache=request.use_cache)
         
         if not research_data:
             raise HTTPException(status_code=500, detail="Failed to generate research data")
         
         return {"research_data": research_data}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in generate_research: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in generate_research: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
 
 @app.post("/api/generate-outline")
 async def generate_outline(request: OutlineRequest):
     try:
-        prompts = load_prompts()
-        prompt = prompts["outline"].format(
-            topic=request.topic,
-            research_data=request.research_data
-        )
-        outline = await call_gemini(prompt)
+        prompt, _ = await render_prompt("outline", topic=request.topic, research_data=request.research_data)
+        outline = await call_gemini(prompt, stage="outline", use_cache=request.use_cache)
         
         if not outline:
             raise HTTPException(status_code=500, detail="Failed to generate outline")
         
         return {"outline": outline}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in generate_outline: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in generate_outline: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
 
 @app.post("/api/generate-draft")
 async def generate_draft(request: DraftRequest):
     try:
-        prompts = load_prompts()
-        prompt = prompts["draft"].format(
-            outline=request.outline,
-            research_data=request.research_data
-        )
-        draft = await call_gemini(prompt)
+        mode = resolve_draft_mode(request.mode)
+        draft, mode = await generate_draft_text(request.outline, request.research_data, mode, request.use_cache)
         
         if not draft:
             raise HTTPException(status_code=500, detail="Failed to generate draft")
         
-        return {"draft": draft}
+        return {"draft": draft, "mode": mode}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in generate_draft: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in generate_draft: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
 
 @app.post("/api/revise-draft")
 async def revise_draft(request: RevisionRequest):
     try:
-        prompts = load_prompts()
-        prompt = prompts["draft_revision"].format(
-            draft=request.draft,
-            feedback=request.feedback
-        )
-        revised_draft = await call_gemini(prompt)
+        plan, prompt = await prepare_revision(request)
+        if plan is not None:
+            return await revise_draft_sections(*plan, request.feedback, request.use_cache)
+        
+        revised_draft = await call_gemini(prompt, stage="draft_revision", use_cache=request.use_cache)
         
         if not revised_draft:
             raise HTTPException(status_code=500, detail="Failed to revise draft")
         
-        return {"revised_draft": revised_draft}
+        return {"revised_draft": revised_draft, "mode": "full"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in revise_draft: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+
+# STREAMING GENERATION ROUTES (Server-Sent Events)
+
+
+@app.post("/api/generate-research/stream")
+async def generate_research_stream(request: TopicRequest):
+    try:
+        prompt, _ = await render_prompt("research", topic=request.topic)
+    except Exception as e:
+        logger.error(f"Error in generate_research_stream: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    return sse_response(stream_gemini(prompt, "research", request.use_cache))
+
+@app.post("/api/generate-outline/stream")
+async def generate_outline_stream(request: OutlineRequest):
+    try:
+        prompt, _ = await render_prompt("outline", topic=request.topic, research_data=request.research_data)
+    except Exception as e:
+        logger.error(f"Error in generate_outline_stream: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    return sse_response(stream_gemini(prompt, "outline", request.use_cache))
+
+@app.post("/api/generate-draft/stream")
+async def generate_draft_stream(request: DraftRequest):
+    try:
+        sections = parse_outline_sections(request.outline) if resolve_draft_mode(request.mode) == "sections" else []
+        if len(sections) >= 2:
+            return sse_response(stream_draft_sections(request.outline, request.research_data, sections, request.use_cache))
+        prompt, _ = await render_prompt("draft", outline=request.outline, research_data=request.research_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in generate_draft_stream: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    return sse_response(stream_gemini(prompt, "draft", request.use_cache))
+
+@app.post("/api/revise-draft/stream")
+async def revise_draft_stream(request: RevisionRequest):
+    try:
+        plan, prompt = await prepare_revision(request)
+        if plan is not None:
+            return sse_response(stream_section_revision(*plan, request.feedback, request.use_cache))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in revise_draft: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in revise_draft_stream: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    return sse_response(stream_gemini(prompt, "draft_revision", request.use_cache))
 
 
 # EVALUATION ROUTE
@@ -441,46 +1518,145 @@ async def revise_draft(request: RevisionRequest):
 @app.post("/api/evaluate-content")
 async def evaluate_content(request: EvaluationRequest):
     try:
-        evaluations = {}
-        content_data = request.content_data
-        
-        # Evaluate research
-        if content_data.get("research_data"):
-            research_prompt = EVALUATION_PROMPTS["research_evaluation"].format(
-                topic=content_data.get("topic", ""),
-                research_data=content_data.get("research_data", "")
-            )
-            evaluations["research"] = await call_gemini_evaluation(
-                research_prompt, "research"
-            )
-        
-        # Evaluate outline
-        if content_data.get("approved_outline"):
-            outline_prompt = EVALUATION_PROMPTS["outline_evaluation"].format(
-                outline=content_data.get("approved_outline", "")
-            )
-            evaluations["outline"] = await call_gemini_evaluation(
-                outline_prompt, "outline"
-            )
+        if request.mode not in EVALUATION_MODES:
+            raise HTTPException(status_code=400, detail=f"mode must be one of {list(EVALUATION_MODES)}")
+        if request.local_policy and request.local_policy not in LOCAL_SCORE_POLICIES:
+            raise HTTPException(status_code=400, detail=f"local_policy must be one of {list(LOCAL_SCORE_POLICIES)}")
+        result = await run_content_evaluation(request.content_data, request.mode, request.use_cache, request.local_policy)
         
-        # Evaluate draft
-        if content_data.get("final_draft"):
-            draft_prompt = EVALUATION_PROMPTS["draft_evaluation"].format(
-                draft=content_data.get("final_draft", "")
-            )
-            evaluations["draft"] = await call_gemini_evaluation(
-                draft_prompt, "draft"
-            )
-        
-        if not evaluations:
+        if not result["evaluations"]:
             raise HTTPException(status_code=400, detail="No content available for evaluation")
         
-        logger.info(f"Final evaluations: {evaluations}")
-        return {"evaluations": evaluations}
+        logger.info("Evaluation complete", extra={
+            "mode": result["mode"],
+            "evaluation_status": result["evaluation_status"],
+            "evaluation_timings_ms": result["evaluation_timings_ms"]
+        })
+        logger.debug("Evaluation scores", extra={"evaluations": result["evaluations"]})
+        return result
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in evaluate_content: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+
+@app.post("/api/evaluate-batch")
+async def evaluate_batch(request: BatchEvaluationRequest):
+    """Evaluate many documents with bounded concurrency, streaming one NDJSON line per item as it finishes"""
+    if request.mode not in EVALUATION_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {list(EVALUATION_MODES)}")
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items to evaluate")
+    if request.local_policy and request.local_policy not in LOCAL_SCORE_POLICIES:
+        raise HTTPException(status_code=400, detail=f"local_policy must be one of {list(LOCAL_SCORE_POLICIES)}")
+    concurrency = max(1, min(request.concurrency or EVALUATION_BATCH_CONCURRENCY, EVALUATION_BATCH_MAX_CONCURRENCY))
+    policy = request.local_policy or LOCAL_SCORE_POLICY
+    
+    # Pre-score every document, off the event loop, before any model call is scheduled
+    local_scores = [None] * len(request.items)
+    if policy != "off":
+        local_scores = await asyncio.to_thread(local_scorer.score_batch, [item.content_data for item in request.items])
+    
+    async def evaluate_item(index: int, item: BatchEvaluationItem, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        async with semaphore:
+            call_priority.set("batch")
+            record = {"index": index, "id": item.id}
+            try:
+                result = await run_content_evaluation(item.content_data, request.mode, request.use_cache, policy, local_scores[index])
+                if not result["evaluations"]:
+                    return {**record, "error": "No content available for evaluation"}
+                return {**record, **result}
+            except Exception as e:
+                logger.error(f"Error evaluating batch item {index}: {describe_error(e)}")
+                return {**record, "error": truncate_payload(str(e))}
+    
+    async def results():
+        semaphore = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(evaluate_item(i, item, semaphore)) for i, item in enumerate(request.items)]
+        failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                record = await finished
+                failed += "error" in record
+                yield json.dumps(record) + "\n"
+            yield json.dumps({
+                "done": True,
+                "count": len(tasks),
+                "failed": failed,
+                "mode": request.mode,
+                "local_policy": policy,
+                "concurrency": concurrency,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            }) + "\n"
+        finally:
+            # Client went away: stop evaluating the remaining items
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(with_request_id(results()), media_type="application/x-ndjson")
+
+
+# PIPELINE JOB ROUTES
+
+
+def require_jobs():
+    if not JOBS_ENABLED:
+        raise HTTPException(status_code=503, detail="Pipeline jobs are disabled on this server (JOBS_ENABLED=false)")
+
+@app.post("/api/jobs")
+async def submit_jobs(request: JobRequest):
+    require_jobs()
+    topics = [topic.strip() for topic in ([request.topic] if request.topic else []) + request.topics if topic and topic.strip()]
+    if not topics:
+        raise HTTPException(status_code=400, detail="Provide a topic or a list of topics")
+    try:
+        jobs = job_manager.submit(topics, {"use_cache": request.use_cache, "save": request.save})
+        return {"jobs": [job.to_dict(include_result=False) for job in jobs]}
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in evaluate_content: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in submit_jobs: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.get("/api/jobs")
+async def list_jobs(status: Optional[str] = None, limit: int = 100):
+    require_jobs()
+    jobs = job_manager.list(status=status, limit=limit)
+    return {"jobs": [job.to_dict(include_result=False) for job in jobs], "stats": job_manager.stats()}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    require_jobs()
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Subscribe to a job's stage progress as Server-Sent Events, ending with a "done" event"""
+    require_jobs()
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        async for event, data in job_manager.events(job):
+            yield format_sse(event, data)
+    
+    return sse_response(events())
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    require_jobs()
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    # A running job stops at its next await; poll the job for the final status
+    return {"message": "Cancellation requested", "job": job.to_dict(include_result=False)}
 
 
 # DATA PERSISTENCE ROUTES
@@ -488,24 +1664,314 @@ async def evaluate_content(request: EvaluationRequest):
 
 @app.post("/api/save-content")
 async def save_content(request: ContentSaveRequest):
+    """Create a document, or update the one named by content_data["id"]"""
     try:
-        success = save_content_data(request.content_data)
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to save content")
-        
-        return {"message": "Content saved successfully", "timestamp": datetime.now().isoformat()}
+        saved = await save_content_data(request.content_data)
+        return {
+            "message": "Content saved successfully",
+            "id": saved["id"],
+            "created": saved["created"],
+            "version": saved["version"],
+            "timestamp": saved["last_saved"]
+        }
     except Exception as e:
-        logger.error(f"Error in save_content: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in save_content: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
 
 @app.get("/api/load-content")
-async def load_content():
+async def load_content(id: Optional[str] = None, fields: Optional[str] = None):
+    """Fetch a document by id, or the most recently saved one when no id is given"""
+    try:
+        if id:
+            content_data = await asyncio.to_thread(content_store.get, id, parse_fields(fields))
+            if content_data is None:
+                raise HTTPException(status_code=404, detail="Content not found")
+        else:
+            content_data = await asyncio.to_thread(content_store.latest, parse_fields(fields))
+        return {"content_data": content_data or {}}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in load_content: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.get("/api/content")
+async def list_content(
+    topic: Optional[str] = None,
+    stage: Optional[str] = None,
+    where: List[str] = Query(default=[]),
+    fields: Optional[str] = None,
+    order_by: str = "last_saved",
+    order: str = "desc",
+    limit: int = 20,
+    offset: int = 0,
+    kind: str = "content"
+):
+    """List stored documents, e.g. ?stage=draft,final&where=engagement<6&fields=id,topic,scores (kind=session for sessions)"""
+    try:
+        return await asyncio.to_thread(
+            content_store.list,
+            kind=kind,
+            fields=parse_fields(fields),
+            topic=topic,
+            stages=parse_fields(stage),
+            filters=where,
+            order_by=order_by,
+            descending=order.lower() != "asc",
+            limit=max(1, min(limit, CONTENT_LIST_MAX_LIMIT)),
+            offset=max(0, offset)
+        )
+    except ContentStoreError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in list_content: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.get("/api/content/{content_id}")
+async def get_content(content_id: str, fields: Optional[str] = None):
+    try:
+        content_data = await asyncio.to_thread(content_store.get, content_id, parse_fields(fields))
+    except Exception as e:
+        logger.error(f"Error in get_content: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    if content_data is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    return {"content_data": content_data}
+
+@app.get("/api/content/{content_id}/versions")
+async def list_content_versions(content_id: str):
+    """Revision history of a document, newest first, with each version's scores"""
+    try:
+        history = await asyncio.to_thread(content_store.versions, content_id)
+    except Exception as e:
+        logger.error(f"Error in list_content_versions: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    if history is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    return history
+
+@app.get("/api/content/{content_id}/versions/{version}")
+async def get_content_version(content_id: str, version: int, fields: Optional[str] = None):
     try:
-        content_data = load_content_data()
-        return {"content_data": content_data}
+        content_data = await asyncio.to_thread(content_store.get_version, content_id, version, parse_fields(fields))
+    except Exception as e:
+        logger.error(f"Error in get_content_version: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    if content_data is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return {"content_data": content_data, "version": version}
+
+@app.get("/api/content/{content_id}/diff")
+async def diff_content_versions(
+    content_id: str,
+    from_version: Optional[int] = Query(default=None, alias="from"),
+    to_version: Optional[int] = Query(default=None, alias="to")
+):
+    """Changes between two versions, e.g. ?from=3&to=5; defaults to the latest version against the one before it"""
+    try:
+        if to_version is None:
+            to_version = await asyncio.to_thread(content_store.latest_version, content_id)
+            if to_version is None:
+                raise HTTPException(status_code=404, detail="Content not found")
+        if from_version is None:
+            from_version = max(1, to_version - 1)
+        diff = await asyncio.to_thread(content_store.diff_versions, content_id, from_version, to_version)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in diff_content_versions: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return diff
+
+@app.delete("/api/content/{content_id}")
+async def delete_content(content_id: str):
+    deleted = await asyncio.to_thread(content_store.delete, content_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Content not found")
+    return {"message": "Content deleted successfully", "id": content_id}
+
+
+# WORKFLOW SESSION ROUTES
+
+
+@app.post("/api/sessions")
+async def create_session(request: SessionCreateRequest):
+    """Start a session from a topic, or from existing workflow state in content_data"""
+    try:
+        state = {field: value for field, value in (request.content_data or {}).items() if field in SESSION_FIELDS}
+        if request.topic:
+            state["topic"] = request.topic
+        saved = await asyncio.to_thread(content_store.save, state, kind="session")
+        return {"session_id": saved["id"], "version": saved["version"]}
+    except Exception as e:
+        logger.error(f"Error in create_session: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.get("/api/sessions/{session_id}")
+async def get_session(session_id: str, version: Optional[int] = None, fields: Optional[str] = None):
+    try:
+        state, version = await load_session(session_id, version, parse_fields(fields))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_session: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    return {"session_id": session_id, "version": version, "content_data": state}
+
+@app.patch("/api/sessions/{session_id}")
+async def patch_session(session_id: str, request: SessionUpdateRequest):
+    """Edit session fields; copy_fields={"approved_outline": "outline"} copies server-side without re-uploading"""
+    unknown = [field for field in [*request.changes, *request.copy_fields, *request.copy_fields.values()] if field not in SESSION_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown session fields {unknown}; expected {SESSION_FIELDS}")
+    try:
+        changes, base_version = dict(request.changes), request.base_version
+        if request.copy_fields:
+            # Copy from the version being edited, and only onto that version
+            state, base_version = await load_session(session_id, request.base_version)
+            changes.update({target: state.get(source) for target, source in request.copy_fields.items()})
+        return await update_session(session_id, changes, base_version)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in patch_session: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.post("/api/sessions/{session_id}/research")
+async def session_research(session_id: str, request: SessionStepRequest):
+    try:
+        state, version = await load_session(session_id, request.version)
+        prompt, _ = await render_prompt("research", topic=session_field(state, "topic"))
+        research_data = await call_gemini(prompt, stage="research", use_cache=request.use_cache)
+        if not research_data:
+            raise HTTPException(status_code=500, detail="Failed to generate research data")
+        return await update_session(session_id, {"research_data": research_data}, version)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in session_research: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.post("/api/sessions/{session_id}/outline")
+async def session_outline(session_id: str, request: SessionStepRequest):
+    try:
+        state, version = await load_session(session_id, request.version)
+        prompt, _ = await render_prompt(
+            "outline", topic=session_field(state, "topic"), research_data=session_field(state, "research_data")
+        )
+        outline = await call_gemini(prompt, stage="outline", use_cache=request.use_cache)
+        if not outline:
+            raise HTTPException(status_code=500, detail="Failed to generate outline")
+        return await update_session(session_id, {"outline": outline}, version)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in session_outline: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.post("/api/sessions/{session_id}/draft")
+async def session_draft(session_id: str, request: SessionStepRequest):
+    try:
+        state, version = await load_session(session_id, request.version)
+        draft, mode = await generate_draft_text(
+            session_field(state, "approved_outline"), state.get("research_data") or "",
+            resolve_draft_mode(request.mode), request.use_cache
+        )
+        if not draft:
+            raise HTTPException(status_code=500, detail="Failed to generate draft")
+        return {**await update_session(session_id, {"draft": draft}, version), "mode": mode}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in session_draft: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.post("/api/sessions/{session_id}/draft/stream")
+async def session_draft_stream(session_id: str, request: SessionStepRequest):
+    try:
+        state, version = await load_session(session_id, request.version)
+        outline, research_data = session_field(state, "approved_outline"), state.get("research_data") or ""
+        sections = parse_outline_sections(outline) if resolve_draft_mode(request.mode) == "sections" else []
+        if len(sections) >= 2:
+            events = stream_draft_sections(outline, research_data, sections, request.use_cache)
+        else:
+            prompt, _ = await render_prompt("draft", outline=outline, research_data=research_data)
+            events = stream_gemini(prompt, "draft", request.use_cache)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in session_draft_stream: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    return sse_response(stream_into_session(session_id, events, "draft", "draft", version))
+
+def session_revision_request(state: Dict[str, Any], request: SessionRevisionRequest) -> RevisionRequest:
+    # The draft comes from the session store, so it is not validated again
+    return RevisionRequest.model_construct(
+        draft=session_field(state, "draft"),
+        feedback=request.feedback,
+        mode=request.mode,
+        target_sections=request.target_sections,
+        use_cache=request.use_cache
+    )
+
+@app.post("/api/sessions/{session_id}/revise")
+async def session_revise(session_id: str, request: SessionRevisionRequest):
+    try:
+        state, version = await load_session(session_id, request.version)
+        revision = session_revision_request(state, request)
+        plan, prompt = await prepare_revision(revision)
+        if plan is not None:
+            result = await revise_draft_sections(*plan, request.feedback, request.use_cache)
+        else:
+            result = {"revised_draft": await call_gemini(prompt, stage="draft_revision", use_cache=request.use_cache), "mode": "full"}
+        if not result["revised_draft"]:
+            raise HTTPException(status_code=500, detail="Failed to revise draft")
+        revised_draft = result.pop("revised_draft")
+        return {**await update_session(session_id, {"draft": revised_draft}, version), **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in session_revise: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+
+@app.post("/api/sessions/{session_id}/revise/stream")
+async def session_revise_stream(session_id: str, request: SessionRevisionRequest):
+    try:
+        state, version = await load_session(session_id, request.version)
+        plan, prompt = await prepare_revision(session_revision_request(state, request))
+        if plan is not None:
+            events = stream_section_revision(*plan, request.feedback, request.use_cache)
+        else:
+            events = stream_gemini(prompt, "draft_revision", request.use_cache)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in session_revise_stream: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
+    return sse_response(stream_into_session(session_id, events, "draft", "revised_draft", version))
+
+@app.post("/api/sessions/{session_id}/evaluate")
+async def session_evaluate(session_id: str, request: SessionEvaluationRequest):
+    if request.mode not in EVALUATION_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {list(EVALUATION_MODES)}")
+    if request.local_policy and request.local_policy not in LOCAL_SCORE_POLICIES:
+        raise HTTPException(status_code=400, detail=f"local_policy must be one of {list(LOCAL_SCORE_POLICIES)}")
+    try:
+        state, version = await load_session(session_id, request.version)
+        # Until a draft is marked final, the working draft is the one evaluated
+        content_data = {**state, "final_draft": state.get("final_draft") or state.get("draft")}
+        result = await run_content_evaluation(content_data, request.mode, request.use_cache, request.local_policy)
+        if not result["evaluations"]:
+            raise HTTPException(status_code=400, detail="No content available for evaluation")
+        evaluations = result.pop("evaluations")
+        return {**await update_session(session_id, {"evaluations": evaluations}, version), **result}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in load_content: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in session_evaluate: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
 
 
 # PROMPT MANAGEMENT ROUTES
@@ -515,22 +1981,22 @@ async def load_content():
 async def get_prompts():
     try:
         prompts = load_prompts()
-        return {"prompts": prompts}
+        return {"prompts": prompts, "version": prompt_registry.version}
     except Exception as e:
-        logger.error(f"Error in get_prompts: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in get_prompts: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
 
 @app.post("/api/update-prompts")
 async def update_prompts(prompts: Dict[str, str]):
     try:
-        # Merge with evaluation prompts to ensure they're not overwritten
-        updated_prompts = {**prompts, **EVALUATION_PROMPTS}
-        with open("prompt.json", "w") as f:
-            json.dump(updated_prompts, f, indent=2)
-        return {"message": "Prompts updated successfully"}
+        # Validated before writing; evaluation prompts are merged back so they're not overwritten
+        version = await asyncio.to_thread(prompt_registry.update, prompts)
+        return {"message": "Prompts updated successfully", "version": version}
+    except PromptValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid prompts: {str(e)}")
     except Exception as e:
-        logger.error(f"Error in update_prompts: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error in update_prompts: {describe_error(e)}")
+        raise HTTPException(status_code=500, detail=truncate_payload(str(e)))
 
 
 # ERROR HANDLERS
@@ -545,7 +2011,7 @@ async def http_exception_handler(request, exc):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
-    logger.error(f"Unhandled exception: {str(exc)}")
+    logger.error(f"Unhandled exception: {describe_error(exc)}")
     return JSONResponse(
         status_code=500,
         content={"error": "Internal server error", "timestamp": datetime.now().isoformat()}
@@ -555,6 +2021,7 @@ async def general_exception_handler(request, exc):
 # MAIN ENTRY POINT
 
 
+# Development server with auto-reload; serve.py runs multiple workers for production
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelResponse:
+    """Text returned by a model call plus the token usage reported for it"""
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+class ModelBackend:
+    """Interface every model backend implements"""
+
+    name = "base"
+
+    def warm(self, models: Iterable[str]):
+        """Create clients ahead of the first request"""
+
+    async def generate(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> ModelResponse:
+        raise NotImplementedError
+
+    def stream(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> AsyncIterator[ModelResponse]:
+        """Yield text chunks as they arrive; token counts are cumulative, final on the last chunk"""
+        raise NotImplementedError
+
+    async def count_tokens(self, model: str, text: str) -> Optional[int]:
+        """Exact input token count from the provider, or None if the backend has no counter"""
+        return None
+
+
+class GeminiBackend(ModelBackend):
+    """Google Gemini backend with one long-lived GenerativeModel per model name"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str]):
+        self.api_key = api_key
+        self._configured = False
+        self._clients: Dict[str, Any] = {}
+
+    def get_client(self, model: str):
+        client = self._clients.get(model)
+        if client is None:
+            if not self.api_key:
+                raise ValueError("Google API Key not configured")
+            import google.generativeai as genai
+            if not self._configured:
+                genai.configure(api_key=self.api_key)
+                self._configured = True
+            client = genai.GenerativeModel(model)
+            self._clients[model] = client
+        return client
+
+    def warm(self, models: Iterable[str]):
+        if not self.api_key:
+            logger.warning("Skipping model client warm-up: Google API Key not configured")
+            return
+        for model in models:
+            self.get_client(model)
+        logger.info(f"Model clients ready: {sorted(self._clients)}")
+
+    async def generate(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> ModelResponse:
+        response = await self.get_client(model).generate_content_async(
+            contents=prompt,
+            generation_config=generation_config
+        )
+        usage = getattr(response, "usage_metadata", None)
+        return ModelResponse(
+            text=self._text(model, response),
+            model=model,
+            prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0
+        )
+
+    @staticmethod
+    def _text(model: str, response) -> str:
+        """Response text, or "" when the candidate has no parts (response.text raises then)"""
+        candidates = getattr(response, "candidates", None) or []
+        if candidates and candidates[0].content.parts:
+            return response.text or ""
+        # e.g. MAX_TOKENS spent on thinking before any text, or SAFETY
+        finish_reason = getattr(candidates[0], "finish_reason", None) if candidates else None
+        logger.warning(f"Model {model} returned no text (finish reason: {getattr(finish_reason, 'name', finish_reason)})")
+        return ""
+
+    async def count_tokens(self, model: str, text: str) -> Optional[int]:
+        response = await self.get_client(model).count_tokens_async(text)
+        return response.total_tokens
+
+    async def stream(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> AsyncIterator[ModelResponse]:
+        response = await self.get_client(model).generate_content_async(
+            contents=prompt,
+            generation_config=generation_config,
+            stream=True
+        )
+        async for chunk in response:
+            usage = getattr(chunk, "usage_metadata", None)
+            yield ModelResponse(
+                text=chunk.text if chunk.parts else "",
+                model=model,
+                prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+                output_tokens=getattr(usage, "candidates_token_count", 0) or 0
+            )
+
+
+FAKE_WORDS = (
+    "energy system simple example people daily life idea change work learn "
+    "important help world process better understand common reason way make"
+).split()
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+CRITERIA_PATTERN = re.compile(r"^\s*-\s*(\w+):", re.MULTILINE)
+HEADING_PATTERN = re.compile(r"(?:^|(?<=\s))##\s+([^\n#]+?)[.\s]*$", re.MULTILINE)
+
+
+class FakeModelError(Exception):
+    """Injected failure; `code` 429 is treated as throttling, 500 as a hard error"""
+
+    def __init__(self, code: int):
+        super().__init__(f"Fake model error {code}")
+        self.code = code
+
+
+class FakeBackend(ModelBackend):
+    """Deterministic local backend for tests and benchmarks; never touches the network.
+
+    The same prompt always yields the same text. Evaluation prompts (those asking
+    for JSON) get a JSON object scoring every "- criterion:" line in the prompt.
+
+    For load tests, latency is drawn from `latency_distribution` around a mean of
+    `latency_ms` (plus `ms_per_word` of output), and `malformed_rate`,
+    `throttle_rate` and `error_rate` inject bad evaluation output, 429s and 500s.
+    Those draws come from a generator seeded with `seed`, so runs are repeatable.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 0.0, output_words: int = 120, stream_chunk_words: int = 8,
+                 latency_distribution: str = "fixed", latency_sigma: float = 0.5, ms_per_word: float = 0.0,
+                 malformed_rate: float = 0.0, throttle_rate: float = 0.0, error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{latency_distribution}'; expected one of {LATENCY_DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.output_words = output_words
+        self.stream_chunk_words = stream_chunk_words
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.ms_per_word = ms_per_word
+        self.malformed_rate = malformed_rate
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def sample_latency(self, text: str) -> float:
+        """Seconds to spend on one call returning `text`"""
+        mean = self.latency_ms
+        if mean <= 0 or self.latency_distribution == "fixed":
+            latency = max(mean, 0.0)
+        elif self.latency_distribution == "uniform":
+            latency = self._random.uniform(0, 2 * mean)
+        elif self.latency_distribution == "exponential":
+            latency = self._random.expovariate(1 / mean)
+        else:
+            # Mean-preserving lognormal: long right tail like real model latency
+            sigma = self.latency_sigma
+            latency = self._random.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+        return (latency + self.ms_per_word * len(text.split())) / 1000
+
+    def maybe_fail(self):
+        draw = self._random.random()
+        if draw < self.throttle_rate:
+            raise FakeModelError(429)
+        if draw < self.throttle_rate + self.error_rate:
+            raise FakeModelError(500)
+
+    def _malformed(self, text: str) -> str:
+        """A broken variant of a JSON score response, from recoverable to unusable"""
+        variant = self._random.randrange(4)
+        if variant == 0:
+            return "```json\n" + text.replace('"', "'") + ",\n```"
+        if variant == 1:
+            return "Scores: " + ", ".join(f"{key} = {value}/10" for key, value in json.loads(text).items())
+        if variant == 2:
+            return text[:len(text) // 2]
+        return "The content is generally solid but could use more detail."
+
+    @staticmethod
+    def _seed(model: str, prompt: str) -> bytes:
+        return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).digest()
+
+    def _scores(self, prompt: str, seed: bytes) -> str:
+        criteria = list(dict.fromkeys(CRITERIA_PATTERN.findall(prompt)))
+        return json.dumps({name: 5 + seed[i % len(seed)] % 5 for i, name in enumerate(criteria)})
+
+    def _text(self, prompt: str, seed: bytes, words: int) -> str:
+        body = [FAKE_WORDS[seed[i % len(seed)] % len(FAKE_WORDS)] for i in range(words)]
+        # Prompts that embed "## " headings (outline format, approved outline) get them echoed back
+        headings = list(dict.fromkeys(HEADING_PATTERN.findall(prompt)))
+        if not headings:
+            return " ".join(body)
+        per_section = max(words // len(headings), 1)
+        sections = []
+        for i, heading in enumerate(headings):
+            sections.append(f"## {heading}\n" + " ".join(body[i * per_section:(i + 1) * per_section]))
+        return "\n\n".join(sections)
+
+    def render(self, model: str, prompt: str) -> str:
+        seed = self._seed(model, prompt)
+        if "JSON" in prompt:
+            text = self._scores(prompt, seed)
+            if self.malformed_rate and self._random.random() < self.malformed_rate:
+                text = self._malformed(text)
+            return text
+        return self._text(prompt, seed, self.output_words)
+
+    async def generate(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> ModelResponse:
+        text = self.render(model, prompt)
+        latency = self.sample_latency(text)
+        if latency:
+            await asyncio.sleep(latency)
+        self.maybe_fail()
+        return ModelResponse(
+            text=text,
+            model=model,
+            prompt_tokens=len(prompt) // 4,
+            output_tokens=len(text) // 4
+        )
+
+    async def stream(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> AsyncIterator[ModelResponse]:
+        # Keep whitespace attached to each word so the chunks join back into render()'s exact output
+        text = self.render(model, prompt)
+        words = re.findall(r"\S+\s*", text)
+        chunks = [
+            "".join(words[i:i + self.stream_chunk_words])
+            for i in range(0, len(words), self.stream_chunk_words)
+        ] or [""]
+        delay = self.sample_latency(text) / len(chunks)
+        self.maybe_fail()
+        emitted = ""
+        for chunk in chunks:
+            if delay:
+                await asyncio.sleep(delay)
+            emitted += chunk
+            yield ModelResponse(
+                text=chunk,
+                model=model,
+                prompt_tokens=len(prompt) // 4,
+                output_tokens=len(emitted) // 4
+            )
+
+
+def create_backend(name: str, api_key: Optional[str] = None, **options) -> ModelBackend:
+    """Build the model backend selected by MODEL_BACKEND"""
+    if name == "gemini":
+        return GeminiBackend(api_key)
+    if name == "fake":
+        return FakeBackend(**options)
+    raise ValueError(f"Unknown model backend: {name}")
@@ -0,0 +1,229 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Lower value is served first when a model is at its concurrency limit
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# Priority of the model calls made by the current request/job; batch work sets "batch"
+call_priority: contextvars.ContextVar[str] = contextvars.ContextVar("call_priority", default="interactive")
+
+RETRYABLE_STATUS_CODES = (429, 503)
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for provider throttling/overload errors (HTTP 429/503) worth retrying"""
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+        return True
+    return type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable")
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to one minute's worth; 0 disables the limit"""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        if not self.per_minute:
+            return
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) * 60 / self.per_minute)
+
+    def charge(self, amount: float):
+        """Debit usage discovered after the fact (may go negative, delaying later callers)"""
+        if self.per_minute:
+            self._refill()
+            self.tokens -= amount
+
+
+class ModelLane:
+    """Concurrency slots, rate buckets and stats for one model"""
+
+    def __init__(self, model: str, concurrency: int, rpm: float, tpm: float):
+        self.model = model
+        self.max_concurrency = concurrency
+        self.limit = concurrency
+        self.in_flight = 0
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.cooldown_until = 0.0
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._successes = 0
+        self.stats = {
+            "calls": 0,
+            "retries": 0,
+            "throttled": 0,
+            "errors": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+        }
+
+    def queue_depth(self) -> Dict[str, int]:
+        depth = {name: 0 for name in PRIORITIES}
+        for priority, _, future, name in self._waiters:
+            if not future.done():
+                depth[name] += 1
+        return depth
+
+    async def acquire(self, priority: str):
+        self._wake()
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (PRIORITIES.get(priority, 1), next(self._sequence), future, priority))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed to us just as we were cancelled; pass it on
+                self.release()
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.limit:
+            _, _, future, _ = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def on_success(self):
+        # Additive increase: regain one slot after a run of successful calls
+        self._successes += 1
+        if self.limit < self.max_concurrency and self._successes >= self.limit:
+            self._successes = 0
+            self.limit += 1
+            self._wake()
+
+    def on_throttle(self, cooldown: float):
+        # Multiplicative decrease plus a shared pause so queued callers don't pile on
+        self._successes = 0
+        self.limit = max(1, self.limit // 2)
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+        self.stats["throttled"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        calls = self.stats["calls"]
+        return {
+            "concurrency_limit": self.limit,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth(),
+            **{key: round(value, 1) if isinstance(value, float) else value for key, value in self.stats.items()},
+            "wait_ms_avg": round(self.stats["wait_ms_total"] / calls, 1) if calls else 0.0,
+        }
+
+
+class ModelScheduler:
+    """Shared gate for every outbound model call.
+
+    Each model gets a priority-ordered concurrency limit, request- and
+    token-per-minute buckets, and jittered exponential backoff on 429/503 that
+    also halves the model's concurrency until calls succeed again.
+    """
+
+    def __init__(self, concurrency: int = 8, rpm: float = 0, tpm: float = 0,
+                 model_limits: Optional[Dict[str, Dict[str, float]]] = None,
+                 max_retries: int = 4, backoff_base: float = 1.0, backoff_max: float = 30.0):
+        self.defaults = {"concurrency": concurrency, "rpm": rpm, "tpm": tpm}
+        self.model_limits = model_limits or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lanes: Dict[str, ModelLane] = {}
+
+    def lane(self, model: str) -> ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            limits = {**self.defaults, **self.model_limits.get(model, {})}
+            lane = ModelLane(model, int(limits["concurrency"]), limits["rpm"], limits["tpm"])
+            self._lanes[model] = lane
+        return lane
+
+    def has_capacity(self, model: str) -> bool:
+        """True if a call to `model` would get a slot now, without queueing or waiting out a cooldown"""
+        lane = self.lane(model)
+        queued = sum(lane.queue_depth().values())
+        return lane.in_flight < lane.limit and not queued and lane.cooldown_until <= time.monotonic()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full jitter: uniform between 0 and the capped exponential delay"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @asynccontextmanager
+    async def slot(self, model: str, estimated_tokens: int = 0, priority: Optional[str] = None):
+        """Hold one concurrency slot for `model` after passing its rate limits"""
+        lane = self.lane(model)
+        priority = priority or call_priority.get()
+        started = time.perf_counter()
+        await lane.acquire(priority)
+        try:
+            pause = lane.cooldown_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            await lane.requests.acquire(1)
+            await lane.tokens.acquire(estimated_tokens)
+            waited_ms = (time.perf_counter() - started) * 1000
+            lane.stats["calls"] += 1
+            lane.stats["wait_ms_total"] += waited_ms
+            lane.stats["wait_ms_max"] = max(lane.stats["wait_ms_max"], waited_ms)
+            yield lane
+        finally:
+            lane.release()
+
+    async def run(self, model: str, call: Callable[[], Awaitable[T]], estimated_tokens: int = 0,
+                  priority: Optional[str] = None) -> T:
+        """Run `call` under the model's limits, retrying throttled attempts with backoff"""
+        attempt = 0
+        while True:
+            async with self.slot(model, estimated_tokens, priority) as lane:
+                try:
+                    result = await call()
+                except Exception as e:
+                    if not is_retryable(e) or attempt >= self.max_retries:
+                        lane.stats["errors"] += 1
+                        raise
+                    delay = self.backoff_delay(attempt)
+                    lane.on_throttle(delay)
+                    lane.stats["retries"] += 1
+                    logger.warning(f"Model {model} throttled ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                else:
+                    lane.on_success()
+                    actual_tokens = getattr(result, "prompt_tokens", 0) + getattr(result, "output_tokens", 0)
+                    lane.tokens.charge(max(0, actual_tokens - estimated_tokens))
+                    return result
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {model: lane.snapshot() for model, lane in self._lanes.items()}
@@ -0,0 +1,151 @@
+import logging
+import math
+import re
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from structured_logging import describe_error
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and single punctuation marks; long words cost roughly one token per 4 characters
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+WORD_PATTERN = re.compile(r"\w+")
+BULLET_PREFIX_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+EMPHASIS_PATTERN = re.compile(r"(\*\*|__)(.+?)\1")
+
+# Research bullets sharing this share of their words are treated as duplicates
+DUPLICATE_SIMILARITY = 0.8
+
+Compactor = Callable[[str, int], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate, close to Gemini's count for English prose and markdown"""
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in TOKEN_PIECE_PATTERN.findall(text or ""))
+
+
+def _similar(a: set, b: set) -> bool:
+    return bool(a) and bool(b) and len(a & b) / len(a | b) >= DUPLICATE_SIMILARITY
+
+
+def compact_research(research: str, max_tokens: int) -> str:
+    """Shrink research notes: drop near-duplicate bullets and emphasis, then trailing bullets past the budget"""
+    kept, kept_words = [], []
+    for line in research.splitlines():
+        line = " ".join(EMPHASIS_PATTERN.sub(r"\2", line).split())
+        if not line:
+            continue
+        words = set(WORD_PATTERN.findall(BULLET_PREFIX_PATTERN.sub("", line).lower()))
+        if any(_similar(words, seen) for seen in kept_words):
+            continue
+        kept.append(line)
+        kept_words.append(words)
+
+    # Research lists lead with the most relevant points, so trim from the end
+    result, used = [], 0
+    for line in kept:
+        cost = estimate_tokens(line) + 1
+        if result and used + cost > max_tokens:
+            break
+        result.append(line)
+        used += cost
+    return "\n".join(result)
+
+
+def compact_outline(outline: str, max_tokens: int) -> str:
+    """Reduce an outline to its headings; the section being written gets its points separately"""
+    headings = [line.strip() for line in outline.splitlines() if line.lstrip().startswith("#")]
+    return "\n".join(headings) if headings else outline
+
+
+class PromptBudget:
+    """Counts rendered prompts against per-stage input budgets and sets per-stage output budgets.
+
+    Prompts over their stage's input budget are re-rendered with the stage's
+    compactors applied, one field at a time, until they fit. Token counts come
+    from the local estimate; `count_tokens` (the model's own counter) is consulted
+    only when the estimate is within `exact_margin` of the budget.
+    """
+
+    def __init__(self, input_budgets: Dict[str, int], output_budgets: Dict[str, int],
+                 default_input_budget: int = 8000, default_output_budget: int = 4096,
+                 count_tokens: Optional[Callable[[str, str], Awaitable[Optional[int]]]] = None,
+                 exact_margin: float = 0.1):
+        self.input_budgets = input_budgets
+        self.output_budgets = output_budgets
+        self.default_input_budget = default_input_budget
+        self.default_output_budget = default_output_budget
+        self.count_tokens = count_tokens
+        self.exact_margin = exact_margin
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def input_budget(self, stage: str) -> int:
+        return self.input_budgets.get(stage, self.default_input_budget)
+
+    def output_budget(self, stage: str) -> int:
+        return self.output_budgets.get(stage, self.default_output_budget)
+
+    async def count(self, model: str, text: str, budget: int) -> int:
+        estimate = estimate_tokens(text)
+        if self.count_tokens is None or estimate < budget * (1 - self.exact_margin):
+            return estimate
+        try:
+            exact = await self.count_tokens(model, text)
+        except Exception as e:
+            logger.warning(f"Token count failed, using local estimate: {describe_error(e)}")
+            return estimate
+        return exact if exact is not None else estimate
+
+    async def fit(self, stage: str, model: str, template: str, fields: Dict[str, str],
+                  compactors: Optional[Dict[str, Compactor]] = None) -> Tuple[str, Dict[str, Any]]:
+        """Render `template` for a stage, compacting fields if needed; returns (prompt, report)"""
+        budget = self.input_budget(stage)
+        prompt = template.format(**fields)
+        original = tokens = await self.count(model, prompt, budget)
+        compacted = []
+        for field, compactor in (compactors or {}).items():
+            if tokens <= budget:
+                break
+            value = fields.get(field) or ""
+            overhead = await self.count(model, template.format(**{**fields, field: ""}), budget)
+            fields = {**fields, field: compactor(value, max(budget - overhead, 0))}
+            if fields[field] != value:
+                compacted.append(field)
+                prompt = template.format(**fields)
+                tokens = await self.count(model, prompt, budget)
+        if tokens > budget:
+            logger.warning(f"{stage} prompt is {tokens} tokens, over its {budget} token budget")
+
+        report = {
+            "stage": stage,
+            "input_tokens": tokens,
+            "input_budget": budget,
+            "output_budget": self.output_budget(stage),
+            "compacted": compacted,
+            "tokens_saved": original - tokens,
+            "over_budget": tokens > budget,
+        }
+        self._record(report)
+        return prompt, report
+
+    def _record(self, report: Dict[str, Any]):
+        stats = self._stats.setdefault(report["stage"], {
+            "prompts": 0, "input_tokens": 0, "max_input_tokens": 0, "compacted": 0, "tokens_saved": 0, "over_budget": 0
+        })
+        stats["prompts"] += 1
+        stats["input_tokens"] += report["input_tokens"]
+        stats["max_input_tokens"] = max(stats["max_input_tokens"], report["input_tokens"])
+        stats["compacted"] += bool(report["compacted"])
+        stats["tokens_saved"] += report["tokens_saved"]
+        stats["over_budget"] += report["over_budget"]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            stage: {
+                **stats,
+                "avg_input_tokens": round(stats["input_tokens"] / stats["prompts"], 1),
+                "input_budget": self.input_budget(stage),
+                "output_budget": self.output_budget(stage),
+            }
+            for stage, stats in self._stats.items()
+        }
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from string import Formatter
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PromptValidationError(ValueError):
+    """Raised when a prompt template is missing or uses unknown placeholders"""
+
+
+def get_template_fields(template: str) -> Set[str]:
+    """Return the placeholder names used by a str.format template"""
+    fields = set()
+    for _, field_name, _, _ in Formatter().parse(template):
+        if field_name is not None:
+            # "{topic.title}" / "{items[0]}" still need "topic" / "items" at format time
+            fields.add(field_name.split(".")[0].split("[")[0])
+    return fields
+
+
+def validate_prompts(prompts: Dict[str, str], placeholders: Dict[str, Set[str]]):
+    """Check every known template uses exactly its expected placeholders"""
+    errors = []
+    for name, expected in placeholders.items():
+        template = prompts.get(name)
+        if not isinstance(template, str) or not template.strip():
+            errors.append(f"{name}: template is missing or empty")
+            continue
+        try:
+            fields = get_template_fields(template)
+        except ValueError as e:
+            errors.append(f"{name}: invalid template syntax ({str(e)})")
+            continue
+        missing = expected - fields
+        unknown = fields - expected
+        if missing:
+            errors.append(f"{name}: missing placeholders {sorted(missing)}")
+        if unknown:
+            errors.append(f"{name}: unknown placeholders {sorted(unknown)}")
+    if errors:
+        raise PromptValidationError("; ".join(errors))
+
+
+def compute_prompt_version(prompts: Dict[str, str]) -> str:
+    """Short content hash identifying a set of prompts"""
+    payload = json.dumps(prompts, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:12]
+
+
+class PromptRegistry:
+    """In-memory prompt templates, reloaded only when prompt.json changes on disk.
+
+    Defaults fill in any template missing from the file and `overrides` (the
+    evaluation prompts) always win over the file contents.
+    """
+
+    def __init__(self, path: str, defaults: Dict[str, str], overrides: Dict[str, str],
+                 placeholders: Dict[str, Set[str]], check_interval: float = 1.0):
+        self.path = path
+        self.defaults = defaults
+        self.overrides = overrides
+        self.placeholders = placeholders
+        self.check_interval = check_interval
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self._prompts: Optional[Dict[str, str]] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _merge(self, prompts: Dict[str, str]) -> Dict[str, str]:
+        return {**self.defaults, **prompts, **self.overrides}
+
+    def _set(self, prompts: Dict[str, str], stamp: Optional[Tuple[int, int]]):
+        self._prompts = prompts
+        self._stamp = stamp
+        self.version = compute_prompt_version(prompts)
+        self.loaded_at = time.time()
+
+    def _load(self, stamp: Optional[Tuple[int, int]]):
+        if stamp is None:
+            self._set(self._merge({}), None)
+            return
+        try:
+            with open(self.path, "r") as f:
+                prompts = self._merge(json.load(f))
+            validate_prompts(prompts, self.placeholders)
+            self._set(prompts, stamp)
+            logger.info(f"Loaded prompts from {self.path} (version {self.version})")
+        except Exception as e:
+            logger.error(f"Error loading prompts: {str(e)}")
+            # Keep serving the last good prompts; don't retry until the file changes again
+            if self._prompts is None:
+                self._set(self._merge({}), stamp)
+            else:
+                self._stamp = stamp
+
+    def get(self) -> Dict[str, str]:
+        """Return the current prompts, re-reading the file only if its mtime/size changed"""
+        now = time.monotonic()
+        if self._prompts is not None and now - self._checked_at < self.check_interval:
+            return self._prompts
+        with self._lock:
+            self._checked_at = now
+            stamp = self._stat()
+            if self._prompts is None or stamp != self._stamp:
+                self._load(stamp)
+            return self._prompts
+
+    def update(self, prompts: Dict[str, str]) -> str:
+        """Validate, atomically write and activate new prompts; returns the new version"""
+        merged = self._merge(prompts)
+        validate_prompts(merged, self.placeholders)
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({**prompts, **self.overrides}, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._set(merged, self._stat())
+            self._checked_at = time.monotonic()
+        return self.version
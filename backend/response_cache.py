@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(stage: str, model: str, generation_config: Dict[str, Any], prompt: str,
+                   prompt_version: Optional[str] = None) -> str:
+    """Stable hash of everything that determines a model response"""
+    payload = json.dumps(
+        {
+            "stage": stage,
+            "model": model,
+            "config": generation_config,
+            "prompt_version": prompt_version,
+            "prompt": prompt,
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache for model responses.
+
+    The memory tier is a bounded LRU with a TTL. The optional disk tier keeps one
+    JSON file per entry under `disk_dir/<stage>/` so hits survive restarts; its
+    reads and writes run in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600, disk_dir: Optional[str] = None,
+                 disk_ttl: float = 7 * 24 * 3600, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_ttl = disk_ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats_counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bypassed": 0,
+        }
+
+    def _disk_path(self, stage: str, key: str) -> str:
+        return os.path.join(self.disk_dir, stage, f"{key}.json")
+
+    def _read_disk(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(stage, key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {str(e)}")
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("value")
+
+    def _write_disk(self, stage: str, key: str, value: Dict[str, Any]):
+        path = self._disk_path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"expires_at": time.time() + self.disk_ttl, "value": value}, f)
+        os.replace(tmp_path, path)
+
+    def _remember(self, key: str, stage: str, value: Dict[str, Any]):
+        self._entries[key] = (time.monotonic() + self.ttl, stage, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats_counters["evictions"] += 1
+
+    async def get(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, _, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats_counters["memory_hits"] += 1
+                return value
+            del self._entries[key]
+        if self.disk_dir:
+            value = await asyncio.to_thread(self._read_disk, stage, key)
+            if value is not None:
+                self._remember(key, stage, value)
+                self.stats_counters["disk_hits"] += 1
+                return value
+        self.stats_counters["misses"] += 1
+        return None
+
+    async def set(self, stage: str, key: str, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+        self._remember(key, stage, value)
+        self.stats_counters["stores"] += 1
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, stage, key, value)
+            except Exception as e:
+                logger.error(f"Error writing cache entry: {str(e)}")
+
+    def record_bypass(self):
+        self.stats_counters["bypassed"] += 1
+
+    def invalidate(self, stage: Optional[str] = None) -> int:
+        """Drop all entries, or only those for one stage; returns the number of memory entries removed"""
+        target = None
+        if self.disk_dir:
+            root = os.path.realpath(self.disk_dir)
+            target = os.path.realpath(os.path.join(root, stage)) if stage else root
+            # Only ever delete the cache directory or a stage directory strictly inside it
+            if stage and (target == root or os.path.commonpath([root, target]) != root):
+                raise ValueError(f"Stage '{stage}' is outside the cache directory")
+        keys = [key for key, (_, entry_stage, _) in self._entries.items() if stage is None or entry_stage == stage]
+        for key in keys:
+            del self._entries[key]
+        if target and os.path.isdir(target):
+            shutil.rmtree(target)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.stats_counters["memory_hits"] + self.stats_counters["disk_hits"]
+        lookups = hits + self.stats_counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_enabled": bool(self.disk_dir),
+            **self.stats_counters,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
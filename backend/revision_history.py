@@ -0,0 +1,100 @@
+import difflib
+import json
+import re
+import zlib
+from typing import Any, Dict, List, Union
+
+# Fields that change on every save without the content changing; they are not versioned
+VOLATILE_FIELDS = ("id", "last_saved")
+
+# Sentences and lines, each keeping its trailing punctuation, spaces or newline, so joining them gives the text back
+SEGMENT_PATTERN = re.compile(r"[^.!?\n]*(?:[.!?]+[ \t]*|\n|$)")
+
+# Edit script op: n > 0 copies n old segments, n < 0 skips -n old segments, a string is inserted
+PatchOp = Union[int, str]
+
+
+def versioned_content(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in data.items() if key not in VOLATILE_FIELDS}
+
+
+def encode(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+
+def decode(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def split_segments(text: str) -> List[str]:
+    return [segment for segment in SEGMENT_PATTERN.findall(text) if segment]
+
+
+def text_patch(old: str, new: str) -> List[PatchOp]:
+    """Sentence-level edit script from old to new; its size follows the edit, not the text"""
+    old_segments, new_segments = split_segments(old), split_segments(new)
+    patch: List[PatchOp] = []
+    matcher = difflib.SequenceMatcher(None, old_segments, new_segments, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            patch.append(i2 - i1)
+            continue
+        if i2 > i1:
+            patch.append(i1 - i2)
+        if j2 > j1:
+            patch.append("".join(new_segments[j1:j2]))
+    return patch
+
+
+def apply_text_patch(old: str, patch: List[PatchOp]) -> str:
+    segments = split_segments(old)
+    result, position = [], 0
+    for op in patch:
+        if isinstance(op, str):
+            result.append(op)
+        elif op > 0:
+            result.extend(segments[position:position + op])
+            position += op
+        else:
+            position -= op
+    return "".join(result)
+
+
+def make_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Changes from one version of a document to the next: text fields as edit scripts, other fields whole"""
+    delta: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key in old and old[key] == value:
+            continue
+        if isinstance(value, str) and isinstance(old.get(key), str):
+            delta.setdefault("patch", {})[key] = text_patch(old[key], value)
+        else:
+            delta.setdefault("set", {})[key] = value
+    removed = [key for key in old if key not in new]
+    if removed:
+        delta["del"] = removed
+    return delta
+
+
+def apply_delta(old: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    new = {key: value for key, value in old.items() if key not in delta.get("del", [])}
+    for key, patch in delta.get("patch", {}).items():
+        new[key] = apply_text_patch(old[key], patch)
+    new.update(delta.get("set", {}))
+    return new
+
+
+def diff_documents(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Per changed field: a unified line diff for text, before/after values for anything else"""
+    changes = {}
+    for key in sorted(set(old) | set(new)):
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        if isinstance(before, str) and isinstance(after, str):
+            changes[key] = {"diff": list(difflib.unified_diff(
+                before.splitlines(), after.splitlines(), "before", "after", n=1, lineterm=""
+            ))}
+        else:
+            changes[key] = {"before": before, "after": after}
+    return changes
@@ -0,0 +1,135 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+# Criteria scored for each evaluation type
+EVALUATION_CRITERIA = {
+    "research": ["depth", "relevance", "credibility"],
+    "outline": ["flow", "completeness", "clarity"],
+    "draft": ["quality", "coherence", "engagement"],
+}
+
+# Stages scored together by the "combined" evaluation type, in criteria order
+COMBINED_EVALUATION_STAGES = ["research", "outline", "draft"]
+
+# Strategies in the order they are tried; "failed" means no usable scores were found
+PARSE_STRATEGIES = ["json", "json_relaxed", "key_value"]
+
+FENCE_PATTERN = re.compile(r"```[a-zA-Z]*")
+SINGLE_QUOTED_PATTERN = re.compile(r"'([^'\\\n]*)'")
+UNQUOTED_KEY_PATTERN = re.compile(r"([{,]\s*)([A-Za-z_]\w*)(\s*:)")
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+SCORE_STRING_PATTERN = re.compile(r"^\s*(\d{1,2}(?:\.\d+)?)\s*(?:/\s*10)?\s*$")
+
+
+def get_criteria(evaluation_type: str) -> List[str]:
+    """Criteria for an evaluation type; "combined" covers all stages"""
+    if evaluation_type == "combined":
+        return [criterion for stage in COMBINED_EVALUATION_STAGES for criterion in EVALUATION_CRITERIA[stage]]
+    return EVALUATION_CRITERIA.get(evaluation_type, EVALUATION_CRITERIA["research"])
+
+
+@lru_cache(maxsize=None)
+def get_key_value_pattern(keywords: Tuple[str, ...]) -> Pattern:
+    """Compiled "<keyword> <separator> <score>" pattern for one set of keywords.
+
+    The keyword must be a whole word followed by a short separator (quotes,
+    markdown emphasis, ":", "=", "-", "is", "score of"), so a digit later in the
+    sentence is never picked up by mistake.
+    """
+    alternatives = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+    return re.compile(
+        rf"(?<![\w-])[\"'*_]*({alternatives})[\"'*_\s]*"
+        rf"(?:(?:[:=\-–]|\bis\b|\bscored?(?:\s+of)?\b)[\"'*_\s]*)+"
+        rf"(\d{{1,2}}(?:\.\d+)?)(?!\.?\d)",
+        re.IGNORECASE
+    )
+
+
+def coerce_score(value: Any) -> Optional[float]:
+    """Accept 8, 8.0, "8" and "8/10"; anything else (including bools) is rejected"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = value
+    elif isinstance(value, str):
+        match = SCORE_STRING_PATTERN.match(value)
+        if not match:
+            return None
+        number = float(match.group(1))
+    else:
+        return None
+    if not 1 <= number <= 10:
+        return None
+    return int(number) if float(number).is_integer() else number
+
+
+def select_scores(parsed: Any, keywords: List[str]) -> Optional[Dict[str, Any]]:
+    """Pick the expected criteria out of parsed JSON, looking one level into nested objects"""
+    if not isinstance(parsed, dict):
+        return None
+    # Keys are matched case-insensitively; nested dicts ({"scores": {...}} or per-stage groups) are merged in
+    flat: Dict[str, Any] = {}
+    for key, value in parsed.items():
+        if isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                flat.setdefault(str(inner_key).strip().lower(), inner_value)
+    for key, value in parsed.items():
+        if not isinstance(value, dict):
+            flat[str(key).strip().lower()] = value
+
+    result = {}
+    for keyword in keywords:
+        score = coerce_score(flat.get(keyword))
+        if score is None:
+            return None
+        result[keyword] = score
+    return result
+
+
+def relax_json(text: str) -> str:
+    """Repair the JSON slips models make: single quotes, unquoted keys, trailing commas"""
+    text = SINGLE_QUOTED_PATTERN.sub(r'"\1"', text)
+    text = UNQUOTED_KEY_PATTERN.sub(r'\1"\2"\3', text)
+    return TRAILING_COMMA_PATTERN.sub(r"\1", text)
+
+
+def parse_scores(raw_text: str, keywords: List[str]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Extract the expected scores from a model response in one pass over the text.
+
+    Returns (scores, strategy) where strategy is the entry of PARSE_STRATEGIES that
+    produced the scores, or (None, "failed").
+    """
+    if not raw_text:
+        return None, "failed"
+
+    text = FENCE_PATTERN.sub("", raw_text) if "```" in raw_text else raw_text
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end > start:
+        candidate = text[start:end + 1]
+        try:
+            scores = select_scores(json.loads(candidate), keywords)
+            if scores:
+                return scores, "json"
+        except ValueError:
+            pass
+        try:
+            scores = select_scores(json.loads(relax_json(candidate)), keywords)
+            if scores:
+                return scores, "json_relaxed"
+        except ValueError:
+            pass
+
+    result = {}
+    for match in get_key_value_pattern(tuple(keywords)).finditer(text):
+        keyword = match.group(1).lower()
+        if keyword in result:
+            continue
+        score = coerce_score(match.group(2))
+        if score is not None:
+            result[keyword] = score
+            if len(result) == len(keywords):
+                return {keyword: result[keyword] for keyword in keywords}, "key_value"
+    return None, "failed"
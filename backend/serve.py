@@ -0,0 +1,86 @@
+"""Production launcher: several uvicorn worker processes, no auto-reload.
+
+Each worker imports the app and runs its lifespan startup (prompts, model
+clients, content store import, job workers) before it accepts connections, so
+warm-up cost is paid at deploy time rather than by the first users. Point the
+load balancer's readiness probe at /api/ready and its liveness probe at
+/api/health. Run from the backend directory:
+
+    python serve.py                       # one worker while pipeline jobs are enabled
+    python serve.py --no-jobs --workers 4 --port 8080
+
+Jobs live in the memory of the worker that accepted them, so while jobs are
+enabled (JOBS_ENABLED, the default) the server runs a single worker. To scale
+out, run the interactive API with --no-jobs on several workers and jobs on a
+separate single-worker instance. The in-memory response cache and model call
+coalescing are per worker too.
+"""
+import argparse
+import logging
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+from structured_logging import setup_logging
+
+load_dotenv()
+
+# Server settings; every flag falls back to an environment variable
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(min(os.cpu_count() or 1, 4))))
+KEEP_ALIVE_TIMEOUT = int(os.getenv("KEEP_ALIVE_TIMEOUT", "5"))
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger("serve")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="worker processes")
+    parser.add_argument("--keep-alive", type=int, default=KEEP_ALIVE_TIMEOUT, help="idle keep-alive timeout (s)")
+    parser.add_argument("--graceful-timeout", type=int, default=GRACEFUL_SHUTDOWN_TIMEOUT,
+                        help="seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--no-jobs", dest="jobs", action="store_false", default=JOBS_ENABLED,
+                        help="disable pipeline jobs so the API can run on several workers")
+    parser.add_argument("--access-log", action="store_true",
+                        help="uvicorn access log (the app already logs one record per request)")
+    args = parser.parse_args()
+
+    # The supervisor logs through the same structured setup as the workers
+    setup_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        fmt=os.getenv("LOG_FORMAT", "text"),
+        use_queue=False
+    )
+    if not os.getenv("GOOGLE_API_KEY") and os.getenv("MODEL_BACKEND", "gemini") == "gemini":
+        logger.warning("GOOGLE_API_KEY is not set; model calls will fail")
+    if args.jobs and args.workers > 1:
+        # A job submitted to one worker would be 404 on all the others
+        logger.warning(f"Pipeline jobs are enabled, so serving with 1 worker instead of {args.workers}; "
+                       "use --no-jobs (JOBS_ENABLED=false) to run several")
+        args.workers = 1
+    # The workers read JOBS_ENABLED when they import the app
+    os.environ["JOBS_ENABLED"] = "true" if args.jobs else "false"
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=False,
+        # Let uvicorn's own loggers propagate to the structured handlers set up above and in each worker
+        log_config=None,
+        access_log=args.access_log,
+        proxy_headers=True,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import atexit
+import contextvars
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional
+
+# Set per request by the HTTP middleware and per model call; copied onto every record
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+stage_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("stage", default=None)
+
+MAX_PAYLOAD_CHARS = 200
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+# (uvicorn adds a "color_message" duplicate of the message to its own records)
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName", "color_message"}
+
+
+def truncate_payload(value: Any, limit: Optional[int] = None) -> Any:
+    """Short values pass through; long ones keep a prefix plus their length and a content hash"""
+    limit = MAX_PAYLOAD_CHARS if limit is None else limit
+    if not isinstance(value, str):
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        value = json.dumps(value, default=str)
+    if len(value) <= limit:
+        return value
+    digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+    return f"{value[:limit]}... [{len(value)} chars, sha256:{digest}]"
+
+
+def with_request_id(body: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Iterate a streaming response body under the id of the request that created it.
+
+    The body runs after the request middleware has returned, so the id is captured
+    now, when the response is created, and set around each step of the body (and
+    any tasks it starts).
+    """
+    return _iterate_with_request_id(body, request_id_var.get())
+
+
+async def _iterate_with_request_id(body: AsyncIterator[Any], request_id: Optional[str]) -> AsyncIterator[Any]:
+    iterator = body.__aiter__()
+    try:
+        while True:
+            token = request_id_var.set(request_id)
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                request_id_var.reset(token)
+            yield item
+    finally:
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
+
+
+def describe_error(error: BaseException) -> str:
+    """Exception type plus its truncated message; provider errors can echo prompt or response text"""
+    return f"{type(error).__name__}: {truncate_payload(str(error))}"
+
+
+class ContextFilter(logging.Filter):
+    """Stamps request id and stage on records in the caller's context, before they are queued"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # A stage passed explicitly through `extra=` wins over the context
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        if getattr(record, "stage", None) is None:
+            record.stage = stage_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only `rate` of DEBUG records so high-volume debug events stay cheap"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id, stage and any `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The usual "LEVEL:logger:message" line, with request id and extra fields appended"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{record.levelname}:{record.name}:{record.getMessage()}"
+        extras = {key: value for key, value in vars(record).items() if key not in STANDARD_ATTRIBUTES and value is not None}
+        if extras:
+            line += " " + " ".join(f"{key}={value}" for key, value in extras.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        elif record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for the listener thread, which does all formatting and I/O.
+
+    Only the message interpolation and traceback rendering happen on the caller's
+    thread, since the arguments and traceback may not outlive the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = "INFO", fmt: str = "text", use_queue: bool = True, debug_sample_rate: float = 1.0,
+                  max_payload_chars: int = MAX_PAYLOAD_CHARS) -> Optional[logging.handlers.QueueListener]:
+    """Configure the root logger; with `use_queue` the returned listener thread writes every record"""
+    global MAX_PAYLOAD_CHARS
+    MAX_PAYLOAD_CHARS = max_payload_chars
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    listener = None
+    handler: logging.Handler = output
+    if use_queue:
+        handler = NonBlockingQueueHandler(queue.SimpleQueue())
+        listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+        listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(listener.stop)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(SamplingFilter(debug_sample_rate))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    return listener
@@ -0,0 +1,34 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# main reads its configuration at import time: fake model backend, throwaway store and prompts
+TEST_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+shutil.copy(os.path.join(BACKEND_DIR, "prompt.json"), os.path.join(TEST_DIR, "prompt.json"))
+os.environ.update({
+    "MODEL_BACKEND": "fake",
+    "CONTENT_DB_PATH": os.path.join(TEST_DIR, "content.db"),
+    "PROMPTS_FILE": os.path.join(TEST_DIR, "prompt.json"),
+    "RESPONSE_CACHE_DIR": "",
+    "LOG_LEVEL": "WARNING",
+    "LOG_QUEUE": "false",
+})
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import main
+    return main
+
+
+@pytest.fixture(scope="session")
+def client(app_module):
+    from fastapi.testclient import TestClient
+    with TestClient(app_module.app) as test_client:
+        yield test_client
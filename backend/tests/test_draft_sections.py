@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from model_clients import ModelResponse
+
+DRAFT = "## Introduction\n\nSolar panels turn light into power.\n\n## Costs\n\nPanels cost less every year.\n\n## Conclusion\n\nSolar is worth a look."
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def empty_answers(app_module, monkeypatch):
+    """Model answers nothing (as after a SAFETY or MAX_TOKENS stop) for prompts containing a marker"""
+    markers = []
+    generate = app_module.model_backend.generate
+
+    async def generate_or_empty(model, prompt, generation_config):
+        if any(marker in prompt for marker in markers):
+            return ModelResponse(text="", model=model)
+        return await generate(model, prompt, generation_config)
+
+    monkeypatch.setattr(app_module.model_backend, "generate", generate_or_empty)
+    return markers
+
+
+def test_empty_section_revision_fails_instead_of_dropping_the_section(client, empty_answers):
+    empty_answers.append("Revise only the section")
+    request = {"draft": DRAFT, "feedback": "make the conclusion shorter", "mode": "sections", "use_cache": False}
+
+    response = client.post("/api/revise-draft", json=request)
+    assert response.status_code == 500
+    assert response.json()["error"] == "Failed to revise draft"
+
+    events = parse_sse(client.post("/api/revise-draft/stream", json=request).text)
+    assert events[-1][0] == "error"
+    assert not any(event == "chunk" and data["text"].strip().endswith("## Conclusion") for event, data in events)
+
+
+def test_section_revision_keeps_every_section_body(client):
+    request = {"draft": DRAFT, "feedback": "make the conclusion shorter", "mode": "sections", "use_cache": False}
+    result = client.post("/api/revise-draft", json=request).json()
+    assert [section["status"] for section in result["sections"]] == ["unchanged", "unchanged", "revised"]
+    assert not result["revised_draft"].rstrip().endswith("## Conclusion")
+
+
+OUTLINE = "## Introduction\n- What solar is\n\n## Costs\n- Panel prices\n\n## Conclusion\n- Takeaways"
+
+
+def test_empty_draft_section_fails_the_draft(client, empty_answers):
+    empty_answers.append('"Costs"')
+    request = {"outline": OUTLINE, "research_data": "notes", "mode": "sections", "use_cache": False}
+
+    response = client.post("/api/generate-draft", json=request)
+    assert response.status_code == 500
+    assert response.json()["error"] == "Failed to generate draft"
+
+    events = parse_sse(client.post("/api/generate-draft/stream", json=request).text)
+    assert events[-1][0] == "error"
+    assert [data["section"] for event, data in events if event == "chunk"] == ["Introduction"]
+
+
+def test_empty_draft_section_is_retried_once(app_module, client, monkeypatch):
+    calls = []
+    generate = app_module.model_backend.generate
+
+    async def empty_first_time(model, prompt, generation_config):
+        if '"Costs"' in prompt:
+            calls.append(prompt)
+            if len(calls) == 1:
+                return ModelResponse(text="", model=model)
+        return await generate(model, prompt, generation_config)
+
+    monkeypatch.setattr(app_module.model_backend, "generate", empty_first_time)
+    response = client.post("/api/generate-draft", json={"outline": OUTLINE, "research_data": "notes", "mode": "sections"})
+    assert response.status_code == 200 and len(calls) == 2
+    assert "## Costs\n\n" in response.json()["draft"]
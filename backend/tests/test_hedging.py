@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from model_clients import ModelResponse
+
+PRIMARY = "primary-model"
+FALLBACK = "fallback-model"
+
+
+@pytest.fixture
+def failing_primary(app_module, monkeypatch):
+    """Route research calls to PRIMARY with FALLBACK behind it; PRIMARY fails while `state["down"]`"""
+    state = {"down": True}
+    generate = app_module.model_backend.generate
+
+    async def flaky_generate(model, prompt, generation_config):
+        if model == PRIMARY and state["down"]:
+            raise RuntimeError("primary unavailable")
+        return await generate(model, prompt, generation_config)
+
+    monkeypatch.setattr(app_module.model_backend, "generate", flaky_generate)
+    monkeypatch.setitem(app_module.STAGE_MODELS, "research", PRIMARY)
+    monkeypatch.setitem(app_module.STAGE_FALLBACK_MODELS, "research", [FALLBACK])
+    return state
+
+
+def test_fallback_answer_is_served_but_not_cached(app_module, failing_primary):
+    async def research(prompt):
+        return await app_module.generate_text("research", prompt, {"max_output_tokens": 64})
+
+    response = asyncio.run(research("fallback cache check"))
+    assert response.model == FALLBACK and response.text
+
+    failing_primary["down"] = False
+    response = asyncio.run(research("fallback cache check"))
+    assert response.model == PRIMARY
+
+
+def warmed_hedger(**options):
+    from hedging import Hedger
+    hedger = Hedger(enabled=True, min_delay=0.01, min_samples=5, max_rate=1.0, **options)
+    for _ in range(5):
+        hedger.latency.observe("draft", 0.01)
+    return hedger
+
+
+def test_slot_wait_neither_counts_as_latency_nor_triggers_a_backup():
+    hedger = warmed_hedger()
+    calls = []
+
+    async def attempt(model, clock):
+        calls.append(model)
+        await asyncio.sleep(0.1)  # waiting for a scheduler slot
+        return await clock.time(asyncio.sleep(0.002, result=ModelResponse(text="ok", model=model)))
+
+    response = asyncio.run(hedger.run("draft", ["m"], attempt))
+    assert response.text == "ok"
+    assert calls == ["m"]
+    assert hedger.stats()["stages"]["draft"]["hedged"] == 0
+    assert max(hedger.latency._samples["draft"]) < 0.05
+
+
+def test_no_backup_to_a_model_without_a_free_slot():
+    hedger = warmed_hedger(has_capacity=lambda model: False)
+
+    async def attempt(model, clock):
+        return await clock.time(asyncio.sleep(0.05, result=ModelResponse(text="slow", model=model)))
+
+    assert asyncio.run(hedger.run("draft", ["m"], attempt)).text == "slow"
+    stats = hedger.stats()["stages"]["draft"]
+    assert stats["hedged"] == 0 and stats["hedge_skipped"] == 1
+
+
+def test_slow_call_is_hedged_and_the_loser_cancelled(app_module, client, monkeypatch):
+    from hedging import Hedger
+    hedger = Hedger(enabled=True, min_delay=0.01, min_samples=5, max_rate=1.0,
+                    has_capacity=app_module.model_scheduler.has_capacity)
+    for _ in range(5):
+        hedger.latency.observe("outline", 0.01)
+    monkeypatch.setattr(app_module, "model_hedger", hedger)
+    generate = app_module.model_backend.generate
+    calls = []
+
+    async def first_call_hangs(model, prompt, generation_config):
+        calls.append(model)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return await generate(model, prompt, generation_config)
+
+    monkeypatch.setattr(app_module.model_backend, "generate", first_call_hangs)
+    model = app_module.get_stage_model("outline")
+    cancelled_before = app_module.MODEL_CALLS.value(stage="outline", model=model, outcome="cancelled")
+
+    async def outline():
+        return await app_module.generate_text("outline", "hedge me", {"max_output_tokens": 64}, use_cache=False)
+
+    response = asyncio.run(outline())
+    assert response.text
+    assert calls == [model, model]
+    stats = hedger.stats()["stages"]["outline"]
+    assert stats["hedged"] == 1 and stats["backup_wins"] == 1
+    assert app_module.MODEL_CALLS.value(stage="outline", model=model, outcome="cancelled") == cancelled_before + 1
+
+    metrics = client.get("/metrics").text
+    assert "# TYPE model_hedged_calls_total counter" in metrics
+    assert 'model_hedged_calls_total{stage="outline"} 1' in metrics
+    assert 'model_hedge_backup_wins_total{stage="outline"} 1' in metrics
+
+
+def test_fallback_is_counted(app_module, client, failing_primary):
+    async def research():
+        return await app_module.generate_text("research", "count the fallback", {"max_output_tokens": 64},
+                                              use_cache=False)
+
+    before = app_module.model_hedger.stats()["stages"].get("research", {}).get("fallbacks", 0)
+    assert asyncio.run(research()).model == FALLBACK
+    assert app_module.model_hedger.stats()["stages"]["research"]["fallbacks"] == before + 1
+    assert f'model_fallback_calls_total{{stage="research"}} {before + 1}' in client.get("/metrics").text
+
+
+def test_last_model_failure_is_raised(app_module, monkeypatch, failing_primary):
+    monkeypatch.setitem(app_module.STAGE_FALLBACK_MODELS, "research", [])
+
+    async def research():
+        return await app_module.generate_text("research", "no fallback", {"max_output_tokens": 64}, use_cache=False)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(research())
@@ -0,0 +1,41 @@
+import pytest
+
+from local_scorer import LocalScorer
+
+scorer = LocalScorer()
+
+
+@pytest.mark.parametrize("first, last", [
+    ("Introduction", "Conclusion"),
+    ("Introduction: Why Solar Matters", "Conclusion: Key Takeaways"),
+    ("Section 1: Intro to Home Solar", "Final Thoughts"),
+    ("**Introduction**", "Summary"),
+])
+def test_outline_introduction_and_conclusion_by_leading_word(first, last):
+    outline = f"## {first}\n- Hook\n\n## Costs\n- Prices\n\n## {last}\n- Takeaways"
+    result = scorer.score_outline(outline)
+    assert result["passed"], result["failed_checks"]
+    assert result["features"]["body_sections"] == 1
+
+
+def test_outline_without_introduction_fails():
+    result = scorer.score_outline("## Costs\n- Prices\n\n## Why an introduction comes last\n- Odd\n\n## Conclusion\n- End")
+    assert result["failed_checks"] == ["introduction"]
+
+
+OUTLINE = "## Introduction\n- Hook\n\n## Costs\n- Prices\n\n## Conclusion\n- Takeaways"
+
+
+def test_draft_without_section_headings_is_not_failed_on_coverage():
+    paragraph = " ".join(["Solar panels save money on power bills over time."] * 18)
+    draft = f"**Introduction**\n\n{paragraph}\n\n**Costs**\n\n{paragraph}\n\n**Conclusion**\n\n{paragraph}"
+    result = scorer.score_draft(draft, OUTLINE)
+    assert result["passed"], result["failed_checks"]
+    assert result["features"]["heading_coverage"] is None
+
+
+def test_draft_missing_outline_sections_fails_coverage():
+    paragraph = " ".join(["Solar panels save money on power bills over time."] * 18)
+    draft = f"## Weather\n\n{paragraph}\n\n## Gardening\n\n{paragraph}\n\n## Conclusion\n\n{paragraph}"
+    result = scorer.score_draft(draft, OUTLINE)
+    assert result["failed_checks"] == ["heading_coverage"]
@@ -0,0 +1,21 @@
+def test_skipped_stages_have_null_scores_that_are_not_indexed(client):
+    content_data = {
+        "topic": "skipped stage scores",
+        "research_data": "- Panels are cheaper\n- Panels last long",
+        "approved_outline": "## Introduction\n- Hook\n\n## Costs\n- Prices\n\n## Conclusion\n- Takeaways",
+        "final_draft": "Too short.",
+    }
+    response = client.post("/api/evaluate-content", json={
+        "content_data": content_data, "local_policy": "skip", "use_cache": False
+    })
+    assert response.status_code == 200
+    result = response.json()
+    assert result["evaluation_status"]["draft"] == "skipped"
+    assert result["evaluations"]["draft"] == {"quality": None, "coherence": None, "engagement": None}
+    assert all(isinstance(score, int) for score in result["evaluations"]["research"].values())
+
+    saved = client.post("/api/save-content", json={"content_data": {**content_data, "evaluations": result["evaluations"]}}).json()
+    listed = client.get("/api/content", params={"where": "engagement<6", "topic": content_data["topic"]}).json()
+    assert saved["id"] not in [item["id"] for item in listed["items"]]
+    stored = client.get(f"/api/content/{saved['id']}", params={"fields": "scores"}).json()["content_data"]
+    assert "engagement" not in stored["scores"]
@@ -0,0 +1,77 @@
+import logging
+
+import structured_logging
+
+
+def test_model_errors_are_truncated_in_logs_and_responses(app_module, client, monkeypatch, caplog):
+    leaked = "PROMPT TEXT " * 500
+
+    async def echoing_failure(model, prompt, generation_config):
+        raise RuntimeError(leaked)
+
+    monkeypatch.setattr(app_module.model_backend, "generate", echoing_failure)
+    with caplog.at_level(logging.ERROR, logger="main"):
+        response = client.post("/api/generate-research", json={"topic": "truncation", "use_cache": False})
+
+    assert response.status_code == 500
+    assert len(response.json()["error"]) < 2 * structured_logging.MAX_PAYLOAD_CHARS
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages and all(len(message) < 2 * structured_logging.MAX_PAYLOAD_CHARS for message in messages)
+    assert any("RuntimeError" in message for message in messages)
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.addFilter(structured_logging.ContextFilter())
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_records_logged_while_streaming_carry_the_request_id(app_module, client, monkeypatch):
+    async def failing_stream(model, prompt, generation_config):
+        raise RuntimeError("stream broke")
+        yield
+
+    monkeypatch.setattr(app_module.model_backend, "stream", failing_stream)
+    handler = CollectingHandler()
+    logging.getLogger().addHandler(handler)
+    try:
+        with client.stream("POST", "/api/generate-research/stream", json={"topic": "ids", "use_cache": False},
+                           headers={"X-Request-ID": "stream-request-1"}) as response:
+            body = "".join(response.iter_text())
+    finally:
+        logging.getLogger().removeHandler(handler)
+
+    assert response.headers["X-Request-ID"] == "stream-request-1"
+    assert "event: error" in body
+    streamed = [record for record in handler.records if record.getMessage().startswith("Error streaming research")]
+    assert streamed and all(record.request_id == "stream-request-1" for record in streamed)
+
+
+def test_streaming_body_keeps_the_request_id_after_the_middleware_returns():
+    import asyncio
+    import contextvars
+
+    seen = []
+
+    async def body():
+        for chunk in ("a", "b"):
+            seen.append(structured_logging.request_id_var.get())
+            yield chunk
+
+    def create_in_request():
+        structured_logging.request_id_var.set("created-in-request")
+        return structured_logging.with_request_id(body())
+
+    # Created while the request id is set, iterated from a context without it
+    stream = contextvars.copy_context().run(create_in_request)
+
+    async def consume():
+        assert structured_logging.request_id_var.get() is None
+        return [chunk async for chunk in stream]
+
+    assert asyncio.run(consume()) == ["a", "b"]
+    assert seen == ["created-in-request", "created-in-request"]
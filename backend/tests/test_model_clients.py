@@ -0,0 +1,31 @@
+import asyncio
+from types import SimpleNamespace
+
+from model_clients import GeminiBackend
+
+
+class EmptyCandidateResponse:
+    """Like a Gemini response whose thinking used up max_output_tokens: no parts, and .text raises"""
+
+    candidates = [SimpleNamespace(content=SimpleNamespace(parts=[]), finish_reason=SimpleNamespace(name="MAX_TOKENS"))]
+    usage_metadata = SimpleNamespace(prompt_token_count=12, candidates_token_count=0)
+
+    @property
+    def text(self):
+        raise ValueError("The `response.text` quick accessor requires the response to contain a valid `Part`")
+
+
+class StubClient:
+    async def generate_content_async(self, contents, generation_config=None):
+        return EmptyCandidateResponse()
+
+
+def test_generate_returns_empty_text_for_a_candidate_without_parts(caplog):
+    backend = GeminiBackend(api_key="test")
+    backend._clients["gemini-test"] = StubClient()
+
+    response = asyncio.run(backend.generate("gemini-test", "prompt", {"max_output_tokens": 16}))
+
+    assert response.text == ""
+    assert response.prompt_tokens == 12
+    assert any("MAX_TOKENS" in record.getMessage() for record in caplog.records)
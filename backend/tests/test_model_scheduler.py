@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from model_scheduler import ModelScheduler
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+def scheduler(**options):
+    # Millisecond backoff keeps the retries fast
+    return ModelScheduler(concurrency=4, backoff_base=0.001, backoff_max=0.002, **options)
+
+
+def test_throttled_calls_are_retried_and_halve_the_concurrency_limit():
+    gate = scheduler()
+    failures = iter([ResourceExhausted("slow down"), ResourceExhausted("slow down")])
+
+    async def call():
+        error = next(failures, None)
+        if error:
+            raise error
+        return "answer"
+
+    assert asyncio.run(gate.run("model", call)) == "answer"
+    stats = gate.stats()["model"]
+    assert stats["retries"] == 2 and stats["throttled"] == 2 and stats["errors"] == 0
+    # 4 -> 2 -> 1 on the throttles, then one slot back for the success
+    assert stats["concurrency_limit"] == 2
+
+
+def test_the_limit_grows_back_after_successful_calls():
+    gate = scheduler()
+    gate.lane("model").on_throttle(0)
+    gate.lane("model").on_throttle(0)
+    assert gate.lane("model").limit == 1
+
+    async def call():
+        return "answer"
+
+    async def scenario():
+        for _ in range(10):
+            await gate.run("model", call)
+
+    asyncio.run(scenario())
+    assert gate.lane("model").limit == 4
+
+
+def test_retries_stop_at_max_retries_and_other_errors_are_not_retried():
+    gate = scheduler(max_retries=2)
+    attempts = []
+
+    async def throttled():
+        attempts.append("throttled")
+        raise ResourceExhausted("slow down")
+
+    async def broken():
+        attempts.append("broken")
+        raise ValueError("bad request")
+
+    with pytest.raises(ResourceExhausted):
+        asyncio.run(gate.run("model", throttled))
+    with pytest.raises(ValueError):
+        asyncio.run(gate.run("model", broken))
+    assert attempts == ["throttled"] * 3 + ["broken"]
+    assert gate.stats()["model"]["errors"] == 2
+
+
+def test_backoff_delay_is_capped_and_jittered():
+    gate = ModelScheduler(backoff_base=1.0, backoff_max=5.0)
+    delays = [gate.backoff_delay(attempt) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= delay <= 5.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_waiting_calls_are_served_interactive_first():
+    gate = ModelScheduler(concurrency=1)
+    order = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            await release.wait()
+
+        async def record(name):
+            order.append(name)
+
+        holder = asyncio.ensure_future(gate.run("model", hold))
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.ensure_future(gate.run("model", lambda: record("batch"), priority="batch")),
+            asyncio.ensure_future(gate.run("model", lambda: record("interactive"), priority="interactive")),
+        ]
+        await asyncio.sleep(0)
+        assert not gate.has_capacity("model")
+        release.set()
+        await asyncio.gather(holder, *waiting)
+
+    asyncio.run(scenario())
+    assert order == ["interactive", "batch"]
+    assert gate.has_capacity("model")
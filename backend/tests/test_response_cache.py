@@ -0,0 +1,69 @@
+import asyncio
+import os
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+def fill(cache, stage, key):
+    asyncio.run(cache.set(stage, key, {"text": key}))
+
+
+def test_invalidate_stage_drops_memory_and_disk_entries(tmp_path):
+    cache = ResponseCache(disk_dir=str(tmp_path / "cache"))
+    fill(cache, "research", "a")
+    fill(cache, "outline", "b")
+
+    assert cache.invalidate("research") == 1
+    assert not (tmp_path / "cache" / "research").exists()
+    assert (tmp_path / "cache" / "outline" / "b.json").exists()
+    assert asyncio.run(cache.get("outline", "b")) == {"text": "b"}
+
+
+def test_invalidate_all_drops_the_cache_directory(tmp_path):
+    cache = ResponseCache(disk_dir=str(tmp_path / "cache"))
+    fill(cache, "research", "a")
+
+    assert cache.invalidate() == 1
+    assert not (tmp_path / "cache").exists()
+    # Nothing left to delete is not an error
+    assert cache.invalidate() == 0
+
+
+@pytest.mark.parametrize("stage", ["../victim", "..", ".", "/", "research/../../victim"])
+def test_invalidate_refuses_paths_outside_the_cache_directory(tmp_path, stage):
+    victim = tmp_path / "victim"
+    victim.mkdir()
+    (victim / "keep.txt").write_text("keep")
+    cache = ResponseCache(disk_dir=str(tmp_path / "cache"))
+    fill(cache, "research", "a")
+
+    with pytest.raises(ValueError):
+        cache.invalidate(stage)
+    assert (victim / "keep.txt").exists()
+    assert (tmp_path / "cache" / "research" / "a.json").exists()
+
+
+def test_invalidate_refuses_symlinked_stage_directories(tmp_path):
+    victim = tmp_path / "victim"
+    victim.mkdir()
+    (tmp_path / "cache").mkdir()
+    os.symlink(victim, tmp_path / "cache" / "research")
+    cache = ResponseCache(disk_dir=str(tmp_path / "cache"))
+
+    with pytest.raises(ValueError):
+        cache.invalidate("research")
+    assert victim.exists()
+
+
+@pytest.mark.parametrize("stage", ["../victim", "/", "", "not_a_stage"])
+def test_invalidate_route_rejects_unknown_stages(client, stage):
+    response = client.post("/api/cache/invalidate", json={"stage": stage})
+    assert response.status_code == 400
+
+
+def test_invalidate_route_accepts_known_stages(client):
+    response = client.post("/api/cache/invalidate", json={"stage": "draft_evaluation"})
+    assert response.status_code == 200
+    assert client.post("/api/cache/invalidate", json={}).status_code == 200
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import revision_history
+from content_store import ContentStore
+
+DRAFT = "First sentence. Second sentence! A third one?\nA new line.\n\nLast paragraph."
+
+
+@pytest.mark.parametrize("new", [
+    DRAFT,
+    DRAFT.replace("Second sentence!", "A rewritten second sentence!"),
+    "Opening line. " + DRAFT,
+    DRAFT + " An extra ending.",
+    DRAFT.replace("A third one?\n", ""),
+    "",
+    "Completely different text without punctuation",
+])
+def test_text_patch_round_trips(new):
+    patch = revision_history.text_patch(DRAFT, new)
+    assert revision_history.apply_text_patch(DRAFT, patch) == new
+
+
+def test_small_edit_makes_a_small_patch():
+    draft = " ".join(f"Sentence number {index} of a long draft." for index in range(200))
+    edited = draft.replace("Sentence number 100 of", "The edited sentence 100 of")
+    patch = revision_history.text_patch(draft, edited)
+    assert len(json.dumps(patch)) < len(edited) / 20
+
+
+def test_delta_round_trips_text_other_and_removed_fields():
+    old = {"topic": "t", "draft": DRAFT, "scores": {"clarity": 6}, "outline": "x"}
+    new = {"topic": "t", "draft": DRAFT + " More.", "scores": {"clarity": 8}, "research": "new"}
+    delta = revision_history.make_delta(old, new)
+    assert set(delta) == {"patch", "set", "del"}
+    assert "topic" not in delta["set"] and delta["del"] == ["outline"]
+    assert revision_history.apply_delta(old, delta) == new
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ContentStore(str(tmp_path / "history.db"), snapshot_interval=3)
+    yield store
+    store.close()
+
+
+def test_every_version_is_rebuilt_from_snapshots_and_deltas(store):
+    drafts = [DRAFT + " Edit %d." % index for index in range(7)]
+    doc_id = store.save({"topic": "history", "draft": drafts[0]})["id"]
+    for draft in drafts[1:]:
+        store.save({"id": doc_id, "topic": "history", "draft": draft})
+
+    history = store.versions(doc_id)
+    assert [entry["version"] for entry in history["versions"]] == [7, 6, 5, 4, 3, 2, 1]
+    # A snapshot every snapshot_interval versions, deltas in between
+    assert [entry["kind"] for entry in reversed(history["versions"])] == [
+        "snapshot", "delta", "delta", "snapshot", "delta", "delta", "snapshot"
+    ]
+    assert history["stored_bytes"] < history["full_copy_bytes"]
+    for version, draft in enumerate(drafts, start=1):
+        assert store.get_version(doc_id, version, ["draft"]) == {"draft": draft}
+    assert store.latest_version(doc_id) == 7
+    assert store.get_version(doc_id, 8) is None
+
+
+def test_saving_unchanged_content_adds_no_version(store):
+    doc_id = store.save({"topic": "same", "draft": DRAFT})["id"]
+    assert store.save({"id": doc_id, "topic": "same", "draft": DRAFT})["version"] == 1
+    assert len(store.versions(doc_id)["versions"]) == 1
+
+
+def test_diff_versions(store):
+    doc_id = store.save({"topic": "diff", "draft": "One.\nTwo.", "stage": "draft"})["id"]
+    store.save({"id": doc_id, "topic": "diff", "draft": "One.\nTwo, revised."})
+
+    diff = store.diff_versions(doc_id, 1, 2)
+    assert set(diff["changes"]) == {"draft", "stage"}
+    assert "+Two, revised." in diff["changes"]["draft"]["diff"]
+    assert diff["changes"]["stage"] == {"before": "draft", "after": None}
+    assert store.diff_versions(doc_id, 1, 3) is None
+
+
+def test_delete_removes_the_history(store):
+    doc_id = store.save({"topic": "gone", "draft": DRAFT})["id"]
+    store.save({"id": doc_id, "topic": "gone", "draft": DRAFT + " More."})
+
+    assert store.delete(doc_id)
+    assert store.versions(doc_id) is None
+    assert store.get_version(doc_id, 1) is None
+    assert not store.delete(doc_id)
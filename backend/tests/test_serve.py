@@ -0,0 +1,50 @@
+import asyncio
+import sys
+
+import pytest
+
+import serve
+
+
+@pytest.fixture
+def launched(monkeypatch):
+    calls = []
+    monkeypatch.setattr(serve.uvicorn, "run", lambda app, **options: calls.append(options))
+    monkeypatch.setenv("JOBS_ENABLED", "true")
+
+    def launch(*args):
+        monkeypatch.setattr(sys, "argv", ["serve.py", *args])
+        serve.main()
+        return calls[-1]
+    return launch
+
+
+def test_one_worker_while_jobs_are_enabled(launched):
+    assert launched("--workers", "4")["workers"] == 1
+
+
+def test_several_workers_without_jobs(launched, monkeypatch):
+    assert launched("--no-jobs", "--workers", "4")["workers"] == 4
+    assert serve.os.environ["JOBS_ENABLED"] == "false"
+
+
+def test_job_routes_answer_503_when_jobs_are_disabled(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "JOBS_ENABLED", False)
+    assert client.get("/api/jobs").status_code == 503
+    assert client.post("/api/jobs", json={"topic": "disabled"}).status_code == 503
+    assert client.get("/api/jobs/missing").status_code == 503
+
+
+def test_content_store_is_opened_by_the_lifespan(app_module, client, monkeypatch, tmp_path):
+    steps = [name for name, _ in app_module.STARTUP_STEPS]
+    assert steps.index("content_store") < steps.index("legacy_content") < steps.index("job_workers")
+    assert app_module.content_store is not None
+
+    opened = app_module.content_store
+    monkeypatch.setattr(app_module, "CONTENT_DB_PATH", str(tmp_path / "lifespan.db"))
+    try:
+        asyncio.run(app_module.open_content_store())
+        assert app_module.content_store.path == str(tmp_path / "lifespan.db")
+        app_module.content_store.close()
+    finally:
+        app_module.content_store = opened
@@ -0,0 +1,106 @@
+import pytest
+
+
+@pytest.fixture
+def session(client):
+    response = client.post("/api/sessions", json={"topic": "Bees"})
+    assert response.status_code == 200
+    return response.json()["session_id"]
+
+
+def step(client, session_id, name, **body):
+    return client.post(f"/api/sessions/{session_id}/{name}", json=body)
+
+
+def test_workflow_steps_return_only_what_changed(client, session):
+    response = step(client, session, "research")
+    assert response.status_code == 200
+    assert response.json()["version"] == 2 and list(response.json()["changes"]) == ["research_data"]
+    assert list(step(client, session, "outline").json()["changes"]) == ["outline"]
+
+    assert step(client, session, "draft").status_code == 400  # no approved_outline yet
+    response = client.patch(f"/api/sessions/{session}", json={"copy_fields": {"approved_outline": "outline"}})
+    assert list(response.json()["changes"]) == ["approved_outline"]
+    response = step(client, session, "draft")
+    assert response.status_code == 200 and list(response.json()["changes"]) == ["draft"]
+
+    state = client.get(f"/api/sessions/{session}").json()
+    assert state["version"] == 5 and state["content_data"]["approved_outline"] == state["content_data"]["outline"]
+    assert list(client.get(f"/api/sessions/{session}", params={"version": 2}).json()["content_data"]) \
+        == ["topic", "research_data", "id"]
+
+
+def test_stale_base_version_is_a_conflict(client, session):
+    response = client.patch(f"/api/sessions/{session}", json={"changes": {"topic": "Wasps"}, "base_version": 1})
+    assert response.status_code == 200 and response.json()["version"] == 2
+
+    response = client.patch(f"/api/sessions/{session}", json={"changes": {"topic": "Ants"}, "base_version": 1})
+    assert response.status_code == 409
+    response = client.patch(f"/api/sessions/{session}", json={"copy_fields": {"outline": "topic"}, "base_version": 1})
+    assert response.status_code == 409
+    assert client.get(f"/api/sessions/{session}").json()["content_data"]["topic"] == "Wasps"
+
+
+def test_step_on_an_old_version_does_not_overwrite_newer_work(client, session):
+    step(client, session, "research")
+    client.patch(f"/api/sessions/{session}", json={"changes": {"topic": "Wasps"}})
+
+    response = step(client, session, "outline", version=2)
+    assert response.status_code == 409
+    assert client.get(f"/api/sessions/{session}").json()["content_data"].get("outline") is None
+    assert step(client, session, "outline").status_code == 200
+
+
+def test_streamed_step_saves_its_result_against_the_version_it_read(client, session):
+    step(client, session, "research")
+    step(client, session, "outline")
+    client.patch(f"/api/sessions/{session}", json={"copy_fields": {"approved_outline": "outline"}})
+    with client.stream("POST", f"/api/sessions/{session}/draft/stream", json={}) as response:
+        body = "".join(response.iter_text())
+    assert '"changed": ["draft"]' in body and '"version": 5' in body
+
+    client.patch(f"/api/sessions/{session}", json={"changes": {"topic": "Wasps"}})
+    with client.stream("POST", f"/api/sessions/{session}/revise/stream",
+                       json={"feedback": "shorter", "version": 5}) as response:
+        body = "".join(response.iter_text())
+    assert "event: error" in body and "not the latest version" in body
+
+
+def test_evaluate_uses_the_working_draft_until_one_is_final(client, session):
+    for name in ("research", "outline"):
+        step(client, session, name)
+    client.patch(f"/api/sessions/{session}", json={"copy_fields": {"approved_outline": "outline"}})
+    step(client, session, "draft")
+
+    response = step(client, session, "evaluate")
+    assert response.status_code == 200
+    assert set(response.json()["changes"]["evaluations"]) == {"research", "outline", "draft"}
+
+
+def test_sessions_are_kept_out_of_content_listings(client, session):
+    saved = client.post("/api/save-content", json={"content_data": {"topic": "Saved article"}}).json()
+
+    content_ids = [item["id"] for item in client.get("/api/content", params={"limit": 100}).json()["items"]]
+    assert session not in content_ids and saved["id"] in content_ids
+    session_ids = [item["id"] for item in client.get("/api/content", params={"kind": "session", "limit": 100}).json()["items"]]
+    assert session in session_ids and saved["id"] not in session_ids
+    assert client.get("/api/load-content").json()["content_data"]["id"] == saved["id"]
+    assert client.get("/api/content", params={"kind": "bogus"}).status_code == 400
+
+
+def test_stores_from_before_document_kinds_are_migrated(tmp_path):
+    import sqlite3
+
+    from content_store import CRITERIA, ContentStore
+
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    criteria = ", ".join(f"{criterion} REAL" for criterion in CRITERIA)
+    conn.execute("CREATE TABLE documents (id TEXT PRIMARY KEY, topic TEXT NOT NULL DEFAULT '', stage TEXT NOT NULL, "
+                 f"created_at TEXT NOT NULL, last_saved TEXT NOT NULL, {criteria}, data TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+
+    store = ContentStore(path)
+    saved = store.save({"topic": "old"})
+    assert store.list(fields=["id", "kind"])["items"] == [{"id": saved["id"], "kind": "content"}]
@@ -0,0 +1,106 @@
+import asyncio
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_with_the_same_key_share_one_call():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(flights.do("key", call) for _ in range(5)), flights.do("other", call))
+        return flights, calls, results
+
+    flights, calls, results = asyncio.run(scenario())
+    assert calls == 2
+    assert [result for result, _ in results] == ["answer"] * 6
+    assert [shared for _, shared in results[:5]] == [False, True, True, True, True]
+    assert flights.stats() == {"calls": 2, "coalesced": 4, "in_flight": 0}
+
+
+def test_joiners_get_the_shared_exception():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream failed")
+
+        return await asyncio.gather(flights.do("key", call), flights.do("key", call), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_a_cancelled_waiter_leaves_the_shared_call_running_for_the_others():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        cancelled = False
+
+        async def call():
+            nonlocal cancelled
+            try:
+                await release.wait()
+                return "answer"
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        first = asyncio.ensure_future(flights.do("key", call))
+        second = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await second, first.cancelled(), cancelled
+
+    (result, shared), first_cancelled, call_cancelled = asyncio.run(scenario())
+    assert result == "answer" and shared
+    assert first_cancelled and not call_cancelled
+
+
+def test_the_shared_call_is_cancelled_when_its_last_waiter_leaves():
+    async def scenario():
+        flights = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def call():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.ensure_future(flights.do("key", call)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0)
+        return flights.stats()["in_flight"], [waiter.cancelled() for waiter in waiters]
+
+    in_flight, waiters_cancelled = asyncio.run(scenario())
+    assert in_flight == 0
+    assert waiters_cancelled == [True, True]
+
+
+def test_a_new_call_starts_after_the_previous_one_finished():
+    async def scenario():
+        flights = SingleFlight()
+        counter = iter(range(10))
+
+        async def call():
+            return next(counter)
+
+        return [await flights.do("key", call) for _ in range(2)]
+
+    assert asyncio.run(scenario()) == [(0, False), (1, False)]
@@ -40,7 +40,9 @@ function App() {
   const saveContent = async () => {
     try {
       setLoading(true)
-      await apiService.saveContent(contentData)
+      const response = await apiService.saveContent(contentData)
+      // Keep the id so later saves update this document instead of creating a new one
+      updateContentData('id', response.id)
       alert('Content saved successfully!')
     } catch (error) {
       console.error('Failed to save content:', error)
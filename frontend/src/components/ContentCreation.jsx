@@ -25,7 +25,7 @@ const ContentCreation = ({ contentData, updateContentData, onSave, loading, setL
         }
     }
 
-    const generateOutline = async () => {
+    const generateOutline = async ({ useCache = true } = {}) => {
         if (!contentData.research_data.trim()) {
             alert('Research data is required to generate outline')
             return
@@ -33,7 +33,7 @@ const ContentCreation = ({ contentData, updateContentData, onSave, loading, setL
 
         try {
             setLoading(true)
-            const response = await apiService.generateOutline(contentData.topic, contentData.research_data)
+            const response = await apiService.generateOutline(contentData.topic, contentData.research_data, { useCache })
             updateContentData('outline', response.outline)
             setCurrentStep(3)
         } catch (error) {
@@ -59,13 +59,19 @@ const ContentCreation = ({ contentData, updateContentData, onSave, loading, setL
             return
         }
 
+        const previousDraft = contentData.draft
         try {
             setLoading(true)
-            const response = await apiService.generateDraft(contentData.approved_outline, contentData.research_data)
+            const response = await apiService.streamDraft(
+                contentData.approved_outline,
+                contentData.research_data,
+                (_, draftSoFar) => updateContentData('draft', draftSoFar)
+            )
             updateContentData('draft', response.draft)
             setCurrentStep(5)
         } catch (error) {
             console.error('Failed to generate draft:', error)
+            updateContentData('draft', previousDraft)
             alert('Failed to generate draft')
         } finally {
             setLoading(false)
@@ -78,13 +84,20 @@ const ContentCreation = ({ contentData, updateContentData, onSave, loading, setL
             return
         }
 
+        const previousDraft = contentData.draft
         try {
             setLoading(true)
-            const response = await apiService.reviseDraft(contentData.draft, feedback)
+            const response = await apiService.streamRevision(
+                contentData.draft,
+                feedback,
+                (_, revisionSoFar) => updateContentData('draft', revisionSoFar),
+                { mode: 'sections' }
+            )
             updateContentData('draft', response.revised_draft)
             setFeedback('')
         } catch (error) {
             console.error('Failed to revise draft:', error)
+            updateContentData('draft', previousDraft)
             alert('Failed to revise draft')
         } finally {
             setLoading(false)
@@ -149,7 +162,7 @@ const ContentCreation = ({ contentData, updateContentData, onSave, loading, setL
                             disabled={loading}
                         />
                         <button
-                            onClick={generateOutline}
+                            onClick={() => generateOutline()}
                             disabled={loading}
                             className="btn btn-primary"
                         >
@@ -178,7 +191,7 @@ const ContentCreation = ({ contentData, updateContentData, onSave, loading, setL
                                 Approve Outline
                             </button>
                             <button
-                                onClick={generateOutline}
+                                onClick={() => generateOutline({ useCache: false })}
                                 disabled={loading}
                                 className="btn btn-secondary"
                             >
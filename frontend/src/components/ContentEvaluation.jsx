@@ -42,10 +42,26 @@ const ContentEvaluation = ({ contentData, updateContentData, loading, setLoading
         )
     }
 
+    // Stages skipped by the local checks come back with null scores; they have no average
+    const getAverageScore = (evaluation) => {
+        const scores = Object.values(evaluation).filter(score => typeof score === 'number')
+        return scores.length ? scores.reduce((sum, score) => sum + score, 0) / scores.length : null
+    }
+
     const renderEvaluationSection = (title, evaluation, criteria) => {
         if (!evaluation) return null
 
-        const averageScore = Object.values(evaluation).reduce((sum, score) => sum + score, 0) / Object.keys(evaluation).length
+        const averageScore = getAverageScore(evaluation)
+        if (averageScore === null) {
+            return (
+                <div className="evaluation-section">
+                    <h4>{title}</h4>
+                    <div className="overall-score">
+                        <strong>Skipped: failed the local checks</strong>
+                    </div>
+                </div>
+            )
+        }
 
         return (
             <div className="evaluation-section">
@@ -134,14 +150,14 @@ const ContentEvaluation = ({ contentData, updateContentData, loading, setLoading
                                 <h3>Evaluation Summary</h3>
                                 <div className="summary-grid">
                                     {Object.entries(contentData.evaluations).map(([type, evaluation]) => {
-                                        const averageScore = Object.values(evaluation).reduce((sum, score) => sum + score, 0) / Object.keys(evaluation).length
+                                        const averageScore = getAverageScore(evaluation)
                                         return (
                                             <div key={type} className="summary-card">
                                                 <h4>{type.charAt(0).toUpperCase() + type.slice(1)}</h4>
                                                 <div className="summary-score">
-                                                    {averageScore.toFixed(1)}/10
+                                                    {averageScore === null ? 'Skipped' : `${averageScore.toFixed(1)}/10`}
                                                 </div>
-                                                {renderScoreBar(averageScore)}
+                                                {averageScore !== null && renderScoreBar(averageScore)}
                                             </div>
                                         )
                                     })}
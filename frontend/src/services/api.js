@@ -23,31 +23,171 @@ class ApiService {
         return await response.json()
     }
 
+    // POST to a Server-Sent-Events endpoint, calling onChunk(text, fullTextSoFar) as chunks arrive.
+    // Resolves with the payload of the final "done" event.
+    async streamRequest(endpoint, data, onChunk = () => {}) {
+        const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+            },
+            body: JSON.stringify(data),
+        })
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({ error: 'Network error' }))
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`)
+        }
+
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        let buffer = ''
+        let fullText = ''
+
+        while (true) {
+            const { value, done } = await reader.read()
+            if (done) break
+            buffer += decoder.decode(value, { stream: true })
+
+            let boundary
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary)
+                buffer = buffer.slice(boundary + 2)
+
+                let event = 'message'
+                let payload = ''
+                for (const line of rawEvent.split('\n')) {
+                    if (line.startsWith('event:')) event = line.slice(6).trim()
+                    else if (line.startsWith('data:')) payload += line.slice(5).trim()
+                }
+                const eventData = payload ? JSON.parse(payload) : {}
+
+                if (event === 'chunk') {
+                    fullText += eventData.text
+                    onChunk(eventData.text, fullText)
+                } else if (event === 'done') {
+                    return eventData
+                } else if (event === 'error') {
+                    throw new Error(eventData.error || 'Streaming error')
+                }
+            }
+        }
+
+        throw new Error('Stream ended before completion')
+    }
+
     // Health check
     async healthCheck() {
         return this.makeRequest('/api/health')
     }
 
     // Content generation endpoints
-    async generateResearch(topic) {
-        return this.makeRequest('/api/generate-research', 'POST', { topic })
+    // Pass { useCache: false } to bypass the server-side response cache (e.g. "Regenerate")
+    async generateResearch(topic, { useCache = true } = {}) {
+        return this.makeRequest('/api/generate-research', 'POST', { topic, use_cache: useCache })
+    }
+
+    async generateOutline(topic, research_data, { useCache = true } = {}) {
+        return this.makeRequest('/api/generate-outline', 'POST', { topic, research_data, use_cache: useCache })
     }
 
-    async generateOutline(topic, research_data) {
-        return this.makeRequest('/api/generate-outline', 'POST', { topic, research_data })
+    // mode: 'single' (one call) or 'sections' (outline sections written in parallel); omit for the server default
+    async generateDraft(outline, research_data, { useCache = true, mode } = {}) {
+        return this.makeRequest('/api/generate-draft', 'POST', { outline, research_data, mode, use_cache: useCache })
     }
 
-    async generateDraft(outline, research_data) {
-        return this.makeRequest('/api/generate-draft', 'POST', { outline, research_data })
+    // mode: 'full' or 'sections' (only the sections the feedback is about, or targetSections, are rewritten)
+    async reviseDraft(draft, feedback, { useCache = true, mode, targetSections } = {}) {
+        return this.makeRequest('/api/revise-draft', 'POST', {
+            draft, feedback, mode, target_sections: targetSections, use_cache: useCache
+        })
     }
 
-    async reviseDraft(draft, feedback) {
-        return this.makeRequest('/api/revise-draft', 'POST', { draft, feedback })
+    // Streaming variants: onChunk(text, fullTextSoFar) is called as the model writes
+    async streamResearch(topic, onChunk, { useCache = true } = {}) {
+        return this.streamRequest('/api/generate-research/stream', { topic, use_cache: useCache }, onChunk)
     }
 
-    // Evaluation endpoint
-    async evaluateContent(content_data) {
-        return this.makeRequest('/api/evaluate-content', 'POST', { content_data })
+    async streamOutline(topic, research_data, onChunk, { useCache = true } = {}) {
+        return this.streamRequest('/api/generate-outline/stream', { topic, research_data, use_cache: useCache }, onChunk)
+    }
+
+    async streamDraft(outline, research_data, onChunk, { useCache = true, mode } = {}) {
+        return this.streamRequest('/api/generate-draft/stream', { outline, research_data, mode, use_cache: useCache }, onChunk)
+    }
+
+    async streamRevision(draft, feedback, onChunk, { useCache = true, mode, targetSections } = {}) {
+        return this.streamRequest('/api/revise-draft/stream', {
+            draft, feedback, mode, target_sections: targetSections, use_cache: useCache
+        }, onChunk)
+    }
+
+    // Evaluation endpoint; localPolicy ('off' | 'report' | 'skip') overrides the server's local pre-scoring policy
+    async evaluateContent(content_data, { useCache = true, localPolicy = null } = {}) {
+        return this.makeRequest('/api/evaluate-content', 'POST', { content_data, use_cache: useCache, local_policy: localPolicy })
+    }
+
+    // Batch evaluation: items are { id, content_data }; onResult(record) is called per item as it finishes.
+    // Resolves with the final summary record.
+    async evaluateBatch(items, { mode = 'separate', concurrency = null, useCache = true, localPolicy = null, onResult = () => {} } = {}) {
+        const response = await fetch(`${API_BASE_URL}/api/evaluate-batch`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ items, mode, concurrency, use_cache: useCache, local_policy: localPolicy }),
+        })
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({ error: 'Network error' }))
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`)
+        }
+
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        let buffer = ''
+
+        while (true) {
+            const { value, done } = await reader.read()
+            if (done) break
+            buffer += decoder.decode(value, { stream: true })
+
+            let newline
+            while ((newline = buffer.indexOf('\n')) !== -1) {
+                const line = buffer.slice(0, newline).trim()
+                buffer = buffer.slice(newline + 1)
+                if (!line) continue
+
+                const record = JSON.parse(line)
+                if (record.done) return record
+                onResult(record)
+            }
+        }
+
+        throw new Error('Batch evaluation ended before completion')
+    }
+
+    // Response cache management
+    async invalidateCache(stage = null) {
+        return this.makeRequest('/api/cache/invalidate', 'POST', { stage })
+    }
+
+    // Server-side pipeline jobs (topic -> research -> outline -> draft -> evaluation)
+    async submitJobs(topics, { useCache = true } = {}) {
+        return this.makeRequest('/api/jobs', 'POST', { topics, use_cache: useCache })
+    }
+
+    async listJobs(status = null) {
+        return this.makeRequest(status ? `/api/jobs?status=${encodeURIComponent(status)}` : '/api/jobs')
+    }
+
+    async getJob(jobId) {
+        return this.makeRequest(`/api/jobs/${jobId}`)
+    }
+
+    async cancelJob(jobId) {
+        return this.makeRequest(`/api/jobs/${jobId}`, 'DELETE')
     }
 
     // Data persistence endpoints
@@ -55,8 +195,85 @@ class ApiService {
         return this.makeRequest('/api/save-content', 'POST', { content_data })
     }
 
-    async loadContent() {
-        return this.makeRequest('/api/load-content')
+    // Without an id, returns the most recently saved document
+    async loadContent(id = null) {
+        return this.makeRequest(id ? `/api/load-content?id=${encodeURIComponent(id)}` : '/api/load-content')
+    }
+
+    // params: { topic, stage, where: ['engagement<6'], fields, order_by, order, limit, offset }
+    async listContent(params = {}) {
+        const query = new URLSearchParams()
+        Object.entries(params).forEach(([key, value]) => {
+            if (value === null || value === undefined) return
+            if (Array.isArray(value)) value.forEach(item => query.append(key, item))
+            else query.append(key, value)
+        })
+        return this.makeRequest(`/api/content?${query.toString()}`)
+    }
+
+    async getContent(id, fields = null) {
+        return this.makeRequest(fields ? `/api/content/${id}?fields=${encodeURIComponent(fields)}` : `/api/content/${id}`)
+    }
+
+    // Revision history: versions are listed newest first; diffVersions defaults to latest vs. previous
+    async listVersions(id) {
+        return this.makeRequest(`/api/content/${id}/versions`)
+    }
+
+    async getVersion(id, version, fields = null) {
+        const query = fields ? `?fields=${encodeURIComponent(fields)}` : ''
+        return this.makeRequest(`/api/content/${id}/versions/${version}${query}`)
+    }
+
+    async diffVersions(id, { from = null, to = null } = {}) {
+        const query = new URLSearchParams()
+        if (from !== null) query.set('from', from)
+        if (to !== null) query.set('to', to)
+        return this.makeRequest(`/api/content/${id}/diff?${query.toString()}`)
+    }
+
+    async deleteContent(id) {
+        return this.makeRequest(`/api/content/${id}`, 'DELETE')
+    }
+
+    // Workflow sessions: state stays on the server, so steps send a session id instead of the artifacts.
+    // Steps return { session_id, version, changes } with only the fields that changed.
+    async createSession(topic, content_data = null) {
+        return this.makeRequest('/api/sessions', 'POST', { topic, content_data })
+    }
+
+    async getSession(id, { version = null, fields = null } = {}) {
+        const query = new URLSearchParams()
+        if (version !== null) query.set('version', version)
+        if (fields) query.set('fields', fields)
+        return this.makeRequest(`/api/sessions/${id}?${query.toString()}`)
+    }
+
+    // copyFields copies server-side, e.g. { approved_outline: 'outline' } approves the generated outline
+    async updateSession(id, { changes = {}, copyFields = {}, baseVersion = null } = {}) {
+        return this.makeRequest(`/api/sessions/${id}`, 'PATCH', { changes, copy_fields: copyFields, base_version: baseVersion })
+    }
+
+    // step: 'research' | 'outline' | 'draft' | 'revise' | 'evaluate'; options are passed through (feedback, mode, ...)
+    async runSessionStep(id, step, { useCache = true, version = null, targetSections, localPolicy, ...options } = {}) {
+        return this.makeRequest(`/api/sessions/${id}/${step}`, 'POST', {
+            ...options,
+            version,
+            target_sections: targetSections,
+            local_policy: localPolicy,
+            use_cache: useCache
+        })
+    }
+
+    // The done event carries { session_id, version, changed } instead of the streamed text
+    async streamSessionDraft(id, onChunk, { useCache = true, mode } = {}) {
+        return this.streamRequest(`/api/sessions/${id}/draft/stream`, { mode, use_cache: useCache }, onChunk)
+    }
+
+    async streamSessionRevision(id, feedback, onChunk, { useCache = true, mode, targetSections } = {}) {
+        return this.streamRequest(`/api/sessions/${id}/revise/stream`, {
+            feedback, mode, target_sections: targetSections, use_cache: useCache
+        }, onChunk)
     }
 
     // Prompt management endpoints